@@ -0,0 +1,54 @@
+"""Cost of filling a BUKKIT of NUMBRs and going through EACH of its items,
+and the memory its items take compared with a list of the same numbers.
+
+A BUKKIT of NUMBRs keeps them in an array("q"), 8 bytes each, where a
+list takes a pointer and a boxed int for each. Run from the repository
+root:
+
+    python benchmarks/bench_bukkit.py [item count]
+"""
+
+import sys
+import time
+
+sys.path.insert(0, "src")
+
+from components.evaluator import ENGINES, Evaluator  # noqa: E402
+from components.lexer import Lexer  # noqa: E402
+
+from programs import bukkitSumProgram  # noqa: E402
+
+
+def measure(engine, itemCount):
+    sourceCode = bukkitSumProgram(itemCount)
+    tokens = Lexer().process(sourceCode)
+    evaluator = Evaluator(engine=engine)
+
+    start = time.perf_counter()
+    evaluator.evaluate(tokens, sourceCode)
+    elapsed = time.perf_counter() - start
+
+    variables = evaluator.memory.flatten()
+    assert variables["total"] == 3 * itemCount * (itemCount - 1) // 2
+    return elapsed / itemCount, variables["numbers"].items
+
+
+def main():
+    itemCount = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    print(f"time per item, filling and adding up {itemCount} items")
+    for engine in ENGINES:
+        elapsed, items = measure(engine, itemCount)
+        print(f"{engine:>8}: {elapsed * 1e6:.2f}us")
+
+    numbers = list(items)
+    listSize = sys.getsizeof(numbers) + sum(map(sys.getsizeof, numbers))
+    arraySize = sys.getsizeof(items)
+    print(
+        f"bytes per item: {arraySize / itemCount:.1f} in the BUKKIT's"
+        f" array({items.typecode!r}), {listSize / itemCount:.1f} in a list"
+    )
+
+
+if __name__ == "__main__":
+    main()
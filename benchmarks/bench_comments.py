@@ -0,0 +1,62 @@
+"""Comment stripping on pathological inputs: linear scanner against the old regexes.
+
+Run from the repository root:
+
+    python benchmarks/bench_comments.py [size in MB]
+"""
+
+import re
+import sys
+import time
+
+sys.path.insert(0, "src")
+
+from components.lexer import Lexer  # noqa: E402
+
+
+def regexCommentRemoval(content):
+    """The previous implementation of Lexer._removeIndents/_removeComments."""
+    content = re.sub(r"\t", "", content)
+    content = re.sub(r"(OBTW(?<=OBTW)(.|\n)*?(?=TLDR)TLDR)", "", content)
+    return re.sub(r"BTW .*", "", content)
+
+
+def linearCommentRemoval(content):
+    lexer = Lexer()
+    lexer.isInsideMultilineComment = False
+    return "\n".join(lexer._stripComments(line) for line in content.split("\n"))
+
+
+def pathologicalInputs(size):
+    commentLine = "\tthis line is inside a very long comment\n"
+    commentBlock = commentLine * (size // len(commentLine))
+
+    yield "large OBTW block", f"HAI\nOBTW\n{commentBlock}TLDR\nKTHXBYE"
+    yield "unterminated OBTW", f"HAI\nOBTW\n{commentBlock}KTHXBYE"
+
+    # every OBTW makes the old regex scan to the end of the input
+    unclosedLine = "VISIBLE 1 OBTW\n"
+    unclosedCount = min(size // len(unclosedLine), 2_000)
+    yield f"{unclosedCount} OBTW without TLDR", unclosedLine * unclosedCount
+
+
+def measure(removeComments, content):
+    start = time.perf_counter()
+    removeComments(content)
+    return time.perf_counter() - start
+
+
+def main():
+    size = int(float(sys.argv[1]) * 1_000_000) if len(sys.argv) > 1 else 10_000_000
+
+    for name, content in pathologicalInputs(size):
+        print(f"{name} ({len(content) / 1_000_000:.1f} MB)")
+        for label, removeComments in (
+            ("regex", regexCommentRemoval),
+            ("linear", linearCommentRemoval),
+        ):
+            print(f"{label:>8}: {measure(removeComments, content):.3f}s")
+
+
+if __name__ == "__main__":
+    main()
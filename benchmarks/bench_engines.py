@@ -0,0 +1,46 @@
+"""Execution speed of the evaluator engines on an arithmetic-heavy loop.
+
+Run from the repository root:
+
+    python benchmarks/bench_engines.py [iteration count]
+"""
+
+import sys
+import time
+
+sys.path.insert(0, "src")
+
+from components.evaluator import ENGINES, Evaluator  # noqa: E402
+from components.lexer import Lexer  # noqa: E402
+
+from programs import arithmeticLoopProgram  # noqa: E402
+
+
+def measure(engine, tokens, sourceCode):
+    evaluator = Evaluator(engine=engine)
+
+    start = time.perf_counter()
+    evaluator.evaluate(tokens, sourceCode)
+    elapsed = time.perf_counter() - start
+
+    return evaluator.outputBuffer, elapsed
+
+
+def main():
+    iterationCount = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    sourceCode = arithmeticLoopProgram(iterationCount)
+    tokens = Lexer().process(sourceCode)
+
+    print(f"{iterationCount} loop iterations")
+    baseline = None
+    for engine in ENGINES:
+        output, elapsed = measure(engine, tokens, sourceCode)
+        baseline = baseline or elapsed
+        print(
+            f"{engine:>8}: {elapsed:.3f}s ({baseline / elapsed:.1f}x),"
+            f" output {output.strip()!r}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Cost of function calls on every engine, with and without memoization.
+
+The recursive Fibonacci makes an exponential number of calls unless fib is
+marked pure, when every value is only worked out once. The tail-recursive
+sum goes far deeper than the Python recursion limit. Run from the
+repository root:
+
+    python benchmarks/bench_functions.py [fibonacci n] [sum n]
+"""
+
+import sys
+import time
+
+sys.path.insert(0, "src")
+
+from components.evaluator import ENGINES, Evaluator  # noqa: E402
+from components.lexer import Lexer  # noqa: E402
+
+from programs import recursiveFibonacciProgram, tailRecursiveSumProgram  # noqa: E402
+
+
+def measure(engine, tokens, sourceCode, pureFunctions=()):
+    evaluator = Evaluator(engine=engine, pureFunctions=pureFunctions)
+
+    start = time.perf_counter()
+    evaluator.evaluate(tokens, sourceCode)
+    elapsed = time.perf_counter() - start
+
+    return elapsed, evaluator
+
+
+def main():
+    fibonacciN = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    sumN = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+
+    sourceCode = recursiveFibonacciProgram(fibonacciN)
+    tokens = Lexer().process(sourceCode)
+
+    print(f"fib {fibonacciN}, plain -> pure")
+    for engine in ENGINES:
+        plain, _ = measure(engine, tokens, sourceCode)
+        pure, evaluator = measure(engine, tokens, sourceCode, ["fib"])
+        cache = evaluator.functionCaches["fib"]
+        print(
+            f"{engine:>8}: {plain:.3f}s -> {pure:.4f}s ({plain / pure:.0f}x),"
+            f" {cache.hits} hits, {cache.misses} misses"
+        )
+
+    sourceCode = tailRecursiveSumProgram(sumN)
+    tokens = Lexer().process(sourceCode)
+
+    print(f"\nsum of 1 to {sumN} by tail calls")
+    for engine in ENGINES:
+        elapsed, evaluator = measure(engine, tokens, sourceCode)
+        print(
+            f"{engine:>8}: {elapsed:.3f}s ({elapsed / sumN * 1e6:.2f}us per call),"
+            f" output {evaluator.outputBuffer.strip()!r}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Lexer throughput: the single-pass scanner against the old word-buffer scan,
+sequentially and across a process pool.
+
+Run from the repository root:
+
+    python benchmarks/bench_lexer.py [line count]
+"""
+
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, "src")
+
+from components.lexer import KEYWORDS, LITERAL_PATTERNS, Lexer, Token  # noqa: E402
+from components.token_enum import TOKEN  # noqa: E402
+
+from programs import straightLineProgram  # noqa: E402
+
+
+class LegacyLexer(Lexer):
+    """The previous tokenizer: grows a word buffer and tries every pattern on it."""
+
+    def __init__(self):
+        self.patternTypes = {
+            f"^{re.escape(keyword)}$": lexemeType
+            for keyword, lexemeType in KEYWORDS.items()
+        }
+        for lexemeType, pattern in LITERAL_PATTERNS.items():
+            self.patternTypes[f"^{pattern}$"] = lexemeType
+
+    def _tokenizeLine(self, line):
+        words = line.split()
+
+        buffer = ""
+        previousLexemeType = None
+
+        while True:
+            for word in words:
+                if len(buffer) > 0:
+                    buffer += " "
+                buffer += word
+
+                lexemeType = self._getLexemeType(buffer)
+                if lexemeType != None:
+                    yield Token(buffer, lexemeType)
+                    previousLexemeType = lexemeType
+                    buffer = ""
+
+            if buffer == "":
+                break
+
+            identifier, *words = buffer.split()
+            if not re.match(r"^[a-zA-Z]\w*$", identifier):
+                self._throwSyntaxError("Unexpected token")
+
+            previousLexemeType = self._getIdentifierTypeBasedOn(previousLexemeType)
+            yield Token(identifier, previousLexemeType)
+            buffer = ""
+
+        yield Token("\n", TOKEN.LINEBREAK)
+
+    def _getLexemeType(self, lexeme):
+        for pattern in self.patternTypes:
+            if re.match(pattern, lexeme):
+                return self.patternTypes[pattern]
+        return None
+
+
+def measure(lexer, sourceCode, workers=None):
+    start = time.perf_counter()
+    tokens = lexer.process(sourceCode, workers=workers)
+    elapsed = time.perf_counter() - start
+    return len(tokens), elapsed
+
+
+def main():
+    lineCount = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    sourceCode = straightLineProgram(lineCount)
+
+    print(f"{lineCount} lines, {len(sourceCode)} characters")
+    workers = os.cpu_count()
+    for name, lexer, lexerWorkers in (
+        ("word buffer", LegacyLexer(), None),
+        ("single pass", Lexer(), None),
+        (f"{workers} workers", Lexer(), workers),
+    ):
+        tokenCount, elapsed = measure(lexer, sourceCode, lexerWorkers)
+        print(
+            f"{name:>12}: {tokenCount} tokens in {elapsed:.3f}s"
+            f" ({tokenCount / elapsed:,.0f} tokens/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
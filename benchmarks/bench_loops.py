@@ -0,0 +1,69 @@
+"""Per-iteration overhead of counted loops, with and without the range fast path.
+
+The loop body is a single assignment, so the time is mostly the loop's own
+work: testing the condition and stepping the counter. Run from the
+repository root:
+
+    python benchmarks/bench_loops.py [iteration count]
+"""
+
+import sys
+import time
+
+sys.path.insert(0, "src")
+
+from components.evaluator import ENGINES, Evaluator  # noqa: E402
+from components.lexer import Lexer  # noqa: E402
+from components.resolver import Resolver  # noqa: E402
+
+
+def countedLoopProgram(iterationCount):
+    return "\n".join(
+        [
+            "HAI",
+            "I HAS A i ITZ 0",
+            f"I HAS A n ITZ {iterationCount}",
+            "I HAS A last",
+            "IM IN YR counting UPPIN YR i TIL BOTH SAEM i AN n",
+            "    last R i",
+            "IM OUTTA YR counting",
+            "KTHXBYE",
+        ]
+    )
+
+
+def measure(engine, tokens, sourceCode, fastPath):
+    evaluator = Evaluator(engine=engine)
+
+    countedLimit = Resolver._countedLimit
+    if not fastPath:
+        Resolver._countedLimit = lambda resolver, loop: None
+
+    try:
+        start = time.perf_counter()
+        evaluator.evaluate(tokens, sourceCode)
+        elapsed = time.perf_counter() - start
+    finally:
+        Resolver._countedLimit = countedLimit
+
+    assert evaluator.memory.flatten()["i"] == evaluator.memory.flatten()["n"]
+    return elapsed
+
+
+def main():
+    iterationCount = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    sourceCode = countedLoopProgram(iterationCount)
+    tokens = Lexer().process(sourceCode)
+
+    print(f"{iterationCount} loop iterations, time per iteration")
+    for engine in ENGINES:
+        general = measure(engine, tokens, sourceCode, fastPath=False)
+        counted = measure(engine, tokens, sourceCode, fastPath=True)
+        print(
+            f"{engine:>8}: {general / iterationCount * 1e9:6.0f}ns ->"
+            f" {counted / iterationCount * 1e9:6.0f}ns ({general / counted:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
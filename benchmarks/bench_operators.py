@@ -0,0 +1,66 @@
+"""Cost of every binary operation, against the previous uncached conversion.
+
+Each operation is timed on NUMBR operands and on NUMBAR-looking YARN
+operands, as read by GIMMEH. Run from the repository root:
+
+    python benchmarks/bench_operators.py [call count]
+"""
+
+import sys
+import timeit
+
+sys.path.insert(0, "src")
+
+from components.runtime import ARITHMETIC_OPERATORS, OPERATIONS  # noqa: E402
+
+
+def previousToNumber(value):
+    """The previous utils.toNumber, parsing the YARN on every call."""
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            return float(value)
+    return value
+
+
+def previousOperation(operationType):
+    if operationType in ARITHMETIC_OPERATORS:
+        function = ARITHMETIC_OPERATORS[operationType]
+        return lambda a, b: function(previousToNumber(a), previousToNumber(b))
+
+    return OPERATIONS[operationType]
+
+
+OPERANDS = {
+    "NUMBR": (7, 3),
+    "YARN": ("7.5", "3.25"),
+}
+
+
+def measure(operation, a, b, callCount):
+    return timeit.timeit(lambda: operation(a, b), number=callCount)
+
+
+def main():
+    callCount = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    print(f"{callCount} calls per operation and operand type")
+    for operationType, operation in OPERATIONS.items():
+        for operandType, (a, b) in OPERANDS.items():
+            try:
+                operation(a, b)
+            except SyntaxError:
+                # BOTH SAEM and DIFFRINT only take numbers
+                continue
+
+            previous = measure(previousOperation(operationType), a, b, callCount)
+            current = measure(operation, a, b, callCount)
+            print(
+                f"{operationType.name:>24} {operandType:>5}: {previous:.3f}s ->"
+                f" {current:.3f}s ({previous / current:.1f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
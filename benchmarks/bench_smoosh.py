@@ -0,0 +1,50 @@
+"""Cost of appending to a YARN with SMOOSH in a loop, as it grows.
+
+With YARNs copied on every SMOOSH the time per append grows with the YARN;
+with Ropes it stays the same from the small run to the large one. Run from
+the repository root:
+
+    python benchmarks/bench_smoosh.py [append count] [piece length]
+"""
+
+import sys
+import time
+
+sys.path.insert(0, "src")
+
+from components.evaluator import ENGINES, Evaluator  # noqa: E402
+from components.lexer import Lexer  # noqa: E402
+
+from programs import appendLoopProgram  # noqa: E402
+
+
+def measure(engine, appendCount, pieceLength):
+    sourceCode = appendLoopProgram(appendCount, pieceLength)
+    tokens = Lexer().process(sourceCode)
+    evaluator = Evaluator(engine=engine)
+
+    start = time.perf_counter()
+    evaluator.evaluate(tokens, sourceCode)
+    elapsed = time.perf_counter() - start
+
+    assert len(evaluator.memory.flatten()["report"]) == appendCount * pieceLength
+    return elapsed / appendCount
+
+
+def main():
+    appendCount = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    pieceLength = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    smallCount = appendCount // 10
+
+    print(
+        f"time per append, {smallCount} -> {appendCount} appends"
+        f" of {pieceLength} characters"
+    )
+    for engine in ENGINES:
+        small = measure(engine, smallCount, pieceLength)
+        large = measure(engine, appendCount, pieceLength)
+        print(f"{engine:>8}: {small * 1e6:.2f}us -> {large * 1e6:.2f}us")
+
+
+if __name__ == "__main__":
+    main()
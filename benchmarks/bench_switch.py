@@ -0,0 +1,41 @@
+"""Execution speed of the evaluator engines on a WTF? with many OMG cases.
+
+Run from the repository root:
+
+    python benchmarks/bench_switch.py [case count] [iteration count]
+"""
+
+import sys
+import time
+
+sys.path.insert(0, "src")
+
+from components.evaluator import ENGINES, Evaluator  # noqa: E402
+from components.lexer import Lexer  # noqa: E402
+
+from programs import menuDispatchProgram  # noqa: E402
+
+
+def main():
+    caseCount = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    iterationCount = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    sourceCode = menuDispatchProgram(caseCount, iterationCount)
+    tokens = Lexer().process(sourceCode)
+
+    print(f"{caseCount} cases, {iterationCount} switches")
+    for engine in ENGINES:
+        evaluator = Evaluator(engine=engine)
+
+        start = time.perf_counter()
+        evaluator.evaluate(tokens, sourceCode)
+        elapsed = time.perf_counter() - start
+
+        print(
+            f"{engine:>8}: {elapsed:.3f}s"
+            f" ({elapsed / iterationCount * 1e6:.1f}us per switch),"
+            f" output {evaluator.outputBuffer.strip()!r}"
+        )
+
+
+if __name__ == "__main__":
+    main()
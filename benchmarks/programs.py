@@ -0,0 +1,128 @@
+"""Generators for large synthetic LOLCODE programs used by the benchmarks."""
+
+
+def straightLineProgram(statementCount):
+    lines = ["HAI", "I HAS A total ITZ 0", 'I HAS A label ITZ "total so far"']
+
+    for index in range(statementCount):
+        if index % 5 == 0:
+            lines.append(f"BTW step {index}")
+        elif index % 5 == 1:
+            lines.append(f"total R SUM OF total AN PRODUKT OF {index} AN 2")
+        elif index % 5 == 2:
+            lines.append(f'VISIBLE "line {index} of the report" AN label AN total')
+        elif index % 5 == 3:
+            lines.append(f"BOTH SAEM total AN BIGGR OF total AN {index}.5")
+        else:
+            lines.append("total R DIFF OF total AN 1")
+
+    lines.append("KTHXBYE")
+    return "\n".join(lines)
+
+
+def arithmeticLoopProgram(iterationCount):
+    return "\n".join(
+        [
+            "HAI",
+            "I HAS A i ITZ 0",
+            "I HAS A total ITZ 0",
+            f"IM IN YR crunch UPPIN YR i TIL BOTH SAEM i AN {iterationCount}",
+            "    total R SUM OF total AN PRODUKT OF i AN 3",
+            "    total R MOD OF DIFF OF total AN QUOSHUNT OF i AN 2 AN 1000",
+            "    BIGGR OF total AN SMALLR OF i AN 500",
+            "IM OUTTA YR crunch",
+            "VISIBLE i",
+            "KTHXBYE",
+        ]
+    )
+
+
+def menuDispatchProgram(caseCount, iterationCount):
+    lines = [
+        "HAI",
+        "I HAS A i ITZ 0",
+        "I HAS A total ITZ 0",
+        f"IM IN YR dispatch UPPIN YR i TIL BOTH SAEM i AN {iterationCount}",
+        f"    MOD OF PRODUKT OF i AN 7 AN {caseCount}",
+        "    WTF?",
+    ]
+
+    for case in range(caseCount):
+        lines.append(f"    OMG {case}")
+        lines.append(f"        total R SUM OF total AN {case}")
+        lines.append("        GTFO")
+
+    lines += ["    OIC", "IM OUTTA YR dispatch", "VISIBLE total", "KTHXBYE"]
+    return "\n".join(lines)
+
+
+def recursiveFibonacciProgram(n):
+    return "\n".join(
+        [
+            "HAI",
+            "HOW IZ I fib YR n",
+            "    BOTH SAEM n AN SMALLR OF n AN 1",
+            "    O RLY?",
+            "        YA RLY",
+            "            FOUND YR n",
+            "    OIC",
+            "    I HAS A previous ITZ I IZ fib YR DIFF OF n AN 1 MKAY",
+            "    FOUND YR SUM OF previous AN I IZ fib YR DIFF OF n AN 2 MKAY",
+            "IF U SAY SO",
+            f"VISIBLE I IZ fib YR {n} MKAY",
+            "KTHXBYE",
+        ]
+    )
+
+
+def tailRecursiveSumProgram(n):
+    return "\n".join(
+        [
+            "HAI",
+            "HOW IZ I sumUpTo YR n AN YR total",
+            "    BOTH SAEM n AN 0",
+            "    O RLY?",
+            "        YA RLY",
+            "            FOUND YR total",
+            "    OIC",
+            "    FOUND YR I IZ sumUpTo YR DIFF OF n AN 1 AN YR SUM OF total AN n MKAY",
+            "IF U SAY SO",
+            f"VISIBLE I IZ sumUpTo YR {n} AN YR 0 MKAY",
+            "KTHXBYE",
+        ]
+    )
+
+
+def appendLoopProgram(appendCount, pieceLength):
+    piece = "x" * (pieceLength - 1)
+    return "\n".join(
+        [
+            "HAI",
+            "I HAS A i ITZ 0",
+            'I HAS A report ITZ ""',
+            f"IM IN YR build UPPIN YR i TIL BOTH SAEM i AN {appendCount}",
+            f'    report R SMOOSH report AN "{piece}" AN ":" MKAY',
+            "IM OUTTA YR build",
+            "KTHXBYE",
+        ]
+    )
+
+
+def bukkitSumProgram(itemCount):
+    # fills a BUKKIT with NUMBRs, then adds them up going through EACH item
+    return "\n".join(
+        [
+            "HAI",
+            "I HAS A i ITZ 0",
+            "I HAS A numbers ITZ BUKKIT",
+            f"IM IN YR filling UPPIN YR i TIL BOTH SAEM i AN {itemCount}",
+            "    ITEM OF numbers AN i R PRODUKT OF i AN 3",
+            "IM OUTTA YR filling",
+            "I HAS A number",
+            "I HAS A total ITZ 0",
+            "IM IN YR adding EACH YR number IN numbers",
+            "    total R SUM OF total AN number",
+            "IM OUTTA YR adding",
+            "KTHXBYE",
+        ]
+    )
@@ -0,0 +1,114 @@
+from array import array
+
+# the array typecode for items of each type, while all of a BUKKIT's items
+# have it; NUMBRs must also fit in 64 bits
+NUMBR_TYPECODE = "q"
+NUMBAR_TYPECODE = "d"
+NUMBR_LIMIT = 2**63
+
+ITEM_TYPE_NAMES = {NUMBR_TYPECODE: "NUMBR", NUMBAR_TYPECODE: "NUMBAR"}
+
+
+def _typecode(value):
+    """Returns the typecode of an array that can hold value, or None."""
+    if value.__class__ is int and -NUMBR_LIMIT <= value < NUMBR_LIMIT:
+        return NUMBR_TYPECODE
+    if value.__class__ is float:
+        return NUMBAR_TYPECODE
+    return None
+
+
+def _storage(values):
+    if not values:
+        return array(NUMBR_TYPECODE)
+
+    typecode = _typecode(values[0])
+    if typecode is not None and all(_typecode(value) == typecode for value in values):
+        return array(typecode, values)
+
+    return values
+
+
+class Bukkit:
+    """A BUKKIT: a list of values indexed from 0, which grows by setting
+    the item just past its end.
+
+    While every item is a NUMBR that fits in 64 bits, the items are kept in
+    an array("q"), and while every item is a NUMBAR, in an array("d"), at 8
+    bytes each instead of a pointer to a boxed number. An empty BUKKIT takes
+    the typecode of the first item set, and the first item of another type
+    moves them all to a list, for good.
+
+    Iterating reads the items by index up to the current end, so items set
+    while a loop runs over the BUKKIT are seen, whatever the storage became.
+    BUKKITs are equal when their items are, and cannot be hashed, as they
+    change.
+    """
+
+    __slots__ = ("items",)
+
+    def __init__(self, values=()):
+        self.items = _storage(list(values))
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        index = 0
+        while index < len(self.items):
+            yield self.items[index]
+            index += 1
+
+    def __getitem__(self, index):
+        items = self.items
+        if not 0 <= index < len(items):
+            raise ValueError(
+                f"Index {index} is out of range for a BUKKIT of {len(items)} items"
+            )
+
+        return items[index]
+
+    def __setitem__(self, index, value):
+        items = self.items
+        length = len(items)
+        if not 0 <= index <= length:
+            raise ValueError(
+                f"Index {index} is past the end of a BUKKIT of {length} items"
+            )
+
+        if items.__class__ is array and _typecode(value) != items.typecode:
+            if length == 0:
+                typecode = _typecode(value)
+                items = self.items = array(typecode) if typecode else []
+            else:
+                items = self.items = list(items)
+
+        if index == length:
+            items.append(value)
+        else:
+            items[index] = value
+
+    def __eq__(self, other):
+        if other.__class__ is Bukkit:
+            return list(self.items) == list(other.items)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Bukkit({list(self.items)!r})"
+
+    def summary(self):
+        """Describes the BUKKIT by its size and the type of its items, for
+        views that should not show every item."""
+        items = self.items
+        if not items:
+            return "empty BUKKIT"
+
+        itemType = "item"
+        if items.__class__ is array:
+            itemType = ITEM_TYPE_NAMES[items.typecode]
+        if len(items) > 1:
+            itemType += "s"
+
+        return f"BUKKIT of {len(items)} {itemType}"
@@ -0,0 +1,755 @@
+import marshal
+import sys
+from array import array
+from enum import IntEnum, unique
+
+from .syntax_tree import (
+    Assignment,
+    BinaryOperation,
+    Block,
+    Break,
+    Declaration,
+    ExpressionStatement,
+    FunctionCall,
+    FunctionDefinition,
+    IfStatement,
+    Input,
+    Invariant,
+    Item,
+    ItemAssignment,
+    Literal,
+    Loop,
+    MakeBukkit,
+    MultipleOperandOperation,
+    NotOperation,
+    Output,
+    Recast,
+    Return,
+    Size,
+    SwitchStatement,
+    Typecast,
+    Variable,
+)
+from .runtime import SHORT_CIRCUIT_VALUES
+from .token_enum import TOKEN
+
+BYTECODE_VERSION = 7
+
+
+@unique
+class OPCODE(IntEnum):
+    # the binary operations are numbered like BINARY_OPCODES below, so the
+    # virtual machine can tell them apart from the rest with one comparison
+    ADD = 0
+    SUBTRACT = 1
+    MULTIPLY = 2
+    DIVIDE = 3
+    MODULO = 4
+    MAX = 5
+    MIN = 6
+    AND = 7
+    OR = 8
+    XOR = 9
+    EQUAL = 10
+    NOT_EQUAL = 11
+
+    LOAD_CONSTANT = 12
+    LOAD_VARIABLE = 13
+    STORE_VARIABLE = 14
+    NOT = 16
+    SMOOSH = 19
+    CAST = 20
+    PRINT = 21
+    PRINT_LINEBREAK = 22
+    INPUT = 23
+    JUMP = 24
+    POP_JUMP_IF_TRUE = 25
+    POP_JUMP_IF_FALSE = 26
+    POP_JUMP_UNLESS_WIN = 27
+    JUMP_IF_FALSE_OR_POP = 39
+    JUMP_IF_TRUE_OR_POP = 40
+    TO_TROOF = 41
+    SWITCH = 28
+    CLEAR_SLOTS = 29
+    RETURN = 31
+
+    # superinstructions
+    INCREMENT = 32
+    DECREMENT = 33
+    STEP_AND_TEST = 34
+    BINARY_CONSTANT = 35
+
+    # loop invariants
+    HOIST = 36
+    STORE_INVARIANT = 37
+    LOAD_INVARIANT = 38
+
+    # functions
+    CALL = 42
+    TAIL_CALL = 43
+    RETURN_VALUE = 44
+    LOAD_VARIABLE_OR_NOOB = 45
+
+    # BUKKITs
+    MAKE_BUKKIT = 46
+    GET_ITEM = 47
+    SET_ITEM = 48
+    SIZE = 49
+    GET_ITERATOR = 50
+    FOR_ITEM = 51
+
+
+BINARY_OPCODES = {
+    TOKEN.ADDITION_OPERATION: OPCODE.ADD,
+    TOKEN.SUBTRACTION_OPERATION: OPCODE.SUBTRACT,
+    TOKEN.MULTIPLICATION_OPERATION: OPCODE.MULTIPLY,
+    TOKEN.QUOTIENT_OPERATION: OPCODE.DIVIDE,
+    TOKEN.MODULO_OPERATION: OPCODE.MODULO,
+    TOKEN.MAX_OPERATION: OPCODE.MAX,
+    TOKEN.MIN_OPERATION: OPCODE.MIN,
+    TOKEN.AND_OPERATION: OPCODE.AND,
+    TOKEN.OR_OPERATION: OPCODE.OR,
+    TOKEN.XOR_OPERATION: OPCODE.XOR,
+    TOKEN.EQUAL_TO_OPERATION: OPCODE.EQUAL,
+    TOKEN.NOT_EQUAL_TO_OPERATION: OPCODE.NOT_EQUAL,
+}
+
+JUMP_OPCODES = (
+    OPCODE.JUMP,
+    OPCODE.POP_JUMP_IF_TRUE,
+    OPCODE.POP_JUMP_IF_FALSE,
+    OPCODE.POP_JUMP_UNLESS_WIN,
+    OPCODE.JUMP_IF_FALSE_OR_POP,
+    OPCODE.JUMP_IF_TRUE_OR_POP,
+)
+
+
+class Bytecode:
+    """A compiled program.
+
+    code holds one (opcode, argument) pair per instruction, and jump
+    targets are offsets into it. Arguments are constant indices or frame
+    slots depending on the opcode; names gives the variable of every slot
+    and globalSlots the slots of the outermost scope, as in a Frame. lines
+    and columns give the source position of every instruction, for error
+    messages.
+    """
+
+    __slots__ = ("code", "constants", "names", "globalSlots", "lines", "columns")
+
+    def __init__(self, code, constants, names, globalSlots, lines, columns):
+        self.code = code
+        self.constants = constants
+        self.names = names
+        self.globalSlots = globalSlots
+        self.lines = lines
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.code) // 2
+
+    def toBytes(self):
+        return marshal.dumps(
+            (
+                BYTECODE_VERSION,
+                self.code.tobytes(),
+                tuple(self.constants),
+                tuple(self.names),
+                self.globalSlots,
+                self.lines.tobytes(),
+                self.columns.tobytes(),
+            )
+        )
+
+    @classmethod
+    def fromBytes(cls, data):
+        version, *fields = marshal.loads(data)
+        if version != BYTECODE_VERSION:
+            raise ValueError(f"Unsupported bytecode version {version}")
+
+        code, constants, names, globalSlots, lines, columns = fields
+        return cls(
+            array("l", code),
+            list(constants),
+            list(names),
+            globalSlots,
+            array("L", lines),
+            array("L", columns),
+        )
+
+
+class BytecodeCompiler:
+    """Compiles a syntax tree into Bytecode for the VirtualMachine.
+
+    Loops counting towards a literal (IM IN YR ... TIL BOTH SAEM var AN 10)
+    end with a STEP_AND_TEST superinstruction, which updates the counter,
+    tests it and jumps back to the body in one dispatch. A binary operation
+    on a literal second operand (SUM OF x AN 1) is a single BINARY_CONSTANT.
+
+    A loop starts by working out its Invariant nodes: HOIST marks where to
+    go should the code after it fail, and STORE_INVARIANT saves the value.
+    Where the invariant is used, LOAD_INVARIANT pushes the value and jumps
+    over the code evaluating it, unless hoisting it failed.
+
+    BOTH OF, EITHER OF, ALL OF and ANY OF jump to their end as soon as an
+    operand decides the result (JUMP_IF_FALSE_OR_POP, JUMP_IF_TRUE_OR_POP),
+    leaving it on the stack; otherwise TO_TROOF turns the last operand into
+    the result.
+
+    Function bodies follow the program's RETURN. CALL pops the arguments
+    into a new frame and jumps to the body, which ends with RETURN_VALUE
+    going back to the caller with the value on top of the stack. A FOUND YR
+    of a self tail call is a TAIL_CALL, which replaces the frame instead of
+    adding one. Both take a constant holding the function's (start offset,
+    parameter count, slot count, slot names, name).
+
+    A loop going through EACH item of a BUKKIT keeps its iterator in the
+    loop's iteratorSlot rather than on the stack, which a FOUND YR inside
+    it would leave behind: GET_ITERATOR stores it there, and FOR_ITEM sets
+    the counter to the next item, or jumps past the loop when there is none.
+    """
+
+    def __init__(self):
+        self.statementCompilers = {
+            Declaration: self._Declaration,
+            Assignment: self._AssignmentStatement,
+            Recast: self._RecastingStatement,
+            Output: self._Output,
+            Input: self._Input,
+            ExpressionStatement: self._ExpressionStatement,
+            Block: self._BlockStatement,
+            IfStatement: self._IfStatement,
+            SwitchStatement: self._CaseStatement,
+            Loop: self._LoopStatement,
+            Break: self._BreakStatement,
+            FunctionDefinition: self._FunctionDefinition,
+            Return: self._ReturnStatement,
+            ItemAssignment: self._ItemAssignment,
+        }
+
+        self.expressionCompilers = {
+            Literal: self._Literal,
+            Variable: self._Variable,
+            BinaryOperation: self._TwoOperandOperation,
+            NotOperation: self._NotOperation,
+            MultipleOperandOperation: self._MultipleOperandOperation,
+            Typecast: self._ExplicitTypecast,
+            Invariant: self._InvariantExpression,
+            FunctionCall: self._FunctionCall,
+            MakeBukkit: self._Bukkit,
+            Item: self._Item,
+            Size: self._Size,
+        }
+
+    def compile(self, program):
+        self.code = array("l")
+        self.lines = array("L")
+        self.columns = array("L")
+        self.constants = []
+        self.constantIndices = {}
+        self.invariantSlots = {}
+
+        # for each enclosing loop or switch, the GTFO jumps to patch at its end
+        self.breakables = []
+
+        # the constant of every function, set once its body is placed
+        self.functionConstants = {}
+
+        self._Statements(program.statements)
+        self._emit(OPCODE.RETURN, 0, program)
+
+        for statement in program.statements:
+            if isinstance(statement, FunctionDefinition):
+                self._function(statement)
+
+        return Bytecode(
+            self.code,
+            self.constants,
+            list(program.slotNames),
+            program.globalSlots,
+            self.lines,
+            self.columns,
+        )
+
+    def _emit(self, opcode, argument, node):
+        self.code.append(opcode)
+        self.code.append(argument)
+        self.lines.append(node.line)
+        self.columns.append(node.column)
+
+        # offset of the instruction, for patching jumps
+        return len(self.code) - 2
+
+    def _here(self):
+        return len(self.code)
+
+    def _patchJump(self, jumpOffset, target=None):
+        self.code[jumpOffset + 1] = self._here() if target is None else target
+
+    def _constant(self, value):
+        # keyed by type too, as 1, 1.0 and WIN are equal dictionary keys
+        key = (type(value), value)
+        if key not in self.constantIndices:
+            self.constantIndices[key] = len(self.constants)
+            self.constants.append(value)
+
+        return self.constantIndices[key]
+
+    def _addConstant(self, value):
+        # for unhashable constants such as jump tables
+        self.constants.append(value)
+        return len(self.constants) - 1
+
+    def _Statements(self, statements):
+        for statement in statements:
+            self.statementCompilers[type(statement)](statement)
+
+    def _Declaration(self, declaration):
+        if declaration.value is None:
+            self._emit(OPCODE.LOAD_CONSTANT, self._constant(None), declaration)
+        else:
+            self._Operand(declaration.value)
+
+        self._emit(OPCODE.STORE_VARIABLE, declaration.slot, declaration)
+
+    def _Output(self, output):
+        for operand in output.operands:
+            self._Operand(operand)
+            self._emit(OPCODE.PRINT, 0, output)
+
+        self._emit(OPCODE.PRINT_LINEBREAK, 0, output)
+
+    def _Input(self, input):
+        self._emit(OPCODE.INPUT, input.slot, input)
+
+    def _ExpressionStatement(self, statement):
+        self._Operand(statement.expression)
+        self._emit(OPCODE.STORE_VARIABLE, statement.itSlot, statement)
+
+    def _AssignmentStatement(self, assignment):
+        self._Operand(assignment.value)
+        self._emit(OPCODE.STORE_VARIABLE, assignment.slot, assignment)
+
+    def _ItemAssignment(self, assignment):
+        self._Operand(assignment.bukkit)
+        self._Operand(assignment.index)
+        self._Operand(assignment.value)
+        self._emit(OPCODE.SET_ITEM, 0, assignment)
+
+    def _RecastingStatement(self, recast):
+        self._emit(OPCODE.LOAD_VARIABLE, recast.slot, recast)
+        self._emit(OPCODE.CAST, self._constant(recast.typeName), recast)
+        self._emit(OPCODE.STORE_VARIABLE, recast.slot, recast)
+
+    def _BlockStatement(self, block):
+        self._Statements(block.statements)
+
+    def _IfStatement(self, ifStatement):
+        # only a WIN (or 1) runs the YA RLY block, or that of a MEBBE; each
+        # branch not taken jumps to the next one's test
+        self._emit(OPCODE.LOAD_VARIABLE, ifStatement.itSlot, ifStatement)
+        nextJump = self._emit(OPCODE.POP_JUMP_UNLESS_WIN, 0, ifStatement)
+        self._Statements(ifStatement.ifBlock)
+
+        endJumps = []
+        for elseIf in ifStatement.elseIfs:
+            endJumps.append(self._emit(OPCODE.JUMP, 0, elseIf))
+            self._patchJump(nextJump)
+
+            self._Operand(elseIf.condition)
+            nextJump = self._emit(OPCODE.POP_JUMP_UNLESS_WIN, 0, elseIf)
+            self._Statements(elseIf.block)
+
+        if ifStatement.elseBlock is None:
+            endJumps.append(nextJump)
+        else:
+            endJumps.append(self._emit(OPCODE.JUMP, 0, ifStatement))
+            self._patchJump(nextJump)
+            self._Statements(ifStatement.elseBlock)
+
+        for endJump in endJumps:
+            self._patchJump(endJump)
+
+    def _BreakStatement(self, breakStatement):
+        self.breakables[-1].append(self._emit(OPCODE.JUMP, 0, breakStatement))
+
+    def _FunctionDefinition(self, function):
+        # compiled after the program
+        pass
+
+    def _function(self, function):
+        start = self._here()
+
+        # a GTFO outside of loops and switches returns NOOB
+        breakJumps = []
+        self.breakables.append(breakJumps)
+        self._Statements(function.body)
+        self.breakables.pop()
+
+        # without FOUND YR, a function gives the value of its IT
+        self._emit(OPCODE.LOAD_VARIABLE_OR_NOOB, function.itSlot, function)
+        self._emit(OPCODE.RETURN_VALUE, 0, function)
+
+        if breakJumps:
+            for breakJump in breakJumps:
+                self._patchJump(breakJump)
+            self._emit(OPCODE.LOAD_CONSTANT, self._constant(None), function)
+            self._emit(OPCODE.RETURN_VALUE, 0, function)
+
+        # set whether or not a call was compiled yet, as calls in the bodies
+        # of later functions take the constant too
+        self.constants[self._functionConstant(function)] = (
+            start,
+            len(function.parameters),
+            len(function.slotNames),
+            tuple(function.slotNames),
+            function.name,
+        )
+
+    def _functionConstant(self, function):
+        if function not in self.functionConstants:
+            self.functionConstants[function] = self._addConstant(None)
+
+        return self.functionConstants[function]
+
+    def _ReturnStatement(self, returnStatement):
+        if returnStatement.isTailCall:
+            call = returnStatement.value
+            for argument in call.arguments:
+                self._Operand(argument)
+
+            functionIndex = self._functionConstant(call.function)
+            self._emit(OPCODE.TAIL_CALL, functionIndex, returnStatement)
+            return
+
+        self._Operand(returnStatement.value)
+        self._emit(OPCODE.RETURN_VALUE, 0, returnStatement)
+
+    def _CaseStatement(self, switchStatement):
+        # SWITCH jumps to the first case matching the key of IT (see
+        # runtime.caseKey); the cases then fall through until a GTFO
+        self._emit(OPCODE.LOAD_VARIABLE, switchStatement.itSlot, switchStatement)
+
+        firstSlot, endSlot = switchStatement.localSlots
+        if endSlot > firstSlot:
+            localSlots = self._addConstant(switchStatement.localSlots)
+            self._emit(OPCODE.CLEAR_SLOTS, localSlots, switchStatement)
+
+        tableIndex = self._addConstant(None)
+        self._emit(OPCODE.SWITCH, tableIndex, switchStatement)
+
+        breakJumps = []
+        self.breakables.append(breakJumps)
+
+        # the offset of every case, then of the end of the switch
+        caseTargets = []
+        for case in switchStatement.cases:
+            caseTargets.append(self._here())
+            self._Statements(case.block)
+        caseTargets.append(self._here())
+
+        self.breakables.pop()
+
+        for breakJump in breakJumps:
+            self._patchJump(breakJump)
+
+        # the Resolver's jump table, from case indices to offsets
+        jumpTable = {
+            caseKey: caseTargets[caseIndex]
+            for caseKey, caseIndex in switchStatement.jumpTable.items()
+        }
+        defaultTarget = caseTargets[switchStatement.defaultCase]
+        self.constants[tableIndex] = (jumpTable, defaultTarget)
+
+    def _LoopStatement(self, loop):
+        for invariant in loop.invariants:
+            self._hoist(invariant)
+
+        if loop.collection is not None:
+            self._eachLoop(loop)
+            return
+
+        counterSlot = loop.counterSlot
+        loopTest = self._countedLoopTest(loop)
+
+        conditionStart = self._here()
+        conditionJump = None
+        if loop.condition is not None:
+            self._Operand(loop.condition)
+            if loop.conditionKeyword == "TIL":
+                conditionJump = self._emit(OPCODE.POP_JUMP_IF_TRUE, 0, loop)
+            else:
+                conditionJump = self._emit(OPCODE.POP_JUMP_IF_FALSE, 0, loop)
+
+        bodyStart = self._here()
+        breakJumps = []
+        self.breakables.append(breakJumps)
+        self._Statements(loop.body)
+        self.breakables.pop()
+
+        if loopTest is not None:
+            # counter, delta, limit, whether to stop when equal, body start
+            stepArguments = (counterSlot, loop.delta, *loopTest, bodyStart)
+            self._emit(OPCODE.STEP_AND_TEST, self._addConstant(stepArguments), loop)
+        else:
+            stepOpcode = OPCODE.INCREMENT if loop.delta > 0 else OPCODE.DECREMENT
+            self._emit(stepOpcode, counterSlot, loop)
+            self._emit(OPCODE.JUMP, conditionStart, loop)
+
+        if conditionJump is not None:
+            self._patchJump(conditionJump)
+        for breakJump in breakJumps:
+            self._patchJump(breakJump)
+
+    def _eachLoop(self, loop):
+        self._Operand(loop.collection)
+        self._emit(OPCODE.GET_ITERATOR, loop.iteratorSlot, loop)
+
+        # iterator slot, counter slot, where to go when there is no item left
+        itemIndex = self._addConstant(None)
+        loopStart = self._emit(OPCODE.FOR_ITEM, itemIndex, loop)
+
+        breakJumps = []
+        self.breakables.append(breakJumps)
+        self._Statements(loop.body)
+        self.breakables.pop()
+
+        self._emit(OPCODE.JUMP, loopStart, loop)
+
+        self.constants[itemIndex] = (loop.iteratorSlot, loop.counterSlot, self._here())
+        for breakJump in breakJumps:
+            self._patchJump(breakJump)
+
+    def _countedLoopTest(self, loop):
+        """Returns (limit, stopWhenEqual) when the loop condition compares
+        the counter with a number, else None."""
+        condition = loop.condition
+        if not (
+            isinstance(condition, BinaryOperation)
+            and condition.operator
+            in (TOKEN.EQUAL_TO_OPERATION, TOKEN.NOT_EQUAL_TO_OPERATION)
+        ):
+            return None
+
+        operands = (condition.left, condition.right)
+        for counter, limit in (operands, operands[::-1]):
+            if (
+                isinstance(counter, Variable)
+                and counter.identifier == loop.counter
+                and isinstance(limit, Literal)
+                and type(limit.value) in (int, float)
+            ):
+                break
+        else:
+            return None
+
+        # TIL stops when the condition holds, WILE when it does not
+        isEqualTest = condition.operator == TOKEN.EQUAL_TO_OPERATION
+        stopWhenEqual = isEqualTest == (loop.conditionKeyword == "TIL")
+
+        return limit.value, stopWhenEqual
+
+    def _invariantSlot(self, invariant):
+        return self.invariantSlots.setdefault(invariant, len(self.invariantSlots))
+
+    def _hoist(self, invariant):
+        slot = self._invariantSlot(invariant)
+
+        # slot, and where to go when the expression fails
+        hoistIndex = self._addConstant(None)
+        self._emit(OPCODE.HOIST, hoistIndex, invariant)
+        self._Operand(invariant.expression)
+        self._emit(OPCODE.STORE_INVARIANT, slot, invariant)
+        self.constants[hoistIndex] = (slot, self._here())
+
+    def _Operand(self, expression):
+        self.expressionCompilers[type(expression)](expression)
+
+    def _Literal(self, literal):
+        self._emit(OPCODE.LOAD_CONSTANT, self._constant(literal.value), literal)
+
+    def _Variable(self, variable):
+        self._emit(OPCODE.LOAD_VARIABLE, variable.slot, variable)
+
+    def _TwoOperandOperation(self, operation):
+        # a literal second operand costs nothing to evaluate
+        isLiteral = isinstance(operation.right, Literal)
+        if operation.operator in SHORT_CIRCUIT_VALUES and not isLiteral:
+            self._shortCircuit(
+                operation.operator, (operation.left, operation.right), operation
+            )
+            return
+
+        opcode = BINARY_OPCODES[operation.operator]
+        self._Operand(operation.left)
+
+        if isLiteral:
+            operationArguments = (int(opcode), operation.right.value)
+            self._emit(
+                OPCODE.BINARY_CONSTANT, self._addConstant(operationArguments), operation
+            )
+            return
+
+        self._Operand(operation.right)
+        self._emit(opcode, 0, operation)
+
+    def _NotOperation(self, operation):
+        self._Operand(operation.operand)
+        self._emit(OPCODE.NOT, 0, operation)
+
+    def _MultipleOperandOperation(self, operation):
+        if operation.operator in SHORT_CIRCUIT_VALUES:
+            self._shortCircuit(operation.operator, operation.operands, operation)
+            return
+
+        for operand in operation.operands:
+            self._Operand(operand)
+
+        self._emit(OPCODE.SMOOSH, len(operation.operands), operation)
+
+    def _shortCircuit(self, operator, operands, operation):
+        if SHORT_CIRCUIT_VALUES[operator]:
+            jumpOpcode = OPCODE.JUMP_IF_TRUE_OR_POP
+        else:
+            jumpOpcode = OPCODE.JUMP_IF_FALSE_OR_POP
+
+        endJumps = []
+        for operand in operands[:-1]:
+            self._Operand(operand)
+            endJumps.append(self._emit(jumpOpcode, 0, operation))
+
+        self._Operand(operands[-1])
+        self._emit(OPCODE.TO_TROOF, 0, operation)
+
+        for endJump in endJumps:
+            self._patchJump(endJump)
+
+    def _FunctionCall(self, call):
+        for argument in call.arguments:
+            self._Operand(argument)
+
+        self._emit(OPCODE.CALL, self._functionConstant(call.function), call)
+
+    def _ExplicitTypecast(self, typecast):
+        self._Operand(typecast.operand)
+        self._emit(OPCODE.CAST, self._constant(typecast.typeName), typecast)
+
+    def _Bukkit(self, bukkit):
+        for item in bukkit.items:
+            self._Operand(item)
+
+        self._emit(OPCODE.MAKE_BUKKIT, len(bukkit.items), bukkit)
+
+    def _Item(self, item):
+        self._Operand(item.bukkit)
+        self._Operand(item.index)
+        self._emit(OPCODE.GET_ITEM, 0, item)
+
+    def _Size(self, size):
+        self._Operand(size.bukkit)
+        self._emit(OPCODE.SIZE, 0, size)
+
+    def _InvariantExpression(self, invariant):
+        # slot, and where to go when the value was hoisted
+        loadIndex = self._addConstant(None)
+        self._emit(OPCODE.LOAD_INVARIANT, loadIndex, invariant)
+        self._Operand(invariant.expression)
+        self.constants[loadIndex] = (self._invariantSlot(invariant), self._here())
+
+
+def disassemble(bytecode, file=None):
+    """Prints the instructions of a Bytecode, one per line, with a heading
+    before the body of every function."""
+    file = file or sys.stdout
+    previousLine = None
+
+    # the slot names and name of the function starting at each offset
+    functions = {}
+    for offset in range(0, len(bytecode.code), 2):
+        if bytecode.code[offset] in (OPCODE.CALL, OPCODE.TAIL_CALL):
+            functionConstant = bytecode.constants[bytecode.code[offset + 1]]
+            start, _, _, slotNames, name = functionConstant
+            functions[start] = (slotNames, name)
+
+    names = bytecode.names
+    for offset in range(0, len(bytecode.code), 2):
+        opcode = OPCODE(bytecode.code[offset])
+        argument = bytecode.code[offset + 1]
+        line = bytecode.lines[offset // 2]
+
+        if offset in functions:
+            names, name = functions[offset]
+            print(f"\n{name}:", file=file)
+
+        lineColumn = f"{line:>5}" if line != previousLine else " " * 5
+        previousLine = line
+
+        instruction = f"{lineColumn} {offset:>6} {opcode.name:<20} {argument:>4}"
+        description = _describeArgument(bytecode, names, opcode, argument)
+        print(f"{instruction} {description}".rstrip(), file=file)
+
+
+def _describeArgument(bytecode, names, opcode, argument):
+    if opcode in (OPCODE.LOAD_CONSTANT, OPCODE.CAST):
+        return f"({bytecode.constants[argument]!r})"
+
+    if opcode in (
+        OPCODE.LOAD_VARIABLE,
+        OPCODE.STORE_VARIABLE,
+        OPCODE.INPUT,
+        OPCODE.INCREMENT,
+        OPCODE.DECREMENT,
+        OPCODE.LOAD_VARIABLE_OR_NOOB,
+        OPCODE.GET_ITERATOR,
+    ):
+        return f"({names[argument]})"
+
+    if opcode in JUMP_OPCODES:
+        return f"(to {argument})"
+
+    if opcode == OPCODE.SWITCH:
+        jumpTable, defaultTarget = bytecode.constants[argument]
+        cases = ", ".join(f"{value!r}: {target}" for value, target in jumpTable.items())
+        return f"({{{cases}}}, default {defaultTarget})"
+
+    if opcode == OPCODE.BINARY_CONSTANT:
+        binaryOpcode, value = bytecode.constants[argument]
+        return f"({OPCODE(binaryOpcode).name} {value!r})"
+
+    if opcode == OPCODE.CLEAR_SLOTS:
+        firstSlot, endSlot = bytecode.constants[argument]
+        return f"({', '.join(names[firstSlot:endSlot])})"
+
+    if opcode == OPCODE.STORE_INVARIANT:
+        return f"(slot {argument})"
+
+    if opcode == OPCODE.HOIST:
+        slot, failTarget = bytecode.constants[argument]
+        return f"(slot {slot}, on error to {failTarget})"
+
+    if opcode == OPCODE.LOAD_INVARIANT:
+        slot, hoistedTarget = bytecode.constants[argument]
+        return f"(slot {slot}, if hoisted to {hoistedTarget})"
+
+    if opcode == OPCODE.STEP_AND_TEST:
+        counterIndex, delta, limit, stopWhenEqual, bodyStart = bytecode.constants[
+            argument
+        ]
+        test = "==" if stopWhenEqual else "!="
+        return (
+            f"({names[counterIndex]} += {delta},"
+            f" stop if {test} {limit!r}, else to {bodyStart})"
+        )
+
+    if opcode in (OPCODE.CALL, OPCODE.TAIL_CALL):
+        start, _, _, _, name = bytecode.constants[argument]
+        return f"({name}, at {start})"
+
+    if opcode == OPCODE.FOR_ITEM:
+        iteratorSlot, counterSlot, endTarget = bytecode.constants[argument]
+        return (
+            f"({names[counterSlot]} from {names[iteratorSlot]},"
+            f" when done to {endTarget})"
+        )
+
+    return ""
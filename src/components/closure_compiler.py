@@ -0,0 +1,672 @@
+import easygui
+
+from .bukkit import Bukkit
+from .runtime import (
+    ARITHMETIC_OPERATORS,
+    IT_VARIABLE,
+    MAX_CALL_DEPTH,
+    NESTED_CALLS_MESSAGE,
+    NOT_HOISTED,
+    OPERATION_ERRORS,
+    OPERATIONS,
+    SHORT_CIRCUIT_VALUES,
+    UNSET,
+    YARN_TYPES,
+    bukkitItems,
+    bukkitSize,
+    caseKey,
+    counterRange,
+    describeError,
+    getItem,
+    setItem,
+    smoosh,
+    toYarn,
+    typeCast,
+)
+from .syntax_tree import (
+    Assignment,
+    BinaryOperation,
+    Block,
+    Break,
+    Declaration,
+    ExpressionStatement,
+    FunctionCall,
+    FunctionDefinition,
+    IfStatement,
+    Input,
+    Invariant,
+    Item,
+    ItemAssignment,
+    Literal,
+    Loop,
+    MakeBukkit,
+    MultipleOperandOperation,
+    NotOperation,
+    Output,
+    Recast,
+    Return,
+    Size,
+    SwitchStatement,
+    Typecast,
+    Variable,
+)
+from .token_enum import TOKEN
+from .utils import toNumber
+
+# returned by a statement closure for FOUND YR, with the value in the
+# compiler's returnCell, and for a FOUND YR of a self tail call, with the
+# arguments of the call there
+RETURN = object()
+TAIL_CALL = object()
+
+
+class ClosureCompiler:
+    """Compiles a syntax tree into nested Python closures.
+
+    Every node becomes a closure once, with its children, operator function
+    and variable name bound in, so running the program is only closure calls.
+    Expression closures return a value; statement closures return True when
+    a GTFO ended the enclosing loop or switch, RETURN or TAIL_CALL when a
+    FOUND YR ended the function, and a false value otherwise.
+
+    The closures read and write the slots of the evaluator's memory Frame
+    and write to its output sink, so both stay visible to the caller. A
+    function's body is compiled once, on a values list of its own that a
+    call fills with its frame, and empties back to the caller's frame when
+    it returns.
+    """
+
+    def __init__(self, evaluator):
+        self.evaluator = evaluator
+        self.values = evaluator.memory.values
+        self.source = evaluator.source
+
+        self.statementCompilers = {
+            Declaration: self._Declaration,
+            Assignment: self._AssignmentStatement,
+            Recast: self._RecastingStatement,
+            Output: self._Output,
+            Input: self._Input,
+            ExpressionStatement: self._ExpressionStatement,
+            Block: self._BlockStatement,
+            IfStatement: self._IfStatement,
+            SwitchStatement: self._CaseStatement,
+            Loop: self._LoopStatement,
+            Break: self._BreakStatement,
+            FunctionDefinition: self._FunctionDefinition,
+            Return: self._ReturnStatement,
+            ItemAssignment: self._ItemAssignment,
+        }
+
+        self.expressionCompilers = {
+            Literal: self._Literal,
+            Variable: self._Variable,
+            BinaryOperation: self._TwoOperandOperation,
+            NotOperation: self._NotOperation,
+            MultipleOperandOperation: self._MultipleOperandOperation,
+            Typecast: self._ExplicitTypecast,
+            Invariant: self._InvariantExpression,
+            FunctionCall: self._FunctionCall,
+            MakeBukkit: self._Bukkit,
+            Item: self._Item,
+            Size: self._Size,
+        }
+
+        # a one-item list holding the value of each Invariant node
+        self.invariantCells = {}
+
+        # a one-item list holding the compiled call of each function, filled
+        # once its body is compiled, so recursive calls can be compiled too
+        self.functionCells = {}
+
+        # the value of the last FOUND YR, or the arguments of a tail call
+        self.returnCell = [None]
+
+        # the number of function bodies running
+        self.callDepthCell = [0]
+
+    def compile(self, program):
+        return self._Statements(program.statements)
+
+    def _throwError(self, errorType, message, node):
+        errorArgs = (
+            None,
+            node.line,
+            node.column,
+            self.source.line(node.line),
+        )
+
+        raise errorType(message, errorArgs)
+
+    def _readVariable(self, slot, identifier, node):
+        values = self.values
+
+        def readVariable():
+            value = values[slot]
+            if value is UNSET:
+                self._throwError(NameError, f"{identifier} is not defined", node)
+
+            return value
+
+        return readVariable
+
+    def _Statements(self, statements):
+        compiledStatements = tuple(
+            self.statementCompilers[type(statement)](statement)
+            for statement in statements
+        )
+
+        def runStatements():
+            for statement in compiledStatements:
+                ending = statement()
+                if ending:
+                    return ending
+
+            return False
+
+        return runStatements
+
+    def _Declaration(self, declaration):
+        values = self.values
+        slot = declaration.slot
+
+        if declaration.value is None:
+
+            def declare():
+                values[slot] = None
+
+            return declare
+
+        value = self._Operand(declaration.value)
+
+        def declare():
+            values[slot] = value()
+
+        return declare
+
+    def _Output(self, output):
+        write = self.evaluator.output.write
+        operands = tuple(self._Operand(operand) for operand in output.operands)
+
+        def printOperands():
+            for operand in operands:
+                write(toYarn(operand()))
+
+            write("\n")
+
+        return printOperands
+
+    def _Input(self, input):
+        output = self.evaluator.output
+        values = self.values
+        slot = input.slot
+
+        def readInput():
+            value = easygui.enterbox(output.tail())
+            values[slot] = value
+
+            output.write(toYarn(value) + "\n")
+
+        return readInput
+
+    def _ExpressionStatement(self, statement):
+        values = self.values
+        itSlot = statement.itSlot
+        expression = self._Operand(statement.expression)
+
+        def assignIt():
+            values[itSlot] = expression()
+
+        return assignIt
+
+    def _AssignmentStatement(self, assignment):
+        values = self.values
+        slot = assignment.slot
+        value = self._Operand(assignment.value)
+
+        def assign():
+            values[slot] = value()
+
+        return assign
+
+    def _ItemAssignment(self, assignment):
+        bukkit = self._Operand(assignment.bukkit)
+        index = self._Operand(assignment.index)
+        value = self._Operand(assignment.value)
+
+        def assignItem():
+            bukkitValue = bukkit()
+            indexValue = index()
+            itemValue = value()
+            try:
+                setItem(bukkitValue, indexValue, itemValue)
+            except OPERATION_ERRORS as error:
+                self._throwError(*describeError(error), assignment)
+
+        return assignItem
+
+    def _RecastingStatement(self, recast):
+        values = self.values
+        slot = recast.slot
+        typeName = recast.typeName
+        readVariable = self._readVariable(slot, recast.identifier, recast)
+
+        def recastVariable():
+            value = readVariable()
+            try:
+                values[slot] = typeCast(typeName, value)
+            except OPERATION_ERRORS as error:
+                self._throwError(*describeError(error), recast)
+
+        return recastVariable
+
+    def _BlockStatement(self, block):
+        return self._Statements(block.statements)
+
+    def _IfStatement(self, ifStatement):
+        readIt = self._readVariable(ifStatement.itSlot, IT_VARIABLE, ifStatement)
+        ifBlock = self._Statements(ifStatement.ifBlock)
+        elseIfs = tuple(
+            (self._Operand(elseIf.condition), self._Statements(elseIf.block))
+            for elseIf in ifStatement.elseIfs
+        )
+        elseBlock = None
+        if ifStatement.elseBlock is not None:
+            elseBlock = self._Statements(ifStatement.elseBlock)
+
+        def branch():
+            # only a WIN (or 1) runs the YA RLY block, or that of a MEBBE
+            if readIt() == True:
+                return ifBlock()
+
+            for condition, block in elseIfs:
+                if condition() == True:
+                    return block()
+
+            if elseBlock is not None:
+                return elseBlock()
+
+            return False
+
+        return branch
+
+    def _BreakStatement(self, breakStatement):
+        return lambda: True
+
+    def _FunctionDefinition(self, function):
+        # functions are compiled through their calls
+        return lambda: False
+
+    def _ReturnStatement(self, returnStatement):
+        returnCell = self.returnCell
+
+        if returnStatement.isTailCall:
+            arguments = self._arguments(returnStatement.value)
+
+            def tailCall():
+                returnCell[0] = [argument() for argument in arguments]
+                return TAIL_CALL
+
+            return tailCall
+
+        value = self._Operand(returnStatement.value)
+
+        def returnValue():
+            returnCell[0] = value()
+            return RETURN
+
+        return returnValue
+
+    def _CaseStatement(self, switchStatement):
+        values = self.values
+        readIt = self._readVariable(
+            switchStatement.itSlot, IT_VARIABLE, switchStatement
+        )
+        firstSlot, endSlot = switchStatement.localSlots
+        unsetSlots = [UNSET] * (endSlot - firstSlot)
+
+        jumpTable = switchStatement.jumpTable
+        defaultCase = switchStatement.defaultCase
+        caseBlocks = tuple(
+            self._Statements(case.block) for case in switchStatement.cases
+        )
+        caseCount = len(caseBlocks)
+
+        def switch():
+            caseIndex = jumpTable.get(caseKey(readIt()), defaultCase)
+            if caseIndex == caseCount:
+                return False
+
+            # falls through the following cases until a GTFO
+            values[firstSlot:endSlot] = unsetSlots
+            for caseIndex in range(caseIndex, caseCount):
+                ending = caseBlocks[caseIndex]()
+                if ending:
+                    return _afterBreak(ending)
+
+            return False
+
+        return switch
+
+    def _LoopStatement(self, loop):
+        values = self.values
+        counterSlot = loop.counterSlot
+        delta = loop.delta
+        add = OPERATIONS[TOKEN.ADDITION_OPERATION]
+        readCounter = self._readVariable(counterSlot, loop.counter, loop)
+        body = self._Statements(loop.body)
+
+        condition = None
+        if loop.condition is not None:
+            condition = self._Operand(loop.condition)
+        isTil = loop.conditionKeyword == "TIL"
+        countedLimit = loop.countedLimit
+        vectorizer = self.evaluator.vectorizer
+
+        collection = None
+        if loop.collection is not None:
+            collection = self._Operand(loop.collection)
+
+        hoists = tuple(
+            (self._invariantCell(invariant), self._Operand(invariant.expression))
+            for invariant in loop.invariants
+        )
+
+        def runLoop():
+            for cell, expression in hoists:
+                try:
+                    cell[0] = expression()
+                except (SyntaxError, NameError, ValueError):
+                    # left to fail where it is used
+                    cell[0] = NOT_HOISTED
+
+            if collection is not None:
+                collectionValue = collection()
+                try:
+                    items = bukkitItems(collectionValue)
+                except OPERATION_ERRORS as error:
+                    self._throwError(*describeError(error), loop)
+
+                for values[counterSlot] in items:
+                    ending = body()
+                    if ending:
+                        return _afterBreak(ending)
+
+                return False
+
+            if countedLimit is not None:
+                counterValues = counterRange(loop, values)
+                if counterValues is not None:
+                    if vectorizer is None or not vectorizer.run(
+                        loop, counterValues, values
+                    ):
+                        for values[counterSlot] in counterValues:
+                            ending = body()
+                            if ending:
+                                return _afterBreak(ending)
+
+                    values[counterSlot] = counterValues.stop
+                    return False
+
+            while True:
+                if condition is not None and bool(condition()) == isTil:
+                    break
+
+                ending = body()
+                if ending:
+                    return _afterBreak(ending)
+
+                try:
+                    values[counterSlot] = add(readCounter(), delta)
+                except OPERATION_ERRORS as error:
+                    self._throwError(*describeError(error), loop)
+
+            return False
+
+        return runLoop
+
+    def _arguments(self, call):
+        return tuple(self._Operand(argument) for argument in call.arguments)
+
+    def _FunctionCall(self, call):
+        cell = self._functionCell(call.function)
+        arguments = self._arguments(call)
+
+        def callFunction():
+            try:
+                return cell[0]([argument() for argument in arguments])
+            except RecursionError:
+                # raised by call past MAX_CALL_DEPTH, or by Python when its
+                # stack runs out first
+                self._throwError(
+                    ValueError, NESTED_CALLS_MESSAGE.format(call.name), call
+                )
+
+        return callFunction
+
+    def _functionCell(self, function):
+        if function not in self.functionCells:
+            cell = self.functionCells[function] = [None]
+            cell[0] = self._compileFunction(function)
+
+        return self.functionCells[function]
+
+    def _compileFunction(self, function):
+        callerValues = self.values
+        values = self.values = [UNSET] * len(function.slotNames)
+        try:
+            body = self._Statements(function.body)
+        finally:
+            self.values = callerValues
+
+        returnCell = self.returnCell
+        callDepthCell = self.callDepthCell
+        itSlot = function.itSlot
+        unsetSlots = [UNSET] * (len(values) - len(function.parameters))
+
+        def call(arguments):
+            if callDepthCell[0] == MAX_CALL_DEPTH:
+                raise RecursionError
+
+            callerFrame = values[:]
+            callDepthCell[0] += 1
+            try:
+                # a self tail call runs the body again on a new frame
+                while True:
+                    values[:] = arguments + unsetSlots
+                    ending = body()
+                    if ending is not TAIL_CALL:
+                        break
+                    arguments = returnCell[0]
+
+                if ending is RETURN:
+                    return returnCell[0]
+                if ending:
+                    return None
+
+                # without FOUND YR, a function gives the value of its IT
+                itValue = values[itSlot]
+                return None if itValue is UNSET else itValue
+            finally:
+                values[:] = callerFrame
+                callDepthCell[0] -= 1
+
+        cache = self.evaluator.functionCaches.get(function.name)
+        if cache is not None:
+            return cache.wrap(call)
+
+        return call
+
+    def _Operand(self, expression):
+        return self.expressionCompilers[type(expression)](expression)
+
+    def _Literal(self, literal):
+        value = literal.value
+        return lambda: value
+
+    def _Variable(self, variable):
+        return self._readVariable(variable.slot, variable.identifier, variable)
+
+    def _TwoOperandOperation(self, operation):
+        if operation.operator in ARITHMETIC_OPERATORS:
+            return self._ArithmeticOperation(operation)
+        if operation.operator in SHORT_CIRCUIT_VALUES:
+            return self._shortCircuit(
+                operation.operator, (operation.left, operation.right)
+            )
+
+        function = OPERATIONS[operation.operator]
+        firstOperand = self._Operand(operation.left)
+        secondOperand = self._Operand(operation.right)
+
+        def operate():
+            firstValue = firstOperand()
+            secondValue = secondOperand()
+            try:
+                return function(firstValue, secondValue)
+            except OPERATION_ERRORS as error:
+                self._throwError(*describeError(error), operation)
+
+        return operate
+
+    def _ArithmeticOperation(self, operation):
+        # the operator is called directly, and only YARN operands go through
+        # toNumber; a literal second operand is converted once, here
+        function = ARITHMETIC_OPERATORS[operation.operator]
+        firstOperand = self._Operand(operation.left)
+
+        secondNumber = self._literalNumber(operation.right)
+        if secondNumber is not None:
+
+            def operateOnNumber():
+                firstValue = firstOperand()
+                try:
+                    if isinstance(firstValue, YARN_TYPES):
+                        firstValue = toNumber(firstValue)
+                    return function(firstValue, secondNumber)
+                except OPERATION_ERRORS as error:
+                    self._throwError(*describeError(error), operation)
+
+            return operateOnNumber
+
+        secondOperand = self._Operand(operation.right)
+
+        def operate():
+            firstValue = firstOperand()
+            secondValue = secondOperand()
+            try:
+                if isinstance(firstValue, YARN_TYPES):
+                    firstValue = toNumber(firstValue)
+                if isinstance(secondValue, YARN_TYPES):
+                    secondValue = toNumber(secondValue)
+                return function(firstValue, secondValue)
+            except OPERATION_ERRORS as error:
+                self._throwError(*describeError(error), operation)
+
+        return operate
+
+    def _literalNumber(self, expression):
+        if not isinstance(expression, Literal) or expression.value is None:
+            return None
+
+        try:
+            return toNumber(expression.value)
+        except ValueError:
+            # a YARN that is not a number fails when the operation runs
+            return None
+
+    def _NotOperation(self, operation):
+        operand = self._Operand(operation.operand)
+        return lambda: not operand()
+
+    def _MultipleOperandOperation(self, operation):
+        if operation.operator in SHORT_CIRCUIT_VALUES:
+            return self._shortCircuit(operation.operator, operation.operands)
+
+        operands = tuple(self._Operand(operand) for operand in operation.operands)
+        return lambda: smoosh([operand() for operand in operands])
+
+    def _shortCircuit(self, operator, operands):
+        # the operands are evaluated until one decides the result
+        operands = tuple(self._Operand(operand) for operand in operands)
+        stopValue = SHORT_CIRCUIT_VALUES[operator]
+
+        if len(operands) == 2:
+            firstOperand, secondOperand = operands
+            if stopValue:
+                return lambda: bool(firstOperand() or secondOperand())
+            return lambda: bool(firstOperand() and secondOperand())
+
+        def shortCircuit():
+            for operand in operands:
+                if bool(operand()) is stopValue:
+                    return stopValue
+
+            return not stopValue
+
+        return shortCircuit
+
+    def _ExplicitTypecast(self, typecast):
+        operand = self._Operand(typecast.operand)
+        typeName = typecast.typeName
+
+        def cast():
+            value = operand()
+            try:
+                return typeCast(typeName, value)
+            except OPERATION_ERRORS as error:
+                self._throwError(*describeError(error), typecast)
+
+        return cast
+
+    def _Bukkit(self, bukkit):
+        items = tuple(self._Operand(item) for item in bukkit.items)
+        return lambda: Bukkit([item() for item in items])
+
+    def _Item(self, item):
+        bukkit = self._Operand(item.bukkit)
+        index = self._Operand(item.index)
+
+        def readItem():
+            bukkitValue = bukkit()
+            indexValue = index()
+            try:
+                return getItem(bukkitValue, indexValue)
+            except OPERATION_ERRORS as error:
+                self._throwError(*describeError(error), item)
+
+        return readItem
+
+    def _Size(self, size):
+        bukkit = self._Operand(size.bukkit)
+
+        def readSize():
+            bukkitValue = bukkit()
+            try:
+                return bukkitSize(bukkitValue)
+            except OPERATION_ERRORS as error:
+                self._throwError(*describeError(error), size)
+
+        return readSize
+
+    def _invariantCell(self, invariant):
+        return self.invariantCells.setdefault(invariant, [NOT_HOISTED])
+
+    def _InvariantExpression(self, invariant):
+        cell = self._invariantCell(invariant)
+        expression = self._Operand(invariant.expression)
+
+        def readInvariant():
+            value = cell[0]
+            if value is NOT_HOISTED:
+                return expression()
+
+            return value
+
+        return readInvariant
+
+
+def _afterBreak(ending):
+    # what a loop or switch ended by its block's ending returns: a GTFO
+    # stops there, a FOUND YR goes on to the function
+    return False if ending is True else ending
@@ -0,0 +1,67 @@
+class Environment:
+    """The variables of a scope, chained to the scope enclosing it.
+
+    A scope only holds the variables declared in it (I HAS A); reading a
+    variable looks it up in the scope, then in the enclosing ones. Writing a
+    variable (R, IS NOW A, GIMMEH, IT) changes it in the nearest scope that
+    has it, so writes to outer variables outlive the block; a variable no
+    scope has yet is created in the current one. Entering a block is a
+    matter of creating a child, whatever the number of variables.
+    """
+
+    __slots__ = ("variables", "parent")
+
+    def __init__(self, parent=None):
+        self.variables = {}
+        self.parent = parent
+
+    def child(self):
+        return Environment(self)
+
+    def declare(self, identifier, value):
+        self.variables[identifier] = value
+
+    def __getitem__(self, identifier):
+        environment = self
+        while environment is not None:
+            variables = environment.variables
+            if identifier in variables:
+                return variables[identifier]
+            environment = environment.parent
+
+        raise KeyError(identifier)
+
+    def __setitem__(self, identifier, value):
+        environment = self
+        while environment is not None:
+            variables = environment.variables
+            if identifier in variables:
+                variables[identifier] = value
+                return
+            environment = environment.parent
+
+        self.variables[identifier] = value
+
+    def __contains__(self, identifier):
+        environment = self
+        while environment is not None:
+            if identifier in environment.variables:
+                return True
+            environment = environment.parent
+
+        return False
+
+    def flatten(self):
+        """Returns the variables visible from this scope as one dictionary,
+        outer ones first."""
+        scopes = []
+        environment = self
+        while environment is not None:
+            scopes.append(environment.variables)
+            environment = environment.parent
+
+        flattened = {}
+        for variables in reversed(scopes):
+            flattened.update(variables)
+
+        return flattened
@@ -1,737 +1,621 @@
-from copy import deepcopy
+import sys
+from contextlib import contextmanager
 
 import easygui
 
+from .bytecode import BytecodeCompiler
+from .closure_compiler import ClosureCompiler
+from .bukkit import Bukkit
+from .function_cache import DEFAULT_CACHE_SIZE, MISSING, FunctionCache
+from .optimizer import Optimizer
+from .output import ListSink
+from .parser import Parser
+from .resolver import Frame, Resolver
+from .runtime import (
+    IT_VARIABLE,
+    MAX_CALL_DEPTH,
+    NESTED_CALLS_MESSAGE,
+    OPERATION_ERRORS,
+    OPERATIONS,
+    SHORT_CIRCUIT_VALUES,
+    UNSET,
+    bukkitItems,
+    bukkitSize,
+    caseKey,
+    counterRange,
+    describeError,
+    getItem,
+    setItem,
+    smoosh,
+    toYarn,
+    typeCast,
+)
+from .source import Source
+from .syntax_tree import (
+    Assignment,
+    BinaryOperation,
+    Block,
+    Break,
+    Declaration,
+    ExpressionStatement,
+    FunctionCall,
+    FunctionDefinition,
+    IfStatement,
+    Input,
+    Invariant,
+    Item,
+    ItemAssignment,
+    Literal,
+    Loop,
+    MakeBukkit,
+    MultipleOperandOperation,
+    NotOperation,
+    Output,
+    Recast,
+    Return,
+    Size,
+    SwitchStatement,
+    Typecast,
+    Variable,
+)
 from .token_enum import TOKEN
-from .utils import isEmpty, toNumber
+from .transpiler import Transpiler
+from .vectorizer import LoopVectorizer
+from .virtual_machine import VirtualMachine
 
 
-class Evaluator:
-    def evaluate(self, sourceCode, tokens):
-        self.currentLineNumber = 1
-        self.sourceCodeLines = sourceCode.split("\n")
-        self.tokens = tokens
-
-        self.memory = {}
-        self.memoryStack = []
-        self.outputBuffer = ""
-
-        self.canGTFO = False
+ENGINES = ("tree", "closure", "python", "bytecode")
 
-        return self._Program()
+# returned by a statement executor for GTFO
+BREAK = object()
 
-    def _nextTokenIs(self, tokenType):
-        if isEmpty(self.tokens):
-            return None
-
-        return self.tokens[0].lexemeType == tokenType
+# returned by a statement executor for FOUND YR, with the value in
+# returnValue, and for a FOUND YR of a self tail call, with the arguments of
+# the call in tailCallArguments
+RETURN = object()
+TAIL_CALL = object()
 
-    def _popNextToken(self):
-        if isEmpty(self.tokens):
-            return None
+# the Python stack depth allowed while a program runs: enough for
+# MAX_CALL_DEPTH nested calls on the engines whose calls nest Python calls,
+# each of which takes up to 50 Python frames
+PYTHON_STACK_DEPTH = 50 * MAX_CALL_DEPTH
 
-        self._updateCurrentLineNumber()
 
-        return self.tokens.pop(0)
+@contextmanager
+def _deepPythonStack():
+    # since Python 3.11, a Python function calling another does not use the
+    # C stack, so the limit can be raised without crashing the process
+    limit = sys.getrecursionlimit()
+    if sys.version_info >= (3, 11):
+        sys.setrecursionlimit(max(limit, PYTHON_STACK_DEPTH))
 
-    def _updateCurrentLineNumber(self):
-        if self._nextTokenIs(TOKEN.LINEBREAK):
-            self.currentLineNumber += 1
+    try:
+        yield
+    finally:
+        sys.setrecursionlimit(limit)
 
-    def _expectNextToken(self, tokenType, errorMessage):
-        if self._nextTokenIs(tokenType):
-            self._popNextToken()
-        else:
-            self._throwError(SyntaxError, errorMessage)
 
-    def _assign(self, identifier, value):
-        self.memory[identifier] = value
-
-    def _getValue(self, identifier):
-        if identifier in self.memory:
-            return self.memory.get(identifier)
-
-        self._throwError(NameError, f"{identifier} is not defined")
-
-    def _enterNewScope(self):
-        self.memoryStack.append(deepcopy(self.memory))
+class Evaluator:
+    """Runs a program from the syntax tree built by the Parser.
+
+    The "tree" engine walks the tree node by node. The "closure" engine first
+    compiles the tree into nested Python closures (see ClosureCompiler), so
+    running it no longer dispatches on node types. The "python" engine
+    translates the tree into Python source and leaves running it to CPython
+    (see Transpiler), or runs it as the "closure" engine would when its
+    blocks nest deeper than CPython compiles. The "bytecode" engine compiles
+    it into Bytecode for the VirtualMachine; compileBytecode and runBytecode
+    split the two steps, so bytecode can be saved and run later without the
+    source.
+
+    Output goes to an OutputSink: the one given as output, or else a new
+    ListSink for every run, whose content outputBuffer gives. GIMMEH shows
+    the sink's tail above its prompt.
+
+    With optimize, the tree first goes through the Optimizer, and
+    removedNodeCount tells how many nodes it removed. With vectorize, the
+    "tree" and "closure" engines run counted loops of pure arithmetic as
+    NumPy array operations when NumPy is installed (see LoopVectorizer).
+
+    The tree engine runs statements from an explicit work stack rather than
+    by recursing into the blocks, so neither long programs nor deeply nested
+    blocks grow the Python stack.
+
+    Before running, the Resolver gives every variable a slot; memory is the
+    Frame holding their values, and its flatten method gives the variables
+    of the outermost scope.
+
+    Every function call runs on a new frame holding the function's
+    parameters and variables, and a FOUND YR of a call to the same function
+    reuses it instead of nesting, so tail recursion runs in constant stack
+    depth on every engine. Other recursion is limited to MAX_CALL_DEPTH
+    function bodies running at once on every engine, and a call past it
+    fails with a ValueError at the call. Except on the "bytecode" engine,
+    calls nest Python calls, so the Python stack limit is raised while a
+    program runs; where that is not safe (before Python 3.11), running out
+    of Python stack first fails with the same error. The results of the
+    functions named in pureFunctions are kept in a FunctionCache of
+    cacheSize entries each, which functionCaches holds by function name.
+
+    BUKKITs are Bukkit values, passed around by reference like in Python;
+    the items are read and set through the runtime functions, which every
+    engine shares, and a loop going through EACH item iterates the Bukkit.
+    """
+
+    def __init__(
+        self,
+        engine="tree",
+        optimize=False,
+        output=None,
+        vectorize=False,
+        pureFunctions=(),
+        cacheSize=DEFAULT_CACHE_SIZE,
+    ):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}")
+
+        self.engine = engine
+        self.optimize = optimize
+        self.vectorize = vectorize
+        self.pureFunctions = tuple(pureFunctions)
+        self.cacheSize = cacheSize
+        self.removedNodeCount = 0
+        self._outputSink = output
+
+        self.statementExecutors = {
+            Declaration: self._Declaration,
+            Assignment: self._AssignmentStatement,
+            Recast: self._RecastingStatement,
+            Output: self._Output,
+            Input: self._Input,
+            ExpressionStatement: self._ExpressionStatement,
+            Block: self._BlockStatement,
+            IfStatement: self._IfStatement,
+            SwitchStatement: self._CaseStatement,
+            Loop: self._LoopStatement,
+            Break: self._BreakStatement,
+            FunctionDefinition: self._FunctionDefinition,
+            Return: self._ReturnStatement,
+            ItemAssignment: self._ItemAssignment,
+        }
+
+        self.expressionEvaluators = {
+            Literal: self._Literal,
+            Variable: self._Variable,
+            BinaryOperation: self._TwoOperandOperation,
+            NotOperation: self._NotOperation,
+            MultipleOperandOperation: self._MultipleOperandOperation,
+            Typecast: self._ExplicitTypecast,
+            Invariant: self._InvariantExpression,
+            FunctionCall: self._FunctionCall,
+            MakeBukkit: self._Bukkit,
+            Item: self._Item,
+            Size: self._Size,
+        }
+
+        self._reset(None)
+
+    def evaluate(self, tokens, sourceCode=None):
+        program = self._parse(tokens, sourceCode)
 
-    def _exitCurrentScope(self):
-        self.memory = self.memoryStack.pop()
+        try:
+            if self.engine == "bytecode":
+                VirtualMachine(self).run(BytecodeCompiler().compile(program))
+            else:
+                with _deepPythonStack():
+                    if self.engine == "closure":
+                        ClosureCompiler(self).compile(program)()
+                    elif self.engine == "python":
+                        self._compilePython(program)()
+                    else:
+                        self._Statements(program.statements)
+        finally:
+            self.output.flush()
+
+    @property
+    def outputBuffer(self):
+        """Everything printed by the last run, when output is a ListSink."""
+        return self.output.getvalue()
+
+    def transpile(self, tokens, sourceCode=None):
+        """Returns the Python source the "python" engine would run, or raises
+        a SyntaxError when CPython could not compile it."""
+        program = self._parse(tokens, sourceCode)
+        transpiler = Transpiler(self)
+        pythonSource = transpiler.transpile(program)
+        transpiler.compileSource(pythonSource)
+
+        return pythonSource
+
+    def compileBytecode(self, tokens, sourceCode=None):
+        program = self._parse(tokens, sourceCode)
+        return BytecodeCompiler().compile(program)
+
+    def runBytecode(self, bytecode, sourceCode=None, opcodeCounts=None):
+        # the source is only needed to show the failing line on errors
+        self._reset(sourceCode)
+        try:
+            VirtualMachine(self).run(bytecode, opcodeCounts)
+        finally:
+            self.output.flush()
 
-    def _throwError(self, errorType, message):
-        errorArgs = (
-            None,
-            self.currentLineNumber,
-            0,  # not yet implemented
-            self.sourceCodeLines[self.currentLineNumber - 1],
-        )
+    def _compilePython(self, program):
+        try:
+            return Transpiler(self).compile(program)
+        except SyntaxError:
+            # blocks nested deeper than CPython compiles run as closures
+            return ClosureCompiler(self).compile(program)
 
-        raise errorType(message, errorArgs)
+    def _parse(self, tokens, sourceCode):
+        self._reset(sourceCode)
+        program = Parser().parse(tokens, self.source)
 
-    def _Program(self):
+        if self.optimize:
+            optimizer = Optimizer()
+            program = optimizer.optimize(program)
+            self.removedNodeCount = optimizer.removedNodeCount
 
-        while self._nextTokenIs(TOKEN.LINEBREAK):
-            self._popNextToken()
+        Resolver(self.source).resolve(program)
+        self.memory = Frame(program.slotNames, program.globalSlots)
+        self.values = self.memory.values
 
-        self._expectNextToken(TOKEN.CODE_DELIMITER, 'Missing starting keyword "HAI"')
+        return program
 
-        self._expectNextToken(TOKEN.LINEBREAK, "Missing linebreak")
-        while self._nextTokenIs(TOKEN.LINEBREAK):
-            self._popNextToken()
+    def _reset(self, sourceCode):
+        if sourceCode is None or isinstance(sourceCode, str):
+            sourceCode = Source.fromText(sourceCode or "")
 
-        self._Statements()
+        self.source = sourceCode
 
-        self._expectNextToken(TOKEN.CODE_DELIMITER, 'Missing ending keyword "KTHXBYE"')
+        self.memory = Frame()
+        # the values of the frame running, the program's or a function call's
+        self.values = self.memory.values
+        self.output = self._outputSink or ListSink()
 
-    def _Statements(self):
-        statement = (
-            self._Declaration()
-            or self._Output()
-            or self._RecastingStatement()
-            or self._AssignmentStatement()
-            or self._LoopStatement()
-            or self._Input()
-            or self._IfStatement()
-            or self._CaseStatement()
-            or self._BreakStatement()
-        )
+        # values of the Invariant nodes of the loops running
+        self.invariantValues = {}
 
-        if statement is None:
-            statement = self._Operand()
-            if statement is not None:
-                self._assign(TOKEN.IT_VARIABLE, statement)
+        self.vectorizer = LoopVectorizer() if self.vectorize else None
 
-        if statement is not None:
+        # the number of function bodies running
+        self.callDepth = 0
 
-            self._expectNextToken(TOKEN.LINEBREAK, "Expected linebreak")
-            while self._nextTokenIs(TOKEN.LINEBREAK):
-                self._popNextToken()
+        self.functionCaches = {
+            name: FunctionCache(self.cacheSize) for name in self.pureFunctions
+        }
 
-            self._Statements()
+    def _assign(self, slot, value):
+        self.values[slot] = value
 
-    def _Declaration(self):
-        if self._nextTokenIs(TOKEN.VARIABLE_DECLARATION):
-            self._popNextToken()
+    def _getValue(self, slot, identifier, node):
+        value = self.values[slot]
+        if value is UNSET:
+            self._throwError(NameError, f"{identifier} is not defined", node)
 
-            if self._nextTokenIs(TOKEN.VARIABLE_IDENTIFIER):
-                variableIdentifierToken = self._popNextToken()
-                variableIdentifier = variableIdentifierToken.lexeme
-                value = None
+        return value
 
-                if self._nextTokenIs(TOKEN.VARIABLE_ASSIGNMENT):
-                    self._popNextToken()
+    def _throwError(self, errorType, message, node):
+        errorArgs = (
+            None,
+            node.line,
+            node.column,
+            self.source.line(node.line),
+        )
 
-                    value = self._Operand()
-                    if value is None:
-                        self._throwError(SyntaxError, "Expected an expression")
+        raise errorType(message, errorArgs)
 
-                self._assign(variableIdentifier, value)
-                return True
+    def _Statements(self, statements):
+        # an executor returns None, BREAK, RETURN, TAIL_CALL, or the
+        # statements of a block to run next, with whether a GTFO ends them
+        # (loops and switches). The work stack holds the blocks being run,
+        # innermost last, and going back to the for loop resumes the
+        # iterator where it stopped. Returns how the statements ended: None
+        # when they all ran, or BREAK, RETURN or TAIL_CALL when a function's
+        # body is left.
+        statementExecutors = self.statementExecutors
+        work = [(iter(statements), False)]
+
+        while work:
+            for statement in work[-1][0]:
+                nextBlock = statementExecutors[type(statement)](statement)
+                if nextBlock is not None:
+                    break
+            else:
+                work.pop()
+                continue
 
-            self._throwError(SyntaxError, "Expected a variable identifier")
+            if nextBlock is BREAK:
+                # leaves the blocks up to the innermost loop or switch, or
+                # the function
+                while True:
+                    if not work:
+                        return BREAK
+                    if work.pop()[1]:
+                        break
+            elif nextBlock is RETURN or nextBlock is TAIL_CALL:
+                return nextBlock
+            else:
+                work.append(nextBlock)
 
         return None
 
-    def _Output(self):
-        if self._nextTokenIs(TOKEN.OUTPUT_KEYWORD):
-            self._popNextToken()
-
-            value = self._Operand()
-            if value is None:
-                self._throwError(SyntaxError, "Expected an operand")
-
-            self._output(value)
-
-            while not self._nextTokenIs(TOKEN.LINEBREAK):
-                if self._nextTokenIs(TOKEN.OPERAND_SEPARATOR):
-                    self._popNextToken()
-
-                value = self._Operand()
-                if value is None:
-                    self._throwError(SyntaxError, "Expected an operand")
+    def _Declaration(self, declaration):
+        value = None
+        if declaration.value is not None:
+            value = self._Operand(declaration.value)
 
-                self._output(value)
+        self._assign(declaration.slot, value)
 
-            self._output("\n")
+    def _Output(self, output):
+        for operand in output.operands:
+            self._output(self._Operand(operand))
 
-            return True
-
-        return None
+        self._output("\n")
 
     def _output(self, value):
-        self.outputBuffer += self._typeCast("YARN", value)
-
-    def _Input(self):
-        children = []
-
-        if self._nextTokenIs(TOKEN.INPUT_KEYWORD):
-            self._popNextToken()
-
-            if self._nextTokenIs(TOKEN.VARIABLE_IDENTIFIER):
-                variableIdentifierToken = self._popNextToken()
-                variableIdentifier = variableIdentifierToken.lexeme
-
-                value = easygui.enterbox(self.outputBuffer)
-                self._assign(variableIdentifier, value)
-
-                self._output(value)
-                self._output("\n")
-
-                return True
-
-        return None
-
-    def _Operand(self):
-        literalValue = self._Literal()
-        if literalValue is not None:
-            return literalValue
-
-        if self._nextTokenIs(TOKEN.VARIABLE_IDENTIFIER):
-            identifierToken = self._popNextToken()
-            return self._getValue(identifierToken.lexeme)
-
-        operationValue = self._TwoOperandOperation()
-        if operationValue is not None:
-            return operationValue
-
-        operationValue = self._NotOperation()
-        if operationValue is not None:
-            return operationValue
-
-        operationValue = self._MultipleOperandOperation()
-        if operationValue is not None:
-            return operationValue
-
-        explicitTypecast = self._ExplicitTypecast()
-        if explicitTypecast is not None:
-            return explicitTypecast
-
-        return None
-
-    def _Literal(self):
-        if self._nextTokenIs(TOKEN.BOOL_LITERAL):
-            boolToken = self._popNextToken()
-            return True if boolToken.lexeme == "WIN" else False
-
-        if self._nextTokenIs(TOKEN.FLOAT_LITERAL):
-            integerToken = self._popNextToken()
-            return float(integerToken.lexeme)
-
-        if self._nextTokenIs(TOKEN.INTEGER_LITERAL):
-            integerToken = self._popNextToken()
-            return int(integerToken.lexeme)
-
-        if self._nextTokenIs(TOKEN.STRING_LITERAL):
-            stringToken = self._popNextToken()
-
-            return stringToken.lexeme[1:-1]  # remove quotes
-
-        if self._nextTokenIs(TOKEN.TYPE_LITERAL):
-            typeToken = self._popNextToken()
-            return typeToken.lexeme  # !!! ?????
-
-        return None
-
-    def _operate(self, operationToken, a, b):
-        try:
-            if operationToken.lexemeType == TOKEN.ADDITION_OPERATION:
-                return toNumber(a) + toNumber(b)
-            if operationToken.lexemeType == TOKEN.SUBTRACTION_OPERATION:
-                return toNumber(a) - toNumber(b)
-            if operationToken.lexemeType == TOKEN.MULTIPLICATION_OPERATION:
-                return toNumber(a) * toNumber(b)
-            if operationToken.lexemeType == TOKEN.QUOTIENT_OPERATION:
-                return toNumber(a) / toNumber(b)
-            if operationToken.lexemeType == TOKEN.MODULO_OPERATION:
-                return toNumber(a) % toNumber(b)
-            if operationToken.lexemeType == TOKEN.MAX_OPERATION:
-                return max(toNumber(a), toNumber(b))
-            if operationToken.lexemeType == TOKEN.MIN_OPERATION:
-                return min(toNumber(a), toNumber(b))
-            if operationToken.lexemeType == TOKEN.AND_OPERATION:
-                return bool(a) and bool(b)
-            if operationToken.lexemeType == TOKEN.OR_OPERATION:
-                return bool(a) or bool(b)
-            if operationToken.lexemeType == TOKEN.XOR_OPERATION:
-                return (bool(a) and not bool(b)) or (not bool(a) and bool(b))
-
-            if not (isinstance(a, (int, float)) and isinstance(b, (int, float))):
-                self._throwError(SyntaxError, "Invalid Type")
-
-            if operationToken.lexemeType == TOKEN.EQUAL_TO_OPERATION:
-                return toNumber(a) == toNumber(b)
-            if operationToken.lexemeType == TOKEN.NOT_EQUAL_TO_OPERATION:
-                return toNumber(a) != toNumber(b)
-        except ValueError as error:
-            self._throwError(ValueError, error.args[0])
-
-    def _TwoOperandOperation(self):
-        if (
-            self._nextTokenIs(TOKEN.ADDITION_OPERATION)
-            or self._nextTokenIs(TOKEN.SUBTRACTION_OPERATION)
-            or self._nextTokenIs(TOKEN.MULTIPLICATION_OPERATION)
-            or self._nextTokenIs(TOKEN.QUOTIENT_OPERATION)
-            or self._nextTokenIs(TOKEN.MODULO_OPERATION)
-            or self._nextTokenIs(TOKEN.MAX_OPERATION)
-            or self._nextTokenIs(TOKEN.MIN_OPERATION)
-            or self._nextTokenIs(TOKEN.AND_OPERATION)
-            or self._nextTokenIs(TOKEN.OR_OPERATION)
-            or self._nextTokenIs(TOKEN.XOR_OPERATION)
-            or self._nextTokenIs(TOKEN.EQUAL_TO_OPERATION)
-            or self._nextTokenIs(TOKEN.NOT_EQUAL_TO_OPERATION)
-        ):
-            operationToken = self._popNextToken()
-
-            firstOperandValue = self._Operand()
-            if firstOperandValue is not None:
-                self._expectNextToken(TOKEN.OPERAND_SEPARATOR, 'Missing keyword "AN"')
-
-                secondOperandValue = self._Operand()
-                if secondOperandValue is not None:
-                    return self._operate(
-                        operationToken, firstOperandValue, secondOperandValue
-                    )
-
-                self._throwError(SyntaxError, "Expected an operand")
-
-            self._throwError(SyntaxError, "Expected an operand")
-
-        return None
-
-    def _NotOperation(self):
-        if self._nextTokenIs(TOKEN.NOT_OPERATION):
-            self._popNextToken()
-
-            value = self._Operand()
-            if value is not None:
-                return not value
-
-            self._throwError(SyntaxError, "Expected an operand")
-
-        return None
-
-    def _MultipleOperandOperation(self):
-        operandValues = []
-
-        if (
-            self._nextTokenIs(TOKEN.INFINITE_ARITY_AND_OPERATION)
-            or self._nextTokenIs(TOKEN.INFINITE_ARITY_OR_OPERATION)
-            or self._nextTokenIs(TOKEN.CONCATENATION_OPERATION)
-        ):
-            operationToken = self._popNextToken()
-
-            if operationToken.lexemeType == TOKEN.CONCATENATION_OPERATION:
-                needsMkay = False
-            else:
-                needsMkay = True
-
-            firstOperandValue = self._Operand()
-            if firstOperandValue is not None:
-                operandValues.append(firstOperandValue)
-
-                self._expectNextToken(TOKEN.OPERAND_SEPARATOR, 'Missing keyword "AN"')
-
-                secondOperandValue = self._Operand()
-                if secondOperandValue is not None:
-                    operandValues.append(secondOperandValue)
-
-                    while self._nextTokenIs(TOKEN.OPERAND_SEPARATOR):
-                        self._popNextToken()
-
-                        operandValue = self._Operand()
-                        if operandValue is not None:
-                            operandValues.append(operandValue)
-                        else:
-                            self._throwError(SyntaxError, "Expected an operand")
-
-                    if needsMkay:
-                        self._expectNextToken(
-                            TOKEN.INFINITE_ARITY_DELIMITER, 'Missing keyword "MKAY"'
-                        )
-
-                    if operationToken.lexemeType == TOKEN.INFINITE_ARITY_AND_OPERATION:
-                        return all(operandValues)
-                    if operationToken.lexemeType == TOKEN.INFINITE_ARITY_OR_OPERATION:
-                        return any(operandValues)
-                    if operationToken.lexemeType == TOKEN.CONCATENATION_OPERATION:
-                        return "".join(operandValues)
-
-                self._throwError(SyntaxError, "Expected an operand")
-
-            self._throwError(SyntaxError, "Expected an operand")
-
-        return None
-
-    def _typeCast(self, type, value):
-        if isinstance(value, str):
-            return value
+        self.output.write(toYarn(value))
 
-        if type == "TROOF":
-            return bool(value)
+    def _Input(self, input):
+        value = easygui.enterbox(self.output.tail())
+        self._assign(input.slot, value)
 
-        try:
-            if type == "NUMBAR":
-                return float(value) if value != None else 0.0
-
-            if type == "NUMBR":
-                return int(value) if value != None else 0
-
-        except ValueError as error:
-            self._throwError(ValueError, error.args[0])
+        self._output(value)
+        self._output("\n")
 
-        if type == "YARN":
-            if value == None:
-                return ""
+    def _ExpressionStatement(self, statement):
+        self._assign(statement.itSlot, self._Operand(statement.expression))
 
-            if isinstance(value, bool):
-                return "WIN" if value else "FAIL"
+    def _AssignmentStatement(self, assignment):
+        self._assign(assignment.slot, self._Operand(assignment.value))
 
-            if isinstance(value, int) or isinstance(value, float):
-                return str(round(value, 2))
+    def _ItemAssignment(self, assignment):
+        bukkit = self._Operand(assignment.bukkit)
+        index = self._Operand(assignment.index)
+        value = self._Operand(assignment.value)
+        self._runtime(setItem, (bukkit, index, value), assignment)
 
-    def _ExplicitTypecast(self):
-        if self._nextTokenIs(TOKEN.EXPLICIT_TYPECASTING_KEYWORD):
-            self._popNextToken()
+    def _RecastingStatement(self, recast):
+        value = self._getValue(recast.slot, recast.identifier, recast)
+        self._assign(recast.slot, self._typeCast(recast.typeName, value, recast))
 
-            if self._nextTokenIs(TOKEN.VARIABLE_IDENTIFIER):
-                variableIdentifierToken = self._popNextToken()
-                variableIdentifier = variableIdentifierToken.lexeme
-                value = self._getValue(variableIdentifier)
+    def _BlockStatement(self, block):
+        return iter(block.statements), False
 
-                if self._nextTokenIs(TOKEN.TYPE_LITERAL):
-                    typeToken = self._popNextToken()
+    def _IfStatement(self, ifStatement):
+        # only a WIN (or 1) runs the YA RLY block, or that of a MEBBE
+        if self._getValue(ifStatement.itSlot, IT_VARIABLE, ifStatement) == True:
+            return iter(ifStatement.ifBlock), False
 
-                    return self._typeCast(typeToken.lexeme, value)
+        for elseIf in ifStatement.elseIfs:
+            if self._Operand(elseIf.condition) == True:
+                return iter(elseIf.block), False
 
-                self._throwError(SyntaxError, "Expected a type")
-
-            self._throwError(SyntaxError, "Expected a variable")
+        if ifStatement.elseBlock is not None:
+            return iter(ifStatement.elseBlock), False
 
         return None
 
-    def _AssignmentStatement(self):
-
-        if self._nextTokenIs(TOKEN.VARIABLE_IDENTIFIER):
-            variableIdentifierToken = self._popNextToken()
-            variableIdentifier = variableIdentifierToken.lexeme
-            value = None
-
-            if variableIdentifier not in self.memory.keys():
-                self._throwError(SyntaxError, "Variable not declared")
-
-            if self._nextTokenIs(TOKEN.VARIABLE_ASSIGNMENT):
-                print("assigning var")
-                self._popNextToken()
-
-                value = self._Operand()
-                if value is None:
-                    self._throwError(SyntaxError, "Expected operand")
-
-                self._assign(variableIdentifier, value)
-
-                return True
-
-            self.tokens.insert(0, variableIdentifierToken)
-
-            return None
+    def _BreakStatement(self, breakStatement):
+        return BREAK
 
+    def _FunctionDefinition(self, function):
+        # functions are found through their calls
         return None
 
-    def _RecastingStatement(self):
-
-        if self._nextTokenIs(TOKEN.VARIABLE_IDENTIFIER):
-            variableIdentifierToken = self._popNextToken()
-            variableIdentifier = variableIdentifierToken.lexeme
-            value = None
-
-            if variableIdentifier not in self.memory.keys():
-                self._throwError(SyntaxError, "Variable not declared")
-
-            if self._nextTokenIs(TOKEN.RECASTING_KEYWORD):
-                print("recasting var")
-                self._popNextToken()
-
-                value = self._getValue(variableIdentifier)
-
-                if self._nextTokenIs(TOKEN.TYPE_LITERAL):
-                    typeToken = self._popNextToken()
-
-                    typedValue = self._typeCast(typeToken.lexeme, value)
-
-                    self._assign(variableIdentifier, typedValue)
-
-                    return True
+    def _ReturnStatement(self, returnStatement):
+        if returnStatement.isTailCall:
+            self.tailCallArguments = self._arguments(returnStatement.value)
+            return TAIL_CALL
 
-                self._throwError(SyntaxError, "Expected operand")
+        self.returnValue = self._Operand(returnStatement.value)
+        return RETURN
 
-            self.tokens.insert(0, variableIdentifierToken)
+    def _CaseStatement(self, switchStatement):
+        itValue = self._getValue(switchStatement.itSlot, IT_VARIABLE, switchStatement)
+        caseIndex = switchStatement.jumpTable.get(
+            caseKey(itValue), switchStatement.defaultCase
+        )
 
+        cases = switchStatement.cases
+        if caseIndex == len(cases):
             return None
 
-        return None
-
-    def _IfStatement(self):
+        # falls through the following cases until a GTFO
+        firstSlot, endSlot = switchStatement.localSlots
+        self.values[firstSlot:endSlot] = [UNSET] * (endSlot - firstSlot)
 
-        if self._nextTokenIs(TOKEN.IF_ELSE_DELIMITER):
-            self._popNextToken()
+        return self._caseStatements(cases, caseIndex), True
 
-            statementBlockDict = {}
+    def _caseStatements(self, cases, firstCase):
+        for caseIndex in range(firstCase, len(cases)):
+            yield from cases[caseIndex].block
 
-            self._expectNextToken(TOKEN.LINEBREAK, "Expected a linebreak")
-            self._expectNextToken(TOKEN.IF_STATEMENT_KEYWORD, "Expected 'YA RLY'")
-            self._expectNextToken(TOKEN.LINEBREAK, "Expected a linebreak")
+    def _LoopStatement(self, loop):
+        return self._loopStatements(loop), True
 
-            while self._nextTokenIs(TOKEN.LINEBREAK):
-                self._popNextToken()
+    def _loopStatements(self, loop):
+        # yields the statements of every iteration; the condition and the
+        # counter are handled between them, when _Statements asks for more
+        for invariant in loop.invariants:
+            self._hoist(invariant)
 
-            ifBlockTokens = []
-            while not (
-                self._nextTokenIs(TOKEN.ELSE_STATEMENT_KEYWORD)
-                or self._nextTokenIs(TOKEN.FLOW_CONTROL_STATEMENTS_DELIMITER)
+        if loop.collection is not None:
+            values = self.values
+            collection = self._Operand(loop.collection)
+            for values[loop.counterSlot] in self._runtime(
+                bukkitItems, (collection,), loop
             ):
-                ifBlockTokens.append(self._popNextToken())
-
-            statementBlockDict[self._getValue(TOKEN.IT_VARIABLE)] = ifBlockTokens
-
-            if self._nextTokenIs(TOKEN.ELSE_STATEMENT_KEYWORD):
-                self._popNextToken()
-
-                self._expectNextToken(TOKEN.LINEBREAK, "Expected a linebreak")
-
-                while self._nextTokenIs(TOKEN.LINEBREAK):
-                    self._popNextToken()
-
-                elseBlockTokens = []
-                while not self._nextTokenIs(TOKEN.FLOW_CONTROL_STATEMENTS_DELIMITER):
-                    elseBlockTokens.append(self._popNextToken())
-
-                if True not in statementBlockDict.keys():
-                    statementBlockDict[True] = elseBlockTokens
-
-            self._expectNextToken(
-                TOKEN.FLOW_CONTROL_STATEMENTS_DELIMITER, "Expected 'OIC'"
-            )
-
-            if True in statementBlockDict.keys():
-                remainingTokens = self.tokens
-
-                currentLineNumber = self.currentLineNumber
-                self.tokens = statementBlockDict[True]
-                self.currentLineNumber = 0
-
-                self._enterNewScope()
-                self._Statements()
-                self._exitCurrentScope()
-
-                self.tokens = remainingTokens
-                self.currentLineNumber = currentLineNumber
-
-            return True
-
-        return None
-
-    def _BreakStatement(self):
-
-        if self.canGTFO:
-
-            if self._nextTokenIs(TOKEN.BREAK_STATEMENT):
-
-                self.tokens = []
-                self.canGTFO = False
-                return None
-
-        return None
-
-    def _CaseStatement(self):
-
-        if self._nextTokenIs(TOKEN.SWITCH_CASE_STATEMENT_DELIMITER):
-            self._popNextToken()
-
-            statementBlockLocation = {}
-            caseCodeBlock = []
-            it_var = self._getValue(TOKEN.IT_VARIABLE)
-
-            self._expectNextToken(TOKEN.LINEBREAK, "Expected a linebreak")
-            self._expectNextToken(TOKEN.CASE_KEYWORD, "Expected keyword 'OMG'")
-
-            operand = self._Operand()
-            if operand is not None:
-
-                self._expectNextToken(TOKEN.LINEBREAK, "Expected a linebreak")
-
-                while self._nextTokenIs(TOKEN.LINEBREAK):
-                    self._popNextToken()
-
-                statementBlockLocation[str(operand)] = 0
-
-                while not (
-                    self._nextTokenIs(TOKEN.CASE_KEYWORD)
-                    or self._nextTokenIs(TOKEN.DEFAULT_CASE_KEYWORD)
-                    or self._nextTokenIs(TOKEN.FLOW_CONTROL_STATEMENTS_DELIMITER)
+                yield from loop.body
+            return
+
+        if loop.countedLimit is not None:
+            values = self.values
+            counterValues = counterRange(loop, values)
+            if counterValues is not None:
+                vectorizer = self.vectorizer
+                if vectorizer is None or not vectorizer.run(
+                    loop, counterValues, values
                 ):
-                    caseCodeBlock.append(self._popNextToken())
-
-                while True:
-                    if self._nextTokenIs(TOKEN.CASE_KEYWORD):
-                        self._popNextToken()
-
-                        operand = self._Operand()
-                        if operand is not None:
-
-                            while self._nextTokenIs(TOKEN.LINEBREAK):
-                                self._popNextToken()
-
-                            if str(it_var) not in statementBlockLocation.keys():
-                                statementBlockLocation[str(operand)] = len(
-                                    caseCodeBlock
-                                )
-
-                            while not (
-                                self._nextTokenIs(TOKEN.CASE_KEYWORD)
-                                or self._nextTokenIs(
-                                    TOKEN.FLOW_CONTROL_STATEMENTS_DELIMITER
-                                )
-                                or self._nextTokenIs(TOKEN.DEFAULT_CASE_KEYWORD)
-                            ):
-                                caseCodeBlock.append(self._popNextToken())
-
-                        else:
-                            self._throwError(SyntaxError, "Missing Operand")
-                    else:
-                        break
-
-                if self._nextTokenIs(TOKEN.DEFAULT_CASE_KEYWORD):
-                    self._popNextToken()
-
-                    while self._nextTokenIs(TOKEN.LINEBREAK):
-                        self._popNextToken()
-
-                    if str(it_var) not in statementBlockLocation.keys():
-                        statementBlockLocation[str(it_var)] = len(caseCodeBlock)
-
-                    while not (
-                        self._nextTokenIs(TOKEN.FLOW_CONTROL_STATEMENTS_DELIMITER)
-                    ):
-                        caseCodeBlock.append(self._popNextToken())
-
-                self._expectNextToken(
-                    TOKEN.FLOW_CONTROL_STATEMENTS_DELIMITER, "Expected 'OIC'"
-                )
+                    for values[loop.counterSlot] in counterValues:
+                        yield from loop.body
 
-                if str(it_var) in statementBlockLocation.keys():
+                values[loop.counterSlot] = counterValues.stop
+                return
 
-                    currentLineNumber = self.currentLineNumber
-                    remainingTokens = self.tokens
-                    self.canGTFO = True
+        while True:
+            if loop.conditionKeyword == "WILE":
+                if not self._Operand(loop.condition):
+                    return
+            elif loop.conditionKeyword == "TIL":
+                if self._Operand(loop.condition):
+                    return
 
-                    self.tokens = caseCodeBlock[
-                        statementBlockLocation[it_var] : len(caseCodeBlock)
-                    ]
+            yield from loop.body
 
-                    self.currentLineNumber = 0
-
-                    self._enterNewScope()
-                    self._Statements()
-                    self._exitCurrentScope()
-
-                    self.tokens = remainingTokens
-                    self.currentLineNumber = currentLineNumber
-
-                return True
-
-            self._throwError(SyntaxError, "Missing Operand")
-
-        return None
-
-    # !!! no nested loops
-    # !!! does not verify loop identifier
-    def _LoopStatement(self):
-        if self._nextTokenIs(TOKEN.LOOP_DECLARATION_AND_DELIMITER):
-            self._popNextToken()
-
-            loopHeaderLineNumber = self.currentLineNumber
+            counterValue = self._getValue(loop.counterSlot, loop.counter, loop)
+            counterValue = self._operate(
+                TOKEN.ADDITION_OPERATION, counterValue, loop.delta, loop
+            )
+            self._assign(loop.counterSlot, counterValue)
 
-            if self._nextTokenIs(TOKEN.LOOP_IDENTIFIER):
-                loopIdentifierToken = self._popNextToken()
-                loopIdentifier = loopIdentifierToken.lexeme
+    def _hoist(self, invariant):
+        try:
+            self.invariantValues[invariant] = self._Operand(invariant.expression)
+        except (SyntaxError, NameError, ValueError):
+            # left to fail where it is used
+            self.invariantValues.pop(invariant, None)
 
-                if self._nextTokenIs(TOKEN.INCREMENT_KEYWORD) or self._nextTokenIs(
-                    TOKEN.DECREMENT_KEYWORD
-                ):
-                    deltaToken = self._popNextToken()
-                    if deltaToken.lexeme == "UPPIN":
-                        delta = 1
-                    elif deltaToken.lexeme == "NERFIN":
-                        delta = -1
+    def _Operand(self, expression):
+        return self.expressionEvaluators[type(expression)](expression)
 
-                    self._expectNextToken(TOKEN.KEYWORD_IN_LOOP, 'Missing keyword "YR"')
+    def _Literal(self, literal):
+        return literal.value
 
-                    if self._nextTokenIs(TOKEN.VARIABLE_IDENTIFIER):
-                        variableIdentifierToken = self._popNextToken()
-                        variableIdentifier = variableIdentifierToken.lexeme
+    def _Variable(self, variable):
+        return self._getValue(variable.slot, variable.identifier, variable)
 
-                        conditionExpressionTokens = []
-                        hasLoopCondition = False
-                        if self._nextTokenIs(TOKEN.LOOP_CONDITION_KEYWORD):
-                            loopConditionKeywordToken = self._popNextToken()
+    def _operate(self, operator, a, b, node):
+        try:
+            return OPERATIONS[operator](a, b)
+        except OPERATION_ERRORS as error:
+            self._throwError(*describeError(error), node)
 
-                            hasLoopCondition = True
+    def _runtime(self, function, arguments, node):
+        # for the runtime functions on BUKKITs
+        try:
+            return function(*arguments)
+        except OPERATION_ERRORS as error:
+            self._throwError(*describeError(error), node)
+
+    def _TwoOperandOperation(self, operation):
+        if operation.operator in SHORT_CIRCUIT_VALUES:
+            return self._shortCircuit(
+                operation.operator, (operation.left, operation.right)
+            )
 
-                            while not self._nextTokenIs(TOKEN.LINEBREAK):
-                                conditionExpressionTokens.append(self._popNextToken())
+        firstOperandValue = self._Operand(operation.left)
+        secondOperandValue = self._Operand(operation.right)
 
-                        self._expectNextToken(
-                            TOKEN.LINEBREAK, "Missing condition or new line"
-                        )
+        return self._operate(
+            operation.operator, firstOperandValue, secondOperandValue, operation
+        )
 
-                        while self._nextTokenIs(TOKEN.LINEBREAK):
-                            self._popNextToken()
+    def _NotOperation(self, operation):
+        return not self._Operand(operation.operand)
 
-                        loopBlockTokens = []
-                        while not self._nextTokenIs(TOKEN.LOOP_DELIMITER):
-                            loopBlockTokens.append(self._popNextToken())
+    def _MultipleOperandOperation(self, operation):
+        if operation.operator in SHORT_CIRCUIT_VALUES:
+            return self._shortCircuit(operation.operator, operation.operands)
 
-                        self._expectNextToken(
-                            TOKEN.LOOP_DELIMITER, "Missing loop closing"
-                        )
+        operandValues = [self._Operand(operand) for operand in operation.operands]
+        return smoosh(operandValues)
 
-                        self._expectNextToken(
-                            TOKEN.LOOP_IDENTIFIER, "Missing loop identifier"
-                        )
+    def _shortCircuit(self, operator, operands):
+        # the operands are evaluated until one decides the result
+        stopValue = SHORT_CIRCUIT_VALUES[operator]
+        for operand in operands:
+            if bool(self._Operand(operand)) is stopValue:
+                return stopValue
 
-                        remainingTokens = self.tokens
+        return not stopValue
 
-                        while True:
-                            self.tokens = conditionExpressionTokens + loopBlockTokens
-                            self.currentLineNumber = loopHeaderLineNumber + 1
+    def _arguments(self, call):
+        return [self._Operand(argument) for argument in call.arguments]
 
-                            if hasLoopCondition:
-                                if loopConditionKeywordToken.lexeme == "WILE":
-                                    loopRunCondition = self._Operand()
-                                elif loopConditionKeywordToken.lexeme == "TIL":
-                                    loopRunCondition = not self._Operand()
+    def _FunctionCall(self, call):
+        arguments = self._arguments(call)
 
-                                if not loopRunCondition:
-                                    break
+        try:
+            cache = self.functionCaches.get(call.name)
+            if cache is None:
+                return self._call(call.function, arguments)
+
+            key = cache.key(arguments)
+            result = cache.lookup(key)
+            if result is MISSING:
+                result = self._call(call.function, arguments)
+                cache.store(key, result)
+
+            return result
+        except RecursionError:
+            # raised by _call past MAX_CALL_DEPTH, or by Python when its
+            # stack runs out first; raising the error can run out of stack
+            # too, and then a call further out raises it
+            self._throwError(ValueError, NESTED_CALLS_MESSAGE.format(call.name), call)
+
+    def _call(self, function, arguments):
+        if self.callDepth == MAX_CALL_DEPTH:
+            raise RecursionError
+
+        callerValues = self.values
+        unsetSlots = [UNSET] * (len(function.slotNames) - len(arguments))
+
+        self.callDepth += 1
+        try:
+            # a self tail call runs the body again on a new frame
+            while True:
+                values = self.values = arguments + unsetSlots
+                ending = self._Statements(function.body)
+                if ending is not TAIL_CALL:
+                    break
+                arguments = self.tailCallArguments
+        finally:
+            self.values = callerValues
+            self.callDepth -= 1
+
+        if ending is RETURN:
+            return self.returnValue
+        if ending is BREAK:
+            return None
 
-                            self._enterNewScope()
-                            self._Statements()
-                            self._exitCurrentScope()
+        # without FOUND YR, a function gives the value of its IT
+        itValue = values[function.itSlot]
+        return None if itValue is UNSET else itValue
 
-                            self._assign(
-                                variableIdentifier,
-                                self._getValue(variableIdentifier) + delta,
-                            )
+    def _typeCast(self, typeName, value, node):
+        try:
+            return typeCast(typeName, value)
+        except OPERATION_ERRORS as error:
+            self._throwError(*describeError(error), node)
 
-                        self.tokens = remainingTokens
+    def _ExplicitTypecast(self, typecast):
+        value = self._Operand(typecast.operand)
+        return self._typeCast(typecast.typeName, value, typecast)
 
-                        return True
+    def _Bukkit(self, bukkit):
+        return Bukkit([self._Operand(item) for item in bukkit.items])
 
-                    self._throwError(SyntaxError, "Missing variable")
+    def _Item(self, item):
+        bukkit = self._Operand(item.bukkit)
+        index = self._Operand(item.index)
+        return self._runtime(getItem, (bukkit, index), item)
 
-                self._throwError(SyntaxError, "Missing UPPIN/NERFIN keyword")
+    def _Size(self, size):
+        bukkit = self._Operand(size.bukkit)
+        return self._runtime(bukkitSize, (bukkit,), size)
 
-            self._throwError(SyntaxError, "Missing loop name")
+    def _InvariantExpression(self, invariant):
+        if invariant in self.invariantValues:
+            return self.invariantValues[invariant]
 
-        return None
+        return self._Operand(invariant.expression)
@@ -0,0 +1,71 @@
+from collections import OrderedDict
+
+from .bukkit import Bukkit
+
+DEFAULT_CACHE_SIZE = 128
+
+# returned by lookup for arguments the cache has no result for
+MISSING = object()
+
+
+class FunctionCache:
+    """The results of a function marked pure, by its arguments, keeping the
+    maxsize most recently used ones.
+
+    Arguments are told apart by type too, so 1, 1.0 and WIN do not share a
+    result. Calls with a BUKKIT argument (whose key is None) and BUKKIT
+    results are not kept, as their items can change between calls. hits
+    counts the calls answered from the cache, and misses the ones that had
+    to run the function.
+    """
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.results)
+
+    def key(self, arguments):
+        types = [type(argument) for argument in arguments]
+        if Bukkit in types:
+            return None
+
+        return (*arguments, *types)
+
+    def lookup(self, key):
+        """Returns the result for key, or MISSING."""
+        results = self.results
+        if key is not None and key in results:
+            self.hits += 1
+            results.move_to_end(key)
+            return results[key]
+
+        self.misses += 1
+        return MISSING
+
+    def store(self, key, result):
+        if key is None or result.__class__ is Bukkit:
+            return
+
+        results = self.results
+        results[key] = result
+        if len(results) > self.maxsize:
+            results.popitem(last=False)
+
+    def wrap(self, function):
+        """Returns function, which takes the list of arguments, answering
+        from the cache when it can."""
+
+        def cachedFunction(arguments):
+            key = self.key(arguments)
+            result = self.lookup(key)
+            if result is MISSING:
+                result = function(arguments)
+                self.store(key, result)
+
+            return result
+
+        return cachedFunction
@@ -1,133 +1,291 @@
 import re
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 
 from .token_enum import TOKEN
 
+KEYWORDS = {
+    "HAI": TOKEN.CODE_DELIMITER,
+    "KTHXBYE": TOKEN.CODE_DELIMITER,
+    "BTW": TOKEN.COMMENT_KEYWORD,
+    "OBTW": TOKEN.MULTILINE_COMMENT_DELIMITER,
+    "TLDR": TOKEN.MULTILINE_COMMENT_DELIMITER,
+    "I HAS A": TOKEN.VARIABLE_DECLARATION,
+    "ITZ": TOKEN.VARIABLE_ASSIGNMENT,
+    "R": TOKEN.VARIABLE_ASSIGNMENT,
+    "SUM OF": TOKEN.ADDITION_OPERATION,
+    "DIFF OF": TOKEN.SUBTRACTION_OPERATION,
+    "PRODUKT OF": TOKEN.MULTIPLICATION_OPERATION,
+    "QUOSHUNT OF": TOKEN.QUOTIENT_OPERATION,
+    "MOD OF": TOKEN.MODULO_OPERATION,
+    "BIGGR OF": TOKEN.MAX_OPERATION,
+    "SMALLR OF": TOKEN.MIN_OPERATION,
+    "BOTH OF": TOKEN.AND_OPERATION,
+    "EITHER OF": TOKEN.OR_OPERATION,
+    "WON OF": TOKEN.XOR_OPERATION,
+    "NOT": TOKEN.NOT_OPERATION,
+    "ALL OF": TOKEN.INFINITE_ARITY_AND_OPERATION,
+    "ANY OF": TOKEN.INFINITE_ARITY_OR_OPERATION,
+    "BOTH SAEM": TOKEN.EQUAL_TO_OPERATION,
+    "DIFFRINT": TOKEN.NOT_EQUAL_TO_OPERATION,
+    "SMOOSH": TOKEN.CONCATENATION_OPERATION,
+    "MAEK": TOKEN.EXPLICIT_TYPECASTING_KEYWORD,
+    "A": TOKEN.OPTIONAL_A_KEYWORD,
+    "AN": TOKEN.OPERAND_SEPARATOR,
+    "MKAY": TOKEN.INFINITE_ARITY_DELIMITER,
+    "IS NOW A": TOKEN.RECASTING_KEYWORD,
+    "VISIBLE": TOKEN.OUTPUT_KEYWORD,
+    "GIMMEH": TOKEN.INPUT_KEYWORD,
+    "O RLY?": TOKEN.IF_ELSE_DELIMITER,
+    "YA RLY": TOKEN.IF_STATEMENT_KEYWORD,
+    "MEBBE": TOKEN.ELSE_IF_STATEMENT_KEYWORD,
+    "GTFO": TOKEN.BREAK_STATEMENT,
+    "NO WAI": TOKEN.ELSE_STATEMENT_KEYWORD,
+    "OIC": TOKEN.FLOW_CONTROL_STATEMENTS_DELIMITER,
+    "WTF?": TOKEN.SWITCH_CASE_STATEMENT_DELIMITER,
+    "OMG": TOKEN.CASE_KEYWORD,
+    "OMGWTF": TOKEN.DEFAULT_CASE_KEYWORD,
+    "IM IN YR": TOKEN.LOOP_DECLARATION_AND_DELIMITER,
+    "UPPIN": TOKEN.INCREMENT_KEYWORD,
+    "NERFIN": TOKEN.DECREMENT_KEYWORD,
+    "YR": TOKEN.KEYWORD_IN_LOOP,
+    "TIL": TOKEN.LOOP_CONDITION_KEYWORD,
+    "WILE": TOKEN.LOOP_CONDITION_KEYWORD,
+    "IM OUTTA YR": TOKEN.LOOP_DELIMITER,
+    "HOW IZ I": TOKEN.FUNCTION_DECLARATION,
+    "IF U SAY SO": TOKEN.FUNCTION_DELIMITER,
+    "FOUND YR": TOKEN.RETURN_KEYWORD,
+    "I IZ": TOKEN.FUNCTION_CALL,
+    "BUKKIT": TOKEN.BUKKIT_KEYWORD,
+    "BUKKIT OF": TOKEN.BUKKIT_KEYWORD,
+    "ITEM OF": TOKEN.ITEM_OPERATION,
+    "SIZE OF": TOKEN.SIZE_OPERATION,
+    "EACH": TOKEN.EACH_KEYWORD,
+    "IN": TOKEN.IN_KEYWORD,
+    "WIN": TOKEN.BOOL_LITERAL,
+    "FAIL": TOKEN.BOOL_LITERAL,
+    "NOOB": TOKEN.TYPE_LITERAL,
+    "NUMBR": TOKEN.TYPE_LITERAL,
+    "NUMBAR": TOKEN.TYPE_LITERAL,
+    "YARN": TOKEN.TYPE_LITERAL,
+    "TROOF": TOKEN.TYPE_LITERAL,
+}
+
+LITERAL_PATTERNS = {
+    TOKEN.FLOAT_LITERAL: r"-?\d*\.\d+",
+    TOKEN.INTEGER_LITERAL: r"-?\d+",
+    TOKEN.STRING_LITERAL: r'"[^"]*"',
+}
+
+IDENTIFIER_PATTERN = r"[a-zA-Z]\w*"
+
+
+def _buildScanner():
+    # one named group per rule, so match.lastgroup tells which rule matched;
+    # keywords are tried longest first so multi-word keywords win (maximal munch)
+    alternatives = []
+    groupTypes = {}
+
+    sortedKeywords = sorted(KEYWORDS, key=len, reverse=True)
+    for index, keyword in enumerate(sortedKeywords):
+        groupName = f"keyword{index}"
+        keywordPattern = r"\s+".join(re.escape(word) for word in keyword.split())
+
+        alternatives.append(f"(?P<{groupName}>{keywordPattern})")
+        groupTypes[groupName] = (KEYWORDS[keyword], keyword)
+
+    for index, (lexemeType, pattern) in enumerate(LITERAL_PATTERNS.items()):
+        groupName = f"literal{index}"
+
+        alternatives.append(f"(?P<{groupName}>{pattern})")
+        groupTypes[groupName] = (lexemeType, None)
+
+    alternatives.append(f"(?P<identifier>{IDENTIFIER_PATTERN})")
+    groupTypes["identifier"] = (None, None)
+
+    # a lexeme must end at whitespace or at the end of the line
+    scanner = re.compile(f"(?:{'|'.join(alternatives)})(?=\\s|$)")
+
+    return scanner, groupTypes
+
+
+SCANNER, SCANNER_GROUP_TYPES = _buildScanner()
+WHITESPACE = re.compile(r"\s*")
+
+# comment keywords only count as whole words; string literals are skipped over
+COMMENT_OR_STRING_START = re.compile(r'"|(?<!\S)O?BTW(?!\S)')
+MULTILINE_COMMENT_END = re.compile(r"(?<!\S)TLDR(?!\S)")
+
+# below this many lines per chunk, a process pool costs more than it saves
+MIN_LINES_PER_CHUNK = 2_000
+CHUNKS_PER_WORKER = 4
+
 
 class Lexer:
-    def __init__(self):
-        self.patternTypes = {
-            r"^HAI$": TOKEN.CODE_DELIMITER,
-            r"^KTHXBYE$": TOKEN.CODE_DELIMITER,
-            r"^BTW$": TOKEN.COMMENT_KEYWORD,
-            r"^OBTW$": TOKEN.MULTILINE_COMMENT_DELIMITER,
-            r"^TLDR$": TOKEN.MULTILINE_COMMENT_DELIMITER,
-            r"^I HAS A$": TOKEN.VARIABLE_DECLARATION,
-            r"^ITZ$": TOKEN.VARIABLE_ASSIGNMENT,
-            r"^R$": TOKEN.VARIABLE_ASSIGNMENT,
-            r"^SUM OF$": TOKEN.ADDITION_OPERATION,
-            r"^DIFF OF$": TOKEN.SUBTRACTION_OPERATION,
-            r"^PRODUKT OF$": TOKEN.MULTIPLICATION_OPERATION,
-            r"^QUOSHUNT OF$": TOKEN.QUOTIENT_OPERATION,
-            r"^MOD OF$": TOKEN.MODULO_OPERATION,
-            r"^BIGGR OF$": TOKEN.MAX_OPERATION,
-            r"^SMALLR OF$": TOKEN.MIN_OPERATION,
-            r"^BOTH OF$": TOKEN.AND_OPERATION,
-            r"^EITHER OF$": TOKEN.OR_OPERATION,
-            r"^WON OF$": TOKEN.XOR_OPERATION,
-            r"^NOT$": TOKEN.NOT_OPERATION,
-            r"^ALL OF$": TOKEN.INFINITE_ARITY_AND_OPERATION,
-            r"^ANY OF$": TOKEN.INFINITE_ARITY_OR_OPERATION,
-            r"^BOTH SAEM$": TOKEN.EQUAL_TO_OPERATION,
-            r"^DIFFRINT$": TOKEN.NOT_EQUAL_TO_OPERATION,
-            r"^SMOOSH$": TOKEN.CONCATENATION_OPERATION,
-            r"^MAEK$": TOKEN.EXPLICIT_TYPECASTING_KEYWORD,
-            r"^A$": TOKEN.OPTIONAL_A_KEYWORD,
-            r"^AN$": TOKEN.OPERAND_SEPARATOR,
-            r"^MKAY$": TOKEN.INFINITE_ARITY_DELIMITER,
-            r"^IS NOW A$": TOKEN.RECASTING_KEYWORD,
-            r"^VISIBLE$": TOKEN.OUTPUT_KEYWORD,
-            r"^GIMMEH$": TOKEN.INPUT_KEYWORD,
-            r"^O RLY\?$": TOKEN.IF_ELSE_DELIMITER,
-            r"^YA RLY$": TOKEN.IF_STATEMENT_KEYWORD,
-            r"^MEBBE$": TOKEN.ELSE_IF_STATEMENT_KEYWORD,
-            r"^GTFO$": TOKEN.BREAK_STATEMENT,
-            r"^NO WAI$": TOKEN.ELSE_STATEMENT_KEYWORD,
-            r"^OIC$": TOKEN.FLOW_CONTROL_STATEMENTS_DELIMITER,
-            r"^WTF\?$": TOKEN.SWITCH_CASE_STATEMENT_DELIMITER,
-            r"^OMG$": TOKEN.CASE_KEYWORD,
-            r"^OMGWTF$": TOKEN.DEFAULT_CASE_KEYWORD,
-            r"^IM IN YR$": TOKEN.LOOP_DECLARATION_AND_DELIMITER,
-            r"^UPPIN$": TOKEN.INCREMENT_KEYWORD,
-            r"^NERFIN$": TOKEN.DECREMENT_KEYWORD,
-            r"^YR$": TOKEN.KEYWORD_IN_LOOP,
-            r"^TIL$": TOKEN.LOOP_CONDITION_KEYWORD,
-            r"^WILE$": TOKEN.LOOP_CONDITION_KEYWORD,
-            r"^IM OUTTA YR$": TOKEN.LOOP_DELIMITER,
-            r"^-?\d*\.\d+$": TOKEN.FLOAT_LITERAL,
-            r"^-?\d+$": TOKEN.INTEGER_LITERAL,
-            r"^\".*\"$": TOKEN.STRING_LITERAL,
-            r"^(WIN|FAIL)$": TOKEN.BOOL_LITERAL,
-            r"^(NOOB|NUMBR|NUMBAR|YARN|TROOF)$": TOKEN.TYPE_LITERAL,
-        }
-
-    def process(self, content):
-        self.tokens = []
-
-        content = self._removeIndents(content)
-        content = self._removeComments(content)
-        self._tokenizeSourceCode(content)
+    def process(self, content, compact=False, workers=None):
+        # content is either a string or a Source, which reads as a list of lines
+        lines = content.split("\n") if isinstance(content, str) else content
+
+        if workers is not None and workers > 1:
+            tokens = self._tokenizeInParallel(lines, workers, compact)
+        else:
+            tokens = TokenBuffer() if compact else []
+            tokens.extend(self.iterTokens(lines))
+
+        self.tokens = tokens
         return self.tokens
 
-    def _removeIndents(self, content):
-        return re.sub(r"\t", "", content)
+    def iterTokens(self, fileobj):
+        """Lazily tokenize a text file object (or any iterable of lines)."""
+        self.isInsideMultilineComment = False
+
+        yield from self._tokenizeLines(fileobj, 1)
 
-    def _removeComments(self, content):
-        noMultilineComments = re.sub(r"(OBTW(?<=OBTW)(.|\n)*?(?=TLDR)TLDR)", "", content)
-        noComments = re.sub(r"BTW .*", "", noMultilineComments)
-        
-        return noComments
+        if self.isInsideMultilineComment:
+            self._throwSyntaxError('Missing closing keyword "TLDR"')
 
-    def _tokenizeSourceCode(self, sourceCode):
-        for lineIndex, line in enumerate(sourceCode.split("\n")):
-            self.currentLineNumber = lineIndex + 1
-            self.currentLine = line
+    def _tokenizeLines(self, lines, firstLineNumber):
+        for lineNumber, line in enumerate(lines, firstLineNumber):
+            self.currentLineNumber = lineNumber
+            self.currentLine = line.rstrip("\r\n")
             self.currentLineColumnNumber = 0
-            self._tokenizeCurrentLine()
 
-    def _tokenizeCurrentLine(self):
-        words = self.currentLine.split()
+            yield from self._tokenizeLine(self._stripComments(self.currentLine))
 
-        buffer = ""
-        previousLexemeType = None
-        isLineTokenized = False
+    def _tokenizeInParallel(self, lines, workers, compact):
+        chunkSize = max(
+            MIN_LINES_PER_CHUNK, -(-len(lines) // (workers * CHUNKS_PER_WORKER))
+        )
+        chunkStarts = range(0, len(lines), chunkSize)
+        chunkStates = self._getMultilineCommentStates(lines, chunkStarts)
+
+        tokens = TokenBuffer() if compact else []
+        if len(chunkStarts) == 1:
+            tokens.extend(self.iterTokens(lines))
+            return tokens
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunkTokens = executor.map(
+                _tokenizeChunk,
+                (lines[start : start + chunkSize] for start in chunkStarts),
+                (start + 1 for start in chunkStarts),
+                chunkStates,
+            )
+
+            for chunk in chunkTokens:
+                tokens.extend(chunk)
+
+        return tokens
+
+    def _getMultilineCommentStates(self, lines, chunkStarts):
+        # whether each chunk starts inside an OBTW-TLDR block; this only
+        # needs the comment scanner, so it is cheap next to tokenizing
+        self.isInsideMultilineComment = False
+        chunkStates = []
+
+        nextChunkStarts = iter(chunkStarts)
+        nextChunkStart = next(nextChunkStarts, None)
+        for lineIndex, line in enumerate(lines):
+            if lineIndex == nextChunkStart:
+                chunkStates.append(self.isInsideMultilineComment)
+                nextChunkStart = next(nextChunkStarts, None)
+
+            if self.isInsideMultilineComment or "BTW" in line:
+                self._findCommentSpans(line)
+
+        if self.isInsideMultilineComment:
+            self.currentLineNumber = len(lines)
+            self.currentLine = lines[-1]
+            self.currentLineColumnNumber = 0
+            self._throwSyntaxError('Missing closing keyword "TLDR"')
+
+        return chunkStates
+
+    def _stripComments(self, line):
+        # comments are blanked out instead of removed, so that every token
+        # keeps its exact line and column in the original source
+        commentSpans = self._findCommentSpans(line)
+        if not commentSpans:
+            return line
+
+        codeSegments = []
+        previousSpanEnd = 0
+        for spanStart, spanEnd in commentSpans:
+            codeSegments.append(line[previousSpanEnd:spanStart])
+            if spanEnd < len(line):
+                codeSegments.append(" " * (spanEnd - spanStart))
+            previousSpanEnd = spanEnd
+        codeSegments.append(line[previousSpanEnd:])
 
-        while not isLineTokenized:
-            for word in words:
-                if len(buffer) > 0:
-                    buffer += " "
-                buffer += word
+        return "".join(codeSegments)
 
-                lexemeType = self._getLexemeType(buffer)
-                if lexemeType != None:
-                    self.tokens.append(Token(buffer, lexemeType))
-                    previousLexemeType = lexemeType
+    def _findCommentSpans(self, line):
+        # a single left-to-right pass; OBTW-TLDR state carries over between
+        # lines through self.isInsideMultilineComment
+        commentSpans = []
+        position = 0
+        lineLength = len(line)
 
-                    buffer = ""
-                    self.currentLineColumnNumber += len(buffer)
+        while position < lineLength:
+            if self.isInsideMultilineComment:
+                commentEnd = MULTILINE_COMMENT_END.search(line, position)
+                if commentEnd is None:
+                    commentSpans.append((position, lineLength))
+                    break
 
-            if buffer == "":
+                commentSpans.append((position, commentEnd.end()))
+                self.isInsideMultilineComment = False
+                position = commentEnd.end()
+                continue
+
+            match = COMMENT_OR_STRING_START.search(line, position)
+            if match is None:
                 break
 
-            possibleIdentifier, *words = buffer.split()
+            if match.group() == '"':
+                closingQuote = line.find('"', match.end())
+                if closingQuote == -1:
+                    break
 
-            if not self._isIdentifier(possibleIdentifier):
-                self._throwSyntaxError("Unexpected token")
+                position = closingQuote + 1
+                continue
 
-            identifier = possibleIdentifier
+            if match.group() == "BTW":
+                commentSpans.append((match.start(), lineLength))
+                break
 
-            identifierLexemeType = self._getIdentifierTypeBasedOn(previousLexemeType)
+            self.isInsideMultilineComment = True
+            position = match.start()
 
-            self.tokens.append(Token(identifier, identifierLexemeType))
-            self.currentLineColumnNumber += len(identifier) + 1
-            previousLexemeType = identifierLexemeType
+        return commentSpans
 
-            buffer = ""
+    def _tokenizeLine(self, line):
+        lineLength = len(line)
+        previousLexemeType = None
 
-        self.tokens.append(Token("\n", TOKEN.LINEBREAK))
+        position = WHITESPACE.match(line).end()
+        while position < lineLength:
+            self.currentLineColumnNumber = position
 
-    def _throwSyntaxError(self, message):
-        # column number is not accurate due to source code cleaning
+            match = SCANNER.match(line, position)
+            if match is None:
+                self._throwSyntaxError("Unexpected token")
+
+            lexemeType, lexeme = SCANNER_GROUP_TYPES[match.lastgroup]
+            if lexemeType is None:
+                lexemeType = self._getIdentifierTypeBasedOn(previousLexemeType)
+            if lexeme is None:
+                lexeme = match.group()
+
+            yield Token(lexeme, lexemeType, self.currentLineNumber, position)
+            previousLexemeType = lexemeType
+
+            position = WHITESPACE.match(line, match.end()).end()
 
+        yield Token("\n", TOKEN.LINEBREAK, self.currentLineNumber, lineLength)
+
+    def _throwSyntaxError(self, message):
         syntaxErrorArgs = (
             None,
             self.currentLineNumber,
@@ -137,17 +295,6 @@ class Lexer:
 
         raise SyntaxError(message, syntaxErrorArgs)
 
-    def _getLexemeType(self, lexeme):
-        allPatterns = dict.keys(self.patternTypes)
-        for pattern in allPatterns:
-            if re.match(pattern, lexeme):
-                lexemeType = self.patternTypes[pattern]
-                return lexemeType
-        return None
-
-    def _isIdentifier(self, word):
-        return re.match(r"^[a-zA-Z]\w*$", word)
-
     def _getIdentifierTypeBasedOn(self, previousLexemeType):
         if previousLexemeType in [
             TOKEN.LOOP_DECLARATION_AND_DELIMITER,
@@ -155,10 +302,79 @@ class Lexer:
         ]:
             return TOKEN.LOOP_IDENTIFIER
 
+        if previousLexemeType in [TOKEN.FUNCTION_DECLARATION, TOKEN.FUNCTION_CALL]:
+            return TOKEN.FUNCTION_IDENTIFIER
+
         return TOKEN.VARIABLE_IDENTIFIER
 
 
+def _tokenizeChunk(lines, firstLineNumber, isInsideMultilineComment):
+    lexer = Lexer()
+    lexer.isInsideMultilineComment = isInsideMultilineComment
+
+    tokens = TokenBuffer()
+    tokens.extend(lexer._tokenizeLines(lines, firstLineNumber))
+    return tokens
+
+
 class Token:
-    def __init__(self, lexeme, lexemeType):
+    __slots__ = ("lexeme", "lexemeType", "line", "column")
+
+    def __init__(self, lexeme, lexemeType, line=0, column=0):
         self.lexeme = lexeme
         self.lexemeType = lexemeType
+        self.line = line
+        self.column = column
+
+
+TOKEN_KINDS = tuple(TOKEN)
+
+
+class TokenBuffer:
+    """Struct-of-arrays token storage for very large programs.
+
+    Kinds and positions live in typed arrays; identifiers and literals are
+    interned so repeated lexemes share one string. Indexing builds a Token
+    on the fly, so a TokenBuffer can be used wherever a token list is read.
+    """
+
+    def __init__(self):
+        self.kinds = array("B")
+        self.lines = array("L")
+        self.columns = array("L")
+        self.lexemes = []
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        return Token(
+            self.lexemes[index],
+            TOKEN_KINDS[self.kinds[index]],
+            self.lines[index],
+            self.columns[index],
+        )
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def append(self, token):
+        self.kinds.append(token.lexemeType)
+        self.lines.append(token.line)
+        self.columns.append(token.column)
+        self.lexemes.append(sys.intern(token.lexeme))
+
+    def extend(self, tokens):
+        if isinstance(tokens, TokenBuffer):
+            self.kinds.extend(tokens.kinds)
+            self.lines.extend(tokens.lines)
+            self.columns.extend(tokens.columns)
+            self.lexemes.extend(tokens.lexemes)
+            return
+
+        for token in tokens:
+            self.append(token)
@@ -0,0 +1,640 @@
+from .runtime import (
+    IT_VARIABLE,
+    OPERATION_ERRORS,
+    SHORT_CIRCUIT_VALUES,
+    caseKey,
+    caseKeys,
+    operate,
+    toYarn,
+)
+from .syntax_tree import (
+    Assignment,
+    BinaryOperation,
+    Block,
+    Break,
+    Declaration,
+    ExpressionStatement,
+    FunctionCall,
+    FunctionDefinition,
+    IfStatement,
+    Input,
+    Invariant,
+    Item,
+    ItemAssignment,
+    Literal,
+    Loop,
+    MakeBukkit,
+    MultipleOperandOperation,
+    Node,
+    NotOperation,
+    Output,
+    Recast,
+    Return,
+    Size,
+    SwitchStatement,
+    Typecast,
+    Variable,
+)
+from .token_enum import TOKEN
+
+
+EXPRESSION_TYPES = (
+    Literal,
+    Variable,
+    BinaryOperation,
+    NotOperation,
+    MultipleOperandOperation,
+    Typecast,
+    Invariant,
+    FunctionCall,
+    MakeBukkit,
+    Item,
+    Size,
+)
+
+
+def countNodes(node):
+    """Counts the nodes of a syntax tree."""
+    return sum(1 for _ in _walk(node))
+
+
+def _walk(node):
+    # yields the nodes of a tree in source order, parents first; the children
+    # of a node are read after it is yielded, so they can be replaced meanwhile
+    pendingNodes = [node]
+
+    while pendingNodes:
+        node = pendingNodes.pop()
+        yield node
+
+        children = []
+        for slot in _slotsOf(type(node)):
+            value = getattr(node, slot)
+            if isinstance(value, Node):
+                children.append(value)
+            elif isinstance(value, list):
+                children.extend(item for item in value if isinstance(item, Node))
+
+        pendingNodes.extend(reversed(children))
+
+
+def _slotsOf(nodeType):
+    # the invariants of a loop are walked where they are used, and functions
+    # where they are defined rather than from their calls
+    return [
+        slot
+        for cls in nodeType.__mro__
+        for slot in getattr(cls, "__slots__", ())
+        if slot not in Node.__slots__ and slot not in ("invariants", "function")
+    ]
+
+
+class Optimizer:
+    """Simplifies a syntax tree before it runs.
+
+    - operations on literals are computed once (operations that would fail
+      are left to fail when they run), and so are BOTH OF, EITHER OF, ALL
+      OF and ANY OF once a literal operand decides them;
+    - O RLY? and WTF? on an IT set by a literal expression just before them
+      keep only the branch that runs, MEBBE clauses with a literal condition
+      are dropped or end the chain, and loops whose condition is a literal
+      that ends them at once are dropped;
+    - WTF? cases that nothing jumps or falls through to, and statements after
+      a GTFO, are dropped;
+    - adjacent literal VISIBLE operands are joined into one;
+    - operations in a loop that give the same value on every iteration are
+      worked out once before it (see InvariantHoister).
+
+    removedNodeCount tells how many nodes the last optimize call removed,
+    and hoistedExpressionCount how many operations it moved out of loops.
+    """
+
+    def __init__(self):
+        self.statementOptimizers = {
+            Declaration: self._Declaration,
+            Assignment: self._AssignmentStatement,
+            Recast: self._Unchanged,
+            Output: self._Output,
+            Input: self._Unchanged,
+            ExpressionStatement: self._ExpressionStatement,
+            Block: self._BlockStatement,
+            Loop: self._LoopStatement,
+            Break: self._Unchanged,
+            FunctionDefinition: self._FunctionDefinition,
+            Return: self._ReturnStatement,
+            ItemAssignment: self._ItemAssignment,
+        }
+
+        # O RLY? and WTF? are optimized by _Statements, which knows IT
+
+        self.expressionOptimizers = {
+            Literal: self._Unchanged,
+            Variable: self._Unchanged,
+            BinaryOperation: self._TwoOperandOperation,
+            NotOperation: self._NotOperation,
+            MultipleOperandOperation: self._MultipleOperandOperation,
+            Typecast: self._ExplicitTypecast,
+            FunctionCall: self._FunctionCall,
+            MakeBukkit: self._Bukkit,
+            Item: self._Item,
+            Size: self._Size,
+        }
+
+    def optimize(self, program):
+        nodeCount = countNodes(program)
+        program.statements = self._Statements(program.statements)
+        self.removedNodeCount = nodeCount - countNodes(program)
+
+        # hoisted after folding, so folded operations are not hoisted
+        hoister = InvariantHoister()
+        hoister.hoist(program)
+        self.hoistedExpressionCount = hoister.hoistedExpressionCount
+
+        return program
+
+    def _Unchanged(self, node):
+        return node
+
+    def _Statements(self, statements):
+        optimizedStatements = []
+
+        # the literal value of IT, when the statement before set it to one
+        knownIt = None
+
+        for statement in statements:
+            if isinstance(statement, IfStatement):
+                optimizedStatements.extend(self._IfStatement(statement, knownIt))
+            elif isinstance(statement, SwitchStatement):
+                optimizedStatements.extend(self._CaseStatement(statement, knownIt))
+            else:
+                statement = self.statementOptimizers[type(statement)](statement)
+                if statement is not None:
+                    optimizedStatements.append(statement)
+
+            knownIt = None
+            if isinstance(statement, ExpressionStatement) and isinstance(
+                statement.expression, Literal
+            ):
+                knownIt = statement.expression.value
+
+            # nothing after a GTFO or FOUND YR runs
+            if isinstance(statement, (Break, Return)):
+                break
+
+        return optimizedStatements
+
+    def _Declaration(self, declaration):
+        if declaration.value is not None:
+            declaration.value = self._Operand(declaration.value)
+
+        return declaration
+
+    def _AssignmentStatement(self, assignment):
+        assignment.value = self._Operand(assignment.value)
+        return assignment
+
+    def _ItemAssignment(self, assignment):
+        assignment.bukkit = self._Operand(assignment.bukkit)
+        assignment.index = self._Operand(assignment.index)
+        assignment.value = self._Operand(assignment.value)
+        return assignment
+
+    def _Output(self, output):
+        operands = []
+
+        for operand in map(self._Operand, output.operands):
+            if (
+                isinstance(operand, Literal)
+                and operands
+                and isinstance(operands[-1], Literal)
+            ):
+                joinedYarn = toYarn(operands[-1].value) + toYarn(operand.value)
+                operands[-1] = Literal(joinedYarn).at(operands[-1])
+            else:
+                operands.append(operand)
+
+        output.operands = operands
+        return output
+
+    def _ExpressionStatement(self, statement):
+        statement.expression = self._Operand(statement.expression)
+        return statement
+
+    def _BlockStatement(self, block):
+        block.statements = self._Statements(block.statements)
+        return block
+
+    def _FunctionDefinition(self, function):
+        function.body = self._Statements(function.body)
+        return function
+
+    def _ReturnStatement(self, returnStatement):
+        returnStatement.value = self._Operand(returnStatement.value)
+        return returnStatement
+
+    def _asBlock(self, statements, node):
+        # a block without statements has nothing to run
+        if not statements:
+            return []
+
+        return [Block(statements).at(node)]
+
+    def _IfStatement(self, ifStatement, knownIt):
+        ifStatement.ifBlock = self._Statements(ifStatement.ifBlock)
+        if ifStatement.elseBlock is not None:
+            ifStatement.elseBlock = self._Statements(ifStatement.elseBlock)
+
+        elseIfs = []
+        for elseIf in ifStatement.elseIfs:
+            elseIf.condition = self._Operand(elseIf.condition)
+            elseIf.block = self._Statements(elseIf.block)
+
+            if not isinstance(elseIf.condition, Literal):
+                elseIfs.append(elseIf)
+            elif elseIf.condition.value == True:
+                # the branches after a MEBBE that always runs never do
+                ifStatement.elseBlock = elseIf.block
+                break
+
+        ifStatement.elseIfs = elseIfs
+
+        if knownIt is None:
+            return [ifStatement]
+
+        # only a WIN (or 1) runs the YA RLY block
+        if knownIt == True:
+            return self._asBlock(ifStatement.ifBlock, ifStatement)
+
+        if not elseIfs:
+            return self._asBlock(ifStatement.elseBlock or [], ifStatement)
+
+        # the MEBBE conditions still decide which branch runs
+        ifStatement.ifBlock = []
+        return [ifStatement]
+
+    def _CaseStatement(self, switchStatement, knownIt):
+        cases = []
+        earlierKeys = set()
+
+        for case in switchStatement.cases:
+            case.block = self._Statements(case.block)
+
+            # a case whose keys all belong to earlier cases is only reached
+            # by falling through from the case before it
+            isEntered = case.literal is None
+            if not isEntered:
+                keys = caseKeys(case.literal.value)
+                isEntered = not earlierKeys.issuperset(keys)
+                earlierKeys.update(keys)
+            isFallenInto = bool(cases) and not _endsWithBreak(cases[-1].block)
+
+            if isEntered or isFallenInto:
+                cases.append(case)
+
+        switchStatement.cases = cases
+
+        if knownIt is None:
+            return [switchStatement]
+
+        itKey = caseKey(knownIt)
+        for caseIndex, case in enumerate(cases):
+            if case.literal is None or itKey in caseKeys(case.literal.value):
+                break
+        else:
+            return []
+
+        cases = cases[caseIndex:]
+        if any(_containsNestedBreak(case.block) for case in cases):
+            switchStatement.cases = cases
+            return [switchStatement]
+
+        # the cases run from the matching one to the first GTFO
+        statements = []
+        for case in cases:
+            if _endsWithBreak(case.block):
+                statements.extend(case.block[:-1])
+                break
+            statements.extend(case.block)
+
+        return self._asBlock(statements, switchStatement)
+
+    def _LoopStatement(self, loop):
+        loop.body = self._Statements(loop.body)
+        if loop.collection is not None:
+            loop.collection = self._Operand(loop.collection)
+        if loop.condition is None:
+            return loop
+
+        loop.condition = self._Operand(loop.condition)
+
+        # a loop that stops before its first run is dropped
+        if isinstance(loop.condition, Literal):
+            isTil = loop.conditionKeyword == "TIL"
+            if bool(loop.condition.value) == isTil:
+                return None
+
+        return loop
+
+    def _Operand(self, expression):
+        return self.expressionOptimizers[type(expression)](expression)
+
+    def _TwoOperandOperation(self, operation):
+        operation.left = self._Operand(operation.left)
+        operation.right = self._Operand(operation.right)
+
+        if operation.operator in SHORT_CIRCUIT_VALUES:
+            operands = self._shortCircuitOperands(
+                operation, [operation.left, operation.right]
+            )
+            if isinstance(operands, Literal):
+                return operands
+            return operation
+
+        if isinstance(operation.left, Literal) and isinstance(operation.right, Literal):
+            try:
+                value = operate(
+                    operation.operator, operation.left.value, operation.right.value
+                )
+            except OPERATION_ERRORS:
+                return operation
+
+            return Literal(value).at(operation)
+
+        return operation
+
+    def _NotOperation(self, operation):
+        operation.operand = self._Operand(operation.operand)
+
+        if isinstance(operation.operand, Literal):
+            return Literal(not operation.operand.value).at(operation)
+
+        return operation
+
+    def _MultipleOperandOperation(self, operation):
+        operands = [self._Operand(operand) for operand in operation.operands]
+        operation.operands = operands
+
+        if operation.operator == TOKEN.CONCATENATION_OPERATION:
+            return self._Concatenation(operation)
+
+        operands = self._shortCircuitOperands(operation, operands)
+        if isinstance(operands, Literal):
+            return operands
+
+        operation.operands = operands
+        return operation
+
+    def _shortCircuitOperands(self, operation, operands):
+        """Returns the operands of a BOTH OF, EITHER OF, ALL OF or ANY OF
+        left to evaluate, or its result as a Literal when literal operands
+        decide it."""
+        # literal operands that do not decide the result are dropped, and so
+        # are the operands after one that does, as they never run
+        stopValue = SHORT_CIRCUIT_VALUES[operation.operator]
+        keptOperands = []
+
+        for operand in operands:
+            if not isinstance(operand, Literal):
+                keptOperands.append(operand)
+            elif bool(operand.value) is stopValue:
+                keptOperands.append(operand)
+                break
+
+        if not keptOperands:
+            return Literal(not stopValue).at(operation)
+        if isinstance(keptOperands[0], Literal):
+            return Literal(stopValue).at(operation)
+
+        return keptOperands
+
+    def _Concatenation(self, operation):
+        # adjacent literals are joined, as YARNs
+        operands = []
+
+        for operand in operation.operands:
+            if isinstance(operand, Literal):
+                operand = Literal(toYarn(operand.value)).at(operand)
+
+                if operands and isinstance(operands[-1], Literal):
+                    joinedYarn = operands[-1].value + operand.value
+                    operand = Literal(joinedYarn).at(operands[-1])
+                    operands.pop()
+
+            operands.append(operand)
+
+        if len(operands) == 1 and isinstance(operands[0], Literal):
+            return operands[0].at(operation)
+
+        operation.operands = operands
+        return operation
+
+    def _FunctionCall(self, call):
+        call.arguments = [self._Operand(argument) for argument in call.arguments]
+        return call
+
+    def _ExplicitTypecast(self, typecast):
+        # the operand is always a variable
+        return typecast
+
+    # every BUKKIT is a new one, and items can change, so these are never
+    # computed in advance
+
+    def _Bukkit(self, bukkit):
+        bukkit.items = [self._Operand(item) for item in bukkit.items]
+        return bukkit
+
+    def _Item(self, item):
+        item.bukkit = self._Operand(item.bukkit)
+        item.index = self._Operand(item.index)
+        return item
+
+    def _Size(self, size):
+        size.bukkit = self._Operand(size.bukkit)
+        return size
+
+
+class InvariantHoister:
+    """Moves the operations of loops whose value is the same on every
+    iteration out of them.
+
+    An operation is invariant when none of the variables it reads is written
+    inside the loop, by the body or by the counter update. Each largest
+    invariant operation is replaced by an Invariant node, listed in
+    loop.invariants, which the engines work out once each time the loop
+    starts. When that fails (say, on a variable declared later), the
+    operation is evaluated where it is used, and fails there as before.
+
+    Loops that call a function are left alone: the call could run the same
+    loop again, working out its invariants anew while they are in use. So
+    are loops setting an item, as any variable could hold the BUKKIT. A new
+    BUKKIT, an item and a size are never invariant.
+    """
+
+    def __init__(self):
+        self.expressionHoisters = {
+            Literal: self._Constant,
+            Invariant: self._Constant,
+            Variable: self._Variable,
+            BinaryOperation: self._TwoOperandOperation,
+            NotOperation: self._NotOperation,
+            MultipleOperandOperation: self._MultipleOperandOperation,
+            Typecast: self._ExplicitTypecast,
+            MakeBukkit: self._Bukkit,
+            Item: self._Item,
+            Size: self._Size,
+        }
+
+    def hoist(self, program):
+        self.hoistedExpressionCount = 0
+
+        # outer loops come first, and an inner loop takes what they hoisted
+        # as invariant
+        for loop in _walk(program):
+            if isinstance(loop, Loop) and not any(
+                isinstance(node, (FunctionCall, ItemAssignment)) for node in _walk(loop)
+            ):
+                self._LoopStatement(loop)
+
+        return program
+
+    def _LoopStatement(self, loop):
+        self.writtenVariables = _writtenVariables(loop)
+        self.invariants = loop.invariants
+
+        for node in _walk(loop):
+            if isinstance(node, EXPRESSION_TYPES):
+                continue
+
+            for slot in _slotsOf(type(node)):
+                value = getattr(node, slot)
+                if isinstance(value, EXPRESSION_TYPES):
+                    setattr(node, slot, self._hoisted(value))
+                elif isinstance(value, list):
+                    value[:] = [
+                        self._hoisted(item)
+                        if isinstance(item, EXPRESSION_TYPES)
+                        else item
+                        for item in value
+                    ]
+
+        self.hoistedExpressionCount += len(loop.invariants)
+
+    def _hoisted(self, expression):
+        if self._isInvariant(expression):
+            return self._invariant(expression)
+
+        return expression
+
+    def _invariant(self, expression):
+        # hoisting a literal or a variable would save nothing
+        if isinstance(expression, (Literal, Variable, Invariant)):
+            return expression
+
+        invariant = Invariant(expression).at(expression)
+        self.invariants.append(invariant)
+
+        return invariant
+
+    def _isInvariant(self, expression):
+        """Tells whether the expression is invariant; when it is not, its
+        invariant operands are hoisted."""
+        return self.expressionHoisters[type(expression)](expression)
+
+    def _hoistedOperands(self, operands):
+        # None when all the operands are invariant
+        isInvariant = [self._isInvariant(operand) for operand in operands]
+        if all(isInvariant):
+            return None
+
+        return [
+            self._invariant(operand) if isOperandInvariant else operand
+            for operand, isOperandInvariant in zip(operands, isInvariant)
+        ]
+
+    def _Constant(self, expression):
+        return True
+
+    def _Variable(self, variable):
+        return variable.identifier not in self.writtenVariables
+
+    def _TwoOperandOperation(self, operation):
+        operands = self._hoistedOperands([operation.left, operation.right])
+        if operands is None:
+            return True
+
+        operation.left, operation.right = operands
+        return False
+
+    def _NotOperation(self, operation):
+        return self._isInvariant(operation.operand)
+
+    def _MultipleOperandOperation(self, operation):
+        operands = self._hoistedOperands(operation.operands)
+        if operands is None:
+            return True
+
+        operation.operands = operands
+        return False
+
+    def _ExplicitTypecast(self, typecast):
+        # the operand is always a variable
+        return self._isInvariant(typecast.operand)
+
+    def _neverInvariantOperands(self, operands):
+        # the operands of an expression that is not invariant whatever they
+        # are, each hoisted when it is invariant
+        return self._hoistedOperands(operands) or [
+            self._invariant(operand) for operand in operands
+        ]
+
+    def _Bukkit(self, bukkit):
+        bukkit.items = self._neverInvariantOperands(bukkit.items)
+        return False
+
+    def _Item(self, item):
+        item.bukkit, item.index = self._neverInvariantOperands(
+            [item.bukkit, item.index]
+        )
+        return False
+
+    def _Size(self, size):
+        (size.bukkit,) = self._neverInvariantOperands([size.bukkit])
+        return False
+
+
+def _writtenVariables(loop):
+    writtenVariables = set()
+
+    for node in _walk(loop):
+        if isinstance(node, (Declaration, Assignment, Recast, Input)):
+            writtenVariables.add(node.identifier)
+        elif isinstance(node, ExpressionStatement):
+            writtenVariables.add(IT_VARIABLE)
+        elif isinstance(node, Loop):
+            writtenVariables.add(node.counter)
+
+    return writtenVariables
+
+
+def _endsWithBreak(statements):
+    return bool(statements) and isinstance(statements[-1], Break)
+
+
+def _containsNestedBreak(statements):
+    # a GTFO inside an O RLY? or block, which would leave the WTF?
+    for statement in statements:
+        if isinstance(statement, IfStatement):
+            blocks = [statement.ifBlock, statement.elseBlock or []]
+            blocks.extend(elseIf.block for elseIf in statement.elseIfs)
+            if any(_containsBreak(block) for block in blocks):
+                return True
+        elif isinstance(statement, Block) and _containsBreak(statement.statements):
+            return True
+
+    return False
+
+
+def _containsBreak(statements):
+    return any(isinstance(statement, Break) for statement in statements) or (
+        _containsNestedBreak(statements)
+    )
@@ -0,0 +1,117 @@
+import sys
+from collections import deque
+
+# how much of the latest output GIMMEH shows above its prompt
+TAIL_LENGTH = 4096
+
+
+class OutputSink:
+    """Where the output of VISIBLE and GIMMEH goes.
+
+    The engines call write with every fragment and flush once the program
+    ends. Sinks remember the last TAIL_LENGTH characters written, for the
+    GIMMEH prompt, without keeping the rest.
+    """
+
+    def __init__(self):
+        self._tail = deque()
+        self._tailLength = 0
+
+    def write(self, text):
+        self._keep(text)
+
+    def flush(self):
+        pass
+
+    def tail(self):
+        """Returns the latest output, at most TAIL_LENGTH characters."""
+        return "".join(self._tail)[-TAIL_LENGTH:]
+
+    def _keep(self, text):
+        tail = self._tail
+        tail.append(text)
+        self._tailLength += len(text)
+
+        # drops the oldest fragments no longer needed for the tail
+        while self._tailLength - len(tail[0]) >= TAIL_LENGTH:
+            self._tailLength -= len(tail.popleft())
+
+
+class ListSink(OutputSink):
+    """Keeps all the output in memory, as a list of fragments."""
+
+    def __init__(self):
+        super().__init__()
+        self.fragments = []
+
+        # the tail is found in the fragments, so writing is just appending
+        self.write = self.fragments.append
+
+    def getvalue(self):
+        return "".join(self.fragments)
+
+    def tail(self):
+        fragments = []
+        length = 0
+        for fragment in reversed(self.fragments):
+            if length >= TAIL_LENGTH:
+                break
+            fragments.append(fragment)
+            length += len(fragment)
+
+        return "".join(reversed(fragments))[-TAIL_LENGTH:]
+
+
+class StreamSink(OutputSink):
+    """Writes the output to a text stream (stdout by default) as the program
+    runs, in chunks of about bufferSize characters."""
+
+    def __init__(self, stream=None, bufferSize=8192):
+        super().__init__()
+        self.stream = stream if stream is not None else sys.stdout
+        self.bufferSize = bufferSize
+        self._buffer = []
+        self._bufferLength = 0
+
+    @classmethod
+    def fromFile(cls, filename, bufferSize=8192):
+        return cls(open(filename, "w"), bufferSize)
+
+    def write(self, text):
+        self._keep(text)
+        self._buffer.append(text)
+        self._bufferLength += len(text)
+
+        if self._bufferLength >= self.bufferSize:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self.stream.write("".join(self._buffer))
+            self._buffer.clear()
+            self._bufferLength = 0
+
+        self.stream.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exceptionInfo):
+        self.close()
+
+    def close(self):
+        self.flush()
+        if self.stream not in (sys.stdout, sys.stderr):
+            self.stream.close()
+
+
+class CallbackSink(OutputSink):
+    """Passes every fragment of the output to callback as it is written."""
+
+    def __init__(self, callback):
+        super().__init__()
+        self.callback = callback
+
+    def write(self, text):
+        self._keep(text)
+        self.callback(text)
@@ -0,0 +1,608 @@
+from .source import Source
+from .syntax_tree import (
+    Assignment,
+    BinaryOperation,
+    Break,
+    Case,
+    Declaration,
+    ElseIf,
+    ExpressionStatement,
+    FunctionCall,
+    FunctionDefinition,
+    IfStatement,
+    Input,
+    Item,
+    ItemAssignment,
+    Literal,
+    Loop,
+    MakeBukkit,
+    MultipleOperandOperation,
+    NotOperation,
+    Output,
+    Program,
+    Recast,
+    Return,
+    Size,
+    SwitchStatement,
+    Typecast,
+    Variable,
+)
+from .token_cursor import TokenCursor
+from .token_enum import TOKEN
+
+BINARY_OPERATIONS = (
+    TOKEN.ADDITION_OPERATION,
+    TOKEN.SUBTRACTION_OPERATION,
+    TOKEN.MULTIPLICATION_OPERATION,
+    TOKEN.QUOTIENT_OPERATION,
+    TOKEN.MODULO_OPERATION,
+    TOKEN.MAX_OPERATION,
+    TOKEN.MIN_OPERATION,
+    TOKEN.AND_OPERATION,
+    TOKEN.OR_OPERATION,
+    TOKEN.XOR_OPERATION,
+    TOKEN.EQUAL_TO_OPERATION,
+    TOKEN.NOT_EQUAL_TO_OPERATION,
+)
+
+MULTIPLE_OPERAND_OPERATIONS = (
+    TOKEN.INFINITE_ARITY_AND_OPERATION,
+    TOKEN.INFINITE_ARITY_OR_OPERATION,
+    TOKEN.CONCATENATION_OPERATION,
+)
+
+LITERALS = (
+    TOKEN.BOOL_LITERAL,
+    TOKEN.FLOAT_LITERAL,
+    TOKEN.INTEGER_LITERAL,
+    TOKEN.STRING_LITERAL,
+    TOKEN.TYPE_LITERAL,
+)
+
+
+class Parser:
+    """Builds the syntax tree of a program from its tokens.
+
+    Statements and operands are chosen by their first token, so every
+    construct is parsed exactly once, however many times it later runs.
+    """
+
+    def __init__(self):
+        self.statementParsers = {
+            TOKEN.VARIABLE_DECLARATION: self._Declaration,
+            TOKEN.OUTPUT_KEYWORD: self._Output,
+            TOKEN.INPUT_KEYWORD: self._Input,
+            TOKEN.VARIABLE_IDENTIFIER: self._IdentifierStatement,
+            TOKEN.LOOP_DECLARATION_AND_DELIMITER: self._LoopStatement,
+            TOKEN.IF_ELSE_DELIMITER: self._IfStatement,
+            TOKEN.SWITCH_CASE_STATEMENT_DELIMITER: self._CaseStatement,
+            TOKEN.BREAK_STATEMENT: self._BreakStatement,
+            TOKEN.FUNCTION_DECLARATION: self._FunctionDefinition,
+            TOKEN.RETURN_KEYWORD: self._ReturnStatement,
+            TOKEN.ITEM_OPERATION: self._ItemStatement,
+        }
+
+        self.operandParsers = {
+            TOKEN.VARIABLE_IDENTIFIER: self._Variable,
+            TOKEN.NOT_OPERATION: self._NotOperation,
+            TOKEN.EXPLICIT_TYPECASTING_KEYWORD: self._ExplicitTypecast,
+            TOKEN.FUNCTION_CALL: self._FunctionCall,
+            TOKEN.BUKKIT_KEYWORD: self._Bukkit,
+            TOKEN.ITEM_OPERATION: self._Item,
+            TOKEN.SIZE_OPERATION: self._Size,
+        }
+        for literalType in LITERALS:
+            self.operandParsers[literalType] = self._Literal
+        for operationType in BINARY_OPERATIONS:
+            self.operandParsers[operationType] = self._TwoOperandOperation
+        for operationType in MULTIPLE_OPERAND_OPERATIONS:
+            self.operandParsers[operationType] = self._MultipleOperandOperation
+
+    def parse(self, tokens, sourceCode=None):
+        if sourceCode is None or isinstance(sourceCode, str):
+            sourceCode = Source.fromText(sourceCode or "")
+
+        self.source = sourceCode
+        self.tokens = TokenCursor(tokens)
+        self.lastToken = None
+
+        # GTFO is only allowed inside a loop, a switch or a function, and
+        # functions are only defined outside of any block
+        self.breakableDepth = 0
+        self.blockDepth = 0
+        self.isInFunction = False
+
+        return self._Program()
+
+    def _nextTokenIs(self, tokenType):
+        if self.tokens.isAtEnd():
+            return None
+
+        return self.tokens.peekKind() == tokenType
+
+    def _popNextToken(self):
+        if self.tokens.isAtEnd():
+            return None
+
+        self.lastToken = self.tokens.advance()
+        return self.lastToken
+
+    def _expectNextToken(self, tokenType, errorMessage):
+        if self._nextTokenIs(tokenType):
+            return self._popNextToken()
+
+        self._throwError(SyntaxError, errorMessage)
+
+    def _skipLinebreaks(self):
+        while self._nextTokenIs(TOKEN.LINEBREAK):
+            self._popNextToken()
+
+    def _throwError(self, errorType, message):
+        # points at the next unconsumed token, or the last one if none is left
+        errorToken = self.tokens.peek() or self.lastToken
+        lineNumber = errorToken.line if errorToken is not None else 1
+        columnNumber = errorToken.column if errorToken is not None else 0
+
+        errorArgs = (
+            None,
+            lineNumber,
+            columnNumber,
+            self.source.line(lineNumber),
+        )
+
+        raise errorType(message, errorArgs)
+
+    def _Program(self):
+        self._skipLinebreaks()
+
+        programToken = self._expectNextToken(
+            TOKEN.CODE_DELIMITER, 'Missing starting keyword "HAI"'
+        )
+
+        self._expectNextToken(TOKEN.LINEBREAK, "Missing linebreak")
+        self._skipLinebreaks()
+
+        statements = self._Statements()
+
+        self._expectNextToken(TOKEN.CODE_DELIMITER, 'Missing ending keyword "KTHXBYE"')
+
+        return Program(statements).at(programToken)
+
+    def _Statements(self):
+        statements = []
+        self.blockDepth += 1
+
+        while True:
+            statement = self._Statement()
+            if statement is None:
+                self.blockDepth -= 1
+                return statements
+
+            statements.append(statement)
+
+            self._expectNextToken(TOKEN.LINEBREAK, "Expected linebreak")
+            self._skipLinebreaks()
+
+    def _Statement(self):
+        statementParser = self.statementParsers.get(self.tokens.peekKind())
+        if statementParser is not None:
+            return statementParser()
+
+        expressionToken = self.tokens.peek()
+        expression = self._Operand()
+        if expression is not None:
+            return ExpressionStatement(expression).at(expressionToken)
+
+        return None
+
+    def _Declaration(self):
+        declarationToken = self._popNextToken()
+
+        variableIdentifierToken = self._expectNextToken(
+            TOKEN.VARIABLE_IDENTIFIER, "Expected a variable identifier"
+        )
+        value = None
+
+        if self._nextTokenIs(TOKEN.VARIABLE_ASSIGNMENT):
+            self._popNextToken()
+
+            value = self._Operand()
+            if value is None:
+                self._throwError(SyntaxError, "Expected an expression")
+
+        return Declaration(variableIdentifierToken.lexeme, value).at(declarationToken)
+
+    def _Output(self):
+        outputToken = self._popNextToken()
+
+        operands = [self._expectOperand("Expected an operand")]
+
+        while not (self._nextTokenIs(TOKEN.LINEBREAK) or self.tokens.isAtEnd()):
+            if self._nextTokenIs(TOKEN.OPERAND_SEPARATOR):
+                self._popNextToken()
+
+            operands.append(self._expectOperand("Expected an operand"))
+
+        return Output(operands).at(outputToken)
+
+    def _Input(self):
+        inputToken = self._popNextToken()
+
+        variableIdentifierToken = self._expectNextToken(
+            TOKEN.VARIABLE_IDENTIFIER, "Expected a variable identifier"
+        )
+
+        return Input(variableIdentifierToken.lexeme).at(inputToken)
+
+    def _IdentifierStatement(self):
+        # a statement starting with a variable is an assignment, a recast
+        # or an expression, depending on the token after it
+        statementStart = self.tokens.mark()
+        variableIdentifierToken = self._popNextToken()
+        variableIdentifier = variableIdentifierToken.lexeme
+
+        if self._nextTokenIs(TOKEN.VARIABLE_ASSIGNMENT):
+            self._popNextToken()
+
+            value = self._expectOperand("Expected operand")
+
+            return Assignment(variableIdentifier, value).at(variableIdentifierToken)
+
+        if self._nextTokenIs(TOKEN.RECASTING_KEYWORD):
+            self._popNextToken()
+
+            typeToken = self._expectNextToken(TOKEN.TYPE_LITERAL, "Expected operand")
+
+            return Recast(variableIdentifier, typeToken.lexeme).at(
+                variableIdentifierToken
+            )
+
+        self.tokens.reset(statementStart)
+
+        expression = self._Operand()
+        return ExpressionStatement(expression).at(variableIdentifierToken)
+
+    def _ItemStatement(self):
+        # ITEM OF starts an assignment to the item when R follows it
+        item = self._Item()
+
+        if self._nextTokenIs(TOKEN.VARIABLE_ASSIGNMENT):
+            self._popNextToken()
+
+            value = self._expectOperand("Expected operand")
+
+            return ItemAssignment(item.bukkit, item.index, value).at(item)
+
+        return ExpressionStatement(item).at(item)
+
+    def _IfStatement(self):
+        ifToken = self._popNextToken()
+
+        self._expectNextToken(TOKEN.LINEBREAK, "Expected a linebreak")
+        self._skipLinebreaks()
+        self._expectNextToken(TOKEN.IF_STATEMENT_KEYWORD, "Expected 'YA RLY'")
+        self._expectNextToken(TOKEN.LINEBREAK, "Expected a linebreak")
+        self._skipLinebreaks()
+
+        ifBlock = self._Statements()
+
+        elseIfs = []
+        while self._nextTokenIs(TOKEN.ELSE_IF_STATEMENT_KEYWORD):
+            elseIfToken = self._popNextToken()
+
+            condition = self._expectOperand("Expected an operand")
+            self._expectNextToken(TOKEN.LINEBREAK, "Expected a linebreak")
+            self._skipLinebreaks()
+
+            elseIfs.append(ElseIf(condition, self._Statements()).at(elseIfToken))
+
+        elseBlock = None
+
+        if self._nextTokenIs(TOKEN.ELSE_STATEMENT_KEYWORD):
+            self._popNextToken()
+
+            self._expectNextToken(TOKEN.LINEBREAK, "Expected a linebreak")
+            self._skipLinebreaks()
+
+            elseBlock = self._Statements()
+
+        self._expectNextToken(TOKEN.FLOW_CONTROL_STATEMENTS_DELIMITER, "Expected 'OIC'")
+
+        return IfStatement(ifBlock, elseIfs, elseBlock).at(ifToken)
+
+    def _CaseStatement(self):
+        switchToken = self._popNextToken()
+        cases = []
+
+        self._expectNextToken(TOKEN.LINEBREAK, "Expected a linebreak")
+        self._skipLinebreaks()
+
+        if not self._nextTokenIs(TOKEN.CASE_KEYWORD):
+            self._throwError(SyntaxError, "Expected keyword 'OMG'")
+
+        self.breakableDepth += 1
+
+        while self._nextTokenIs(TOKEN.CASE_KEYWORD):
+            caseToken = self._popNextToken()
+
+            if self.tokens.peekKind() not in LITERALS:
+                self._throwError(SyntaxError, "Expected a literal")
+            literal = self._Literal()
+
+            self._expectNextToken(TOKEN.LINEBREAK, "Expected a linebreak")
+            self._skipLinebreaks()
+
+            cases.append(Case(literal, self._Statements()).at(caseToken))
+
+        if self._nextTokenIs(TOKEN.DEFAULT_CASE_KEYWORD):
+            defaultCaseToken = self._popNextToken()
+
+            self._expectNextToken(TOKEN.LINEBREAK, "Expected a linebreak")
+            self._skipLinebreaks()
+
+            cases.append(Case(None, self._Statements()).at(defaultCaseToken))
+
+        self.breakableDepth -= 1
+
+        self._expectNextToken(TOKEN.FLOW_CONTROL_STATEMENTS_DELIMITER, "Expected 'OIC'")
+
+        return SwitchStatement(cases).at(switchToken)
+
+    def _LoopStatement(self):
+        loopToken = self._popNextToken()
+
+        loopIdentifierToken = self._expectNextToken(
+            TOKEN.LOOP_IDENTIFIER, "Missing loop name"
+        )
+        loopIdentifier = loopIdentifierToken.lexeme
+
+        # a loop going through EACH item of a BUKKIT has no step
+        delta = 0
+        if self._nextTokenIs(TOKEN.EACH_KEYWORD):
+            self._popNextToken()
+        elif self._nextTokenIs(TOKEN.INCREMENT_KEYWORD) or self._nextTokenIs(
+            TOKEN.DECREMENT_KEYWORD
+        ):
+            deltaToken = self._popNextToken()
+            delta = 1 if deltaToken.lexeme == "UPPIN" else -1
+        else:
+            self._throwError(SyntaxError, "Missing UPPIN/NERFIN/EACH keyword")
+
+        self._expectNextToken(TOKEN.KEYWORD_IN_LOOP, 'Missing keyword "YR"')
+
+        variableIdentifierToken = self._expectNextToken(
+            TOKEN.VARIABLE_IDENTIFIER, "Missing variable"
+        )
+
+        conditionKeyword = None
+        condition = None
+        collection = None
+        if delta == 0:
+            self._expectNextToken(TOKEN.IN_KEYWORD, 'Missing keyword "IN"')
+            collection = self._expectOperand("Expected an expression")
+        elif self._nextTokenIs(TOKEN.LOOP_CONDITION_KEYWORD):
+            conditionKeyword = self._popNextToken().lexeme
+            condition = self._expectOperand("Expected an expression")
+
+        self._expectNextToken(TOKEN.LINEBREAK, "Missing condition or new line")
+        self._skipLinebreaks()
+
+        self.breakableDepth += 1
+        body = self._Statements()
+        self.breakableDepth -= 1
+
+        self._expectNextToken(TOKEN.LOOP_DELIMITER, "Missing loop closing")
+
+        closingIdentifierToken = self._expectNextToken(
+            TOKEN.LOOP_IDENTIFIER, "Missing loop identifier"
+        )
+        if closingIdentifierToken.lexeme != loopIdentifier:
+            self._throwError(
+                SyntaxError, f'Expected loop identifier "{loopIdentifier}"'
+            )
+
+        return Loop(
+            loopIdentifier,
+            delta,
+            variableIdentifierToken.lexeme,
+            conditionKeyword,
+            condition,
+            body,
+            collection,
+        ).at(loopToken)
+
+    def _BreakStatement(self):
+        if self.breakableDepth == 0:
+            self._throwError(SyntaxError, "GTFO outside of a loop or switch")
+
+        breakToken = self._popNextToken()
+        return Break().at(breakToken)
+
+    def _FunctionDefinition(self):
+        if self.blockDepth > 1:
+            self._throwError(SyntaxError, "Functions can only be defined at top level")
+
+        functionToken = self._popNextToken()
+        nameToken = self._expectNextToken(
+            TOKEN.FUNCTION_IDENTIFIER, "Missing function name"
+        )
+
+        parameters = []
+        if self._nextTokenIs(TOKEN.KEYWORD_IN_LOOP):
+            parameters.append(self._parameter())
+
+            while self._nextTokenIs(TOKEN.OPERAND_SEPARATOR):
+                self._popNextToken()
+                parameters.append(self._parameter())
+
+        self._expectNextToken(TOKEN.LINEBREAK, "Expected a linebreak")
+        self._skipLinebreaks()
+
+        # a GTFO outside of a loop or switch returns NOOB
+        self.breakableDepth += 1
+        self.isInFunction = True
+        body = self._Statements()
+        self.isInFunction = False
+        self.breakableDepth -= 1
+
+        self._expectNextToken(TOKEN.FUNCTION_DELIMITER, "Expected 'IF U SAY SO'")
+
+        return FunctionDefinition(nameToken.lexeme, parameters, body).at(functionToken)
+
+    def _parameter(self):
+        self._expectNextToken(TOKEN.KEYWORD_IN_LOOP, 'Missing keyword "YR"')
+        parameterToken = self._expectNextToken(
+            TOKEN.VARIABLE_IDENTIFIER, "Missing parameter name"
+        )
+
+        return parameterToken.lexeme
+
+    def _ReturnStatement(self):
+        if not self.isInFunction:
+            self._throwError(SyntaxError, "FOUND YR outside of a function")
+
+        returnToken = self._popNextToken()
+        value = self._expectOperand("Expected an operand")
+
+        return Return(value).at(returnToken)
+
+    def _expectOperand(self, errorMessage):
+        operand = self._Operand()
+        if operand is None:
+            self._throwError(SyntaxError, errorMessage)
+
+        return operand
+
+    def _Operand(self):
+        operandParser = self.operandParsers.get(self.tokens.peekKind())
+        if operandParser is None:
+            return None
+
+        return operandParser()
+
+    def _Literal(self):
+        literalToken = self._popNextToken()
+        lexeme = literalToken.lexeme
+
+        if literalToken.lexemeType == TOKEN.BOOL_LITERAL:
+            value = lexeme == "WIN"
+        elif literalToken.lexemeType == TOKEN.FLOAT_LITERAL:
+            value = float(lexeme)
+        elif literalToken.lexemeType == TOKEN.INTEGER_LITERAL:
+            value = int(lexeme)
+        elif literalToken.lexemeType == TOKEN.STRING_LITERAL:
+            value = lexeme[1:-1]  # remove quotes
+        else:
+            value = lexeme  # type literals evaluate to their name
+
+        return Literal(value).at(literalToken)
+
+    def _Variable(self):
+        identifierToken = self._popNextToken()
+        return Variable(identifierToken.lexeme).at(identifierToken)
+
+    def _TwoOperandOperation(self):
+        operationToken = self._popNextToken()
+
+        firstOperand = self._expectOperand("Expected an operand")
+        self._expectNextToken(TOKEN.OPERAND_SEPARATOR, 'Missing keyword "AN"')
+        secondOperand = self._expectOperand("Expected an operand")
+
+        return BinaryOperation(
+            operationToken.lexemeType, firstOperand, secondOperand
+        ).at(operationToken)
+
+    def _NotOperation(self):
+        notToken = self._popNextToken()
+
+        operand = self._expectOperand("Expected an operand")
+        return NotOperation(operand).at(notToken)
+
+    def _MultipleOperandOperation(self):
+        operationToken = self._popNextToken()
+        isConcatenation = operationToken.lexemeType == TOKEN.CONCATENATION_OPERATION
+
+        operands = [self._expectOperand("Expected an operand")]
+        self._expectNextToken(TOKEN.OPERAND_SEPARATOR, 'Missing keyword "AN"')
+        operands.append(self._expectOperand("Expected an operand"))
+
+        while self._nextTokenIs(TOKEN.OPERAND_SEPARATOR):
+            self._popNextToken()
+            operands.append(self._expectOperand("Expected an operand"))
+
+        # MKAY is optional after SMOOSH
+        if self._nextTokenIs(TOKEN.INFINITE_ARITY_DELIMITER) or not isConcatenation:
+            self._expectNextToken(
+                TOKEN.INFINITE_ARITY_DELIMITER, 'Missing keyword "MKAY"'
+            )
+
+        return MultipleOperandOperation(operationToken.lexemeType, operands).at(
+            operationToken
+        )
+
+    def _FunctionCall(self):
+        callToken = self._popNextToken()
+        nameToken = self._expectNextToken(
+            TOKEN.FUNCTION_IDENTIFIER, "Missing function name"
+        )
+
+        arguments = []
+        if self._nextTokenIs(TOKEN.KEYWORD_IN_LOOP):
+            self._popNextToken()
+            arguments.append(self._expectOperand("Expected an operand"))
+
+            while self._nextTokenIs(TOKEN.OPERAND_SEPARATOR):
+                self._popNextToken()
+                self._expectNextToken(TOKEN.KEYWORD_IN_LOOP, 'Missing keyword "YR"')
+                arguments.append(self._expectOperand("Expected an operand"))
+
+        self._expectNextToken(TOKEN.INFINITE_ARITY_DELIMITER, 'Missing keyword "MKAY"')
+
+        return FunctionCall(nameToken.lexeme, arguments).at(callToken)
+
+    def _Bukkit(self):
+        # BUKKIT is an empty one, BUKKIT OF ... MKAY one with items
+        bukkitToken = self._popNextToken()
+
+        items = []
+        if bukkitToken.lexeme != "BUKKIT":
+            items.append(self._expectOperand("Expected an operand"))
+
+            while self._nextTokenIs(TOKEN.OPERAND_SEPARATOR):
+                self._popNextToken()
+                items.append(self._expectOperand("Expected an operand"))
+
+            self._expectNextToken(
+                TOKEN.INFINITE_ARITY_DELIMITER, 'Missing keyword "MKAY"'
+            )
+
+        return MakeBukkit(items).at(bukkitToken)
+
+    def _Item(self):
+        itemToken = self._popNextToken()
+
+        bukkit = self._expectOperand("Expected an operand")
+        self._expectNextToken(TOKEN.OPERAND_SEPARATOR, 'Missing keyword "AN"')
+        index = self._expectOperand("Expected an operand")
+
+        return Item(bukkit, index).at(itemToken)
+
+    def _Size(self):
+        sizeToken = self._popNextToken()
+
+        bukkit = self._expectOperand("Expected an operand")
+        return Size(bukkit).at(sizeToken)
+
+    def _ExplicitTypecast(self):
+        typecastToken = self._popNextToken()
+
+        if not self._nextTokenIs(TOKEN.VARIABLE_IDENTIFIER):
+            self._throwError(SyntaxError, "Expected a variable")
+        operand = self._Variable()
+
+        if self._nextTokenIs(TOKEN.OPTIONAL_A_KEYWORD):
+            self._popNextToken()
+
+        typeToken = self._expectNextToken(TOKEN.TYPE_LITERAL, "Expected a type")
+
+        return Typecast(operand, typeToken.lexeme).at(typecastToken)
@@ -0,0 +1,409 @@
+from .environment import Environment
+from .runtime import IT_VARIABLE, UNSET, caseKeys
+from .syntax_tree import (
+    Assignment,
+    BinaryOperation,
+    Block,
+    Break,
+    Declaration,
+    ExpressionStatement,
+    FunctionCall,
+    FunctionDefinition,
+    IfStatement,
+    Input,
+    Invariant,
+    Item,
+    ItemAssignment,
+    Literal,
+    Loop,
+    MakeBukkit,
+    MultipleOperandOperation,
+    NotOperation,
+    Output,
+    Recast,
+    Return,
+    Size,
+    SwitchStatement,
+    Typecast,
+    Variable,
+)
+from .token_enum import TOKEN
+
+
+class Frame:
+    """The values of a running program's variables, one item of the values
+    list per slot.
+
+    slotNames names every slot, and globalSlots maps the variables of the
+    outermost scope to theirs, for the symbol table and for debugging. A
+    Frame can also be read like a mapping of those variables, e.g.
+    memory["var"], which raises KeyError for a variable that is not set.
+    """
+
+    __slots__ = ("values", "slotNames", "globalSlots")
+
+    def __init__(self, slotNames=(), globalSlots=None):
+        self.values = [UNSET] * len(slotNames)
+        self.slotNames = slotNames
+        self.globalSlots = globalSlots or {}
+
+    def __getitem__(self, identifier):
+        value = self.values[self.globalSlots[identifier]]
+        if value is UNSET:
+            raise KeyError(identifier)
+
+        return value
+
+    def __contains__(self, identifier):
+        slot = self.globalSlots.get(identifier)
+        return slot is not None and self.values[slot] is not UNSET
+
+    def flatten(self):
+        """Returns the variables of the outermost scope that are set."""
+        return {
+            identifier: self.values[slot]
+            for identifier, slot in self.globalSlots.items()
+            if self.values[slot] is not UNSET
+        }
+
+
+class Resolver:
+    """Gives every variable a slot in a flat Frame, so the engines read and
+    write variables by index instead of by name.
+
+    Scopes follow the blocks, as Environments mapping names to slots: I HAS A
+    takes a new slot in the current scope (or the one it already has there),
+    and a variable is looked up from the current scope outwards. GIMMEH and
+    IT on a variable no scope has yet declare it in the current one. Using a
+    variable that is not declared is reported here, before the program runs.
+
+    The cases of a WTF? share a scope, but the switch may jump past a
+    declaration; their slots are cleared before the cases run, and reading
+    an UNSET slot raises NameError as before. The switch also gets its jump
+    table, so running it takes one lookup whatever the number of cases.
+
+    Loops whose condition is TIL BOTH SAEM or WILE DIFFRINT of the counter
+    and a NUMBR literal or variable get a countedLimit, unless their body
+    writes the counter or the limit variable; the engines can then run them
+    over a range. A loop going through EACH item of a BUKKIT gets a slot
+    that no scope names, which the engines may keep its iterator in.
+
+    A function body only sees its parameters and its own variables, so it
+    is laid out in a frame of its own, and a call cannot write the
+    variables of its caller. Functions can be called before their
+    definition; calls of unknown functions and calls with the wrong number
+    of arguments are reported here too.
+    """
+
+    def __init__(self, source):
+        self.source = source
+
+        self.statementResolvers = {
+            Declaration: self._Declaration,
+            Assignment: self._AssignmentStatement,
+            Recast: self._RecastingStatement,
+            Output: self._Output,
+            Input: self._Input,
+            ExpressionStatement: self._ExpressionStatement,
+            Block: self._BlockStatement,
+            IfStatement: self._IfStatement,
+            SwitchStatement: self._CaseStatement,
+            Loop: self._LoopStatement,
+            Break: self._BreakStatement,
+            FunctionDefinition: self._FunctionDefinition,
+            Return: self._ReturnStatement,
+            ItemAssignment: self._ItemAssignment,
+        }
+
+        self.expressionResolvers = {
+            Literal: self._Literal,
+            Variable: self._Variable,
+            BinaryOperation: self._TwoOperandOperation,
+            NotOperation: self._NotOperation,
+            MultipleOperandOperation: self._MultipleOperandOperation,
+            Typecast: self._ExplicitTypecast,
+            FunctionCall: self._FunctionCall,
+            Invariant: self._InvariantExpression,
+            MakeBukkit: self._Bukkit,
+            Item: self._Item,
+            Size: self._Size,
+        }
+
+    def resolve(self, program):
+        self.slotNames = []
+        self.scope = Environment()
+
+        # the loops whose body is being resolved
+        self.loops = []
+
+        # functions are only defined at top level, and can be called from
+        # anywhere in the program
+        self.functions = {}
+        self.function = None
+        for statement in program.statements:
+            if isinstance(statement, FunctionDefinition):
+                if statement.name in self.functions:
+                    self._throwError(
+                        SyntaxError, f"{statement.name} is already defined", statement
+                    )
+                self.functions[statement.name] = statement
+
+        self._Statements(program.statements)
+
+        program.slotNames = self.slotNames
+        program.globalSlots = self.scope.flatten()
+
+        return program
+
+    def _throwError(self, errorType, message, node):
+        errorArgs = (
+            None,
+            node.line,
+            node.column,
+            self.source.line(node.line),
+        )
+
+        raise errorType(message, errorArgs)
+
+    def _declare(self, identifier):
+        if identifier not in self.scope.variables:
+            self.scope.declare(identifier, len(self.slotNames))
+            self.slotNames.append(identifier)
+
+        return self.scope[identifier]
+
+    def _lookUp(self, identifier, node):
+        try:
+            return self.scope[identifier]
+        except KeyError:
+            self._throwError(NameError, f"{identifier} is not defined", node)
+
+    def _lookUpOrDeclare(self, identifier):
+        if identifier in self.scope:
+            return self.scope[identifier]
+
+        return self._declare(identifier)
+
+    def _expectDeclared(self, identifier, node):
+        if identifier not in self.scope:
+            self._throwError(SyntaxError, "Variable not declared", node)
+
+        return self.scope[identifier]
+
+    def _written(self, slot):
+        # loops whose counter or limit changes in their body are not counted
+        for loop in self.loops:
+            if loop.countedLimit is not None and slot in (
+                loop.counterSlot,
+                loop.countedLimit[0],
+            ):
+                loop.countedLimit = None
+
+    def _Statements(self, statements):
+        for statement in statements:
+            self.statementResolvers[type(statement)](statement)
+
+    def _Block(self, statements):
+        self.scope = self.scope.child()
+        self._Statements(statements)
+        self.scope = self.scope.parent
+
+    def _Declaration(self, declaration):
+        # the value is read before the variable exists
+        if declaration.value is not None:
+            self._Operand(declaration.value)
+
+        declaration.slot = self._declare(declaration.identifier)
+        self._written(declaration.slot)
+
+    def _AssignmentStatement(self, assignment):
+        assignment.slot = self._expectDeclared(assignment.identifier, assignment)
+        self._Operand(assignment.value)
+        self._written(assignment.slot)
+
+    def _RecastingStatement(self, recast):
+        recast.slot = self._expectDeclared(recast.identifier, recast)
+        self._written(recast.slot)
+
+    def _ItemAssignment(self, assignment):
+        # writes an item, not a variable
+        self._Operand(assignment.bukkit)
+        self._Operand(assignment.index)
+        self._Operand(assignment.value)
+
+    def _Output(self, output):
+        for operand in output.operands:
+            self._Operand(operand)
+
+    def _Input(self, input):
+        input.slot = self._lookUpOrDeclare(input.identifier)
+        self._written(input.slot)
+
+    def _ExpressionStatement(self, statement):
+        self._Operand(statement.expression)
+        statement.itSlot = self._lookUpOrDeclare(IT_VARIABLE)
+        self._written(statement.itSlot)
+
+    def _BlockStatement(self, block):
+        self._Block(block.statements)
+
+    def _IfStatement(self, ifStatement):
+        ifStatement.itSlot = self._lookUp(IT_VARIABLE, ifStatement)
+
+        self._Block(ifStatement.ifBlock)
+        for elseIf in ifStatement.elseIfs:
+            self._Operand(elseIf.condition)
+            self._Block(elseIf.block)
+        if ifStatement.elseBlock is not None:
+            self._Block(ifStatement.elseBlock)
+
+    def _BreakStatement(self, breakStatement):
+        pass
+
+    def _FunctionDefinition(self, function):
+        callerState = (self.slotNames, self.scope, self.loops)
+        self.slotNames = []
+        self.scope = Environment()
+        self.loops = []
+        self.function = function
+
+        for parameter in function.parameters:
+            if parameter in self.scope:
+                self._throwError(
+                    SyntaxError, f"{parameter} is already a parameter", function
+                )
+            self._declare(parameter)
+
+        function.itSlot = self._declare(IT_VARIABLE)
+        self._Statements(function.body)
+        function.slotNames = self.slotNames
+
+        self.slotNames, self.scope, self.loops = callerState
+        self.function = None
+
+    def _ReturnStatement(self, returnStatement):
+        self._Operand(returnStatement.value)
+
+        value = returnStatement.value
+        returnStatement.isTailCall = (
+            isinstance(value, FunctionCall) and value.function is self.function
+        )
+
+    def _CaseStatement(self, switchStatement):
+        switchStatement.itSlot = self._lookUp(IT_VARIABLE, switchStatement)
+
+        firstSlot = len(self.slotNames)
+        self.scope = self.scope.child()
+        for case in switchStatement.cases:
+            self._Statements(case.block)
+        self.scope = self.scope.parent
+
+        switchStatement.localSlots = (firstSlot, len(self.slotNames))
+
+        # an earlier case keeps a key a later one repeats, as it matches first
+        jumpTable = {}
+        defaultCase = len(switchStatement.cases)
+        for caseIndex, case in enumerate(switchStatement.cases):
+            if case.literal is None:
+                defaultCase = caseIndex
+            else:
+                for key in caseKeys(case.literal.value):
+                    jumpTable.setdefault(key, caseIndex)
+
+        switchStatement.jumpTable = jumpTable
+        switchStatement.defaultCase = defaultCase
+
+    def _LoopStatement(self, loop):
+        # the counter is updated outside the body
+        loop.counterSlot = self._lookUp(loop.counter, loop)
+        self._written(loop.counterSlot)
+        if loop.condition is not None:
+            self._Operand(loop.condition)
+        if loop.collection is not None:
+            self._Operand(loop.collection)
+            loop.iteratorSlot = len(self.slotNames)
+            self.slotNames.append(f"{loop.label} iterator")
+
+        loop.countedLimit = self._countedLimit(loop)
+        self.loops.append(loop)
+        self._Block(loop.body)
+        self.loops.pop()
+
+    def _countedLimit(self, loop):
+        # both conditions stop the loop when the counter reaches the limit
+        condition = loop.condition
+        stopOperator = {
+            "TIL": TOKEN.EQUAL_TO_OPERATION,
+            "WILE": TOKEN.NOT_EQUAL_TO_OPERATION,
+        }.get(loop.conditionKeyword)
+
+        if not (
+            isinstance(condition, BinaryOperation)
+            and condition.operator == stopOperator
+        ):
+            return None
+
+        operands = (condition.left, condition.right)
+        for counter, limit in (operands, operands[::-1]):
+            if not (isinstance(counter, Variable) and counter.slot == loop.counterSlot):
+                continue
+
+            if isinstance(limit, Literal) and type(limit.value) is int:
+                return None, limit.value
+            if isinstance(limit, Variable) and limit.slot != loop.counterSlot:
+                return limit.slot, None
+
+        return None
+
+    def _Operand(self, expression):
+        self.expressionResolvers[type(expression)](expression)
+
+    def _Literal(self, literal):
+        pass
+
+    def _Variable(self, variable):
+        variable.slot = self._lookUp(variable.identifier, variable)
+
+    def _TwoOperandOperation(self, operation):
+        self._Operand(operation.left)
+        self._Operand(operation.right)
+
+    def _NotOperation(self, operation):
+        self._Operand(operation.operand)
+
+    def _MultipleOperandOperation(self, operation):
+        for operand in operation.operands:
+            self._Operand(operand)
+
+    def _ExplicitTypecast(self, typecast):
+        self._Operand(typecast.operand)
+
+    def _FunctionCall(self, call):
+        function = self.functions.get(call.name)
+        if function is None:
+            self._throwError(NameError, f"{call.name} is not defined", call)
+
+        if len(call.arguments) != len(function.parameters):
+            self._throwError(
+                SyntaxError,
+                f"{call.name} takes {len(function.parameters)} arguments",
+                call,
+            )
+
+        for argument in call.arguments:
+            self._Operand(argument)
+        call.function = function
+
+    def _Bukkit(self, bukkit):
+        for item in bukkit.items:
+            self._Operand(item)
+
+    def _Item(self, item):
+        self._Operand(item.bukkit)
+        self._Operand(item.index)
+
+    def _Size(self, size):
+        self._Operand(size.bukkit)
+
+    def _InvariantExpression(self, invariant):
+        self._Operand(invariant.expression)
@@ -0,0 +1,72 @@
+# SMOOSH results shorter than this stay plain strs, which are cheaper to copy
+# than to keep in pieces
+ROPE_THRESHOLD = 1024
+
+
+class Rope:
+    """A long YARN built by SMOOSH, kept as the strs it was joined from.
+
+    A Rope reads the first count items of its pieces list. Appending to the
+    Rope that reads all of them extends the list in place and returns a new
+    Rope reading the longer list, so building a YARN piece by piece (str R
+    SMOOSH str AN piece MKAY) takes linear time instead of copying the whole
+    YARN every time. Appending to an older Rope copies its own pieces first,
+    as they are shared with the newer one.
+
+    It is flattened into a str, once, when a YARN is needed: to print it,
+    to cast it, to read it as a number or to compare it. Ropes are equal to
+    and hash like the str they stand for.
+    """
+
+    __slots__ = ("pieces", "count", "length")
+
+    def __init__(self, pieces, count, length):
+        self.pieces = pieces
+        self.count = count
+        self.length = length
+
+    @classmethod
+    def fromText(cls, text):
+        return cls([text], 1, len(text))
+
+    def extend(self, yarns):
+        """Returns the Rope of this YARN followed by the strs yarns."""
+        pieces = self.pieces
+        if len(pieces) != self.count:
+            pieces = pieces[: self.count]
+
+        length = self.length
+        for yarn in yarns:
+            if yarn:
+                pieces.append(yarn)
+                length += len(yarn)
+
+        return Rope(pieces, len(pieces), length)
+
+    def flatten(self):
+        if self.count > 1:
+            # the joined text replaces the pieces, in a list of its own, so
+            # newer Ropes sharing them are not affected
+            self.pieces = ["".join(self.pieces[: self.count])]
+            self.count = 1
+
+        return self.pieces[0]
+
+    __str__ = flatten
+
+    def __repr__(self):
+        return repr(self.flatten())
+
+    def __len__(self):
+        return self.length
+
+    def __bool__(self):
+        return self.length > 0
+
+    def __eq__(self, other):
+        if isinstance(other, (str, Rope)):
+            return self.flatten() == str(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.flatten())
@@ -0,0 +1,271 @@
+"""Value semantics shared by the execution engines.
+
+Operations here raise errors without a position; the engine running the
+program re-raises them at the node being executed (see describeError).
+"""
+
+import math
+import operator
+
+from .bukkit import Bukkit
+from .rope import ROPE_THRESHOLD, Rope
+from .token_enum import TOKEN
+from .utils import parseNumber, toNumber
+
+IT_VARIABLE = "IT"
+
+# errors an operation or a typecast can raise on bad operands
+OPERATION_ERRORS = (SyntaxError, ValueError, TypeError, ArithmeticError)
+
+# the value of an Invariant that could not be worked out before its loop
+NOT_HOISTED = object()
+
+# the value of a variable slot whose declaration has not run
+UNSET = object()
+
+# the classes of YARN values: long SMOOSH results are Ropes
+YARN_TYPES = (str, Rope)
+
+# how many function bodies can run at once, on every engine: a call made
+# while MAX_CALL_DEPTH are running fails with NESTED_CALLS_MESSAGE at the
+# call (self tail calls reuse the caller's frame, so do not count)
+MAX_CALL_DEPTH = 1000
+NESTED_CALLS_MESSAGE = "Too many nested calls to {}"
+
+
+def describeError(error):
+    """Returns the error type and message to report for an operation error."""
+    if isinstance(error, SyntaxError):
+        return SyntaxError, error.msg
+
+    return ValueError, str(error)
+
+
+def _expectNumbers(a, b):
+    if not (isinstance(a, (int, float)) and isinstance(b, (int, float))):
+        raise SyntaxError("Invalid Type")
+
+
+def _equalTo(a, b):
+    _expectNumbers(a, b)
+    return a == b
+
+
+def _notEqualTo(a, b):
+    _expectNumbers(a, b)
+    return a != b
+
+
+def _xor(a, b):
+    return bool(a) is not bool(b)
+
+
+# operations whose YARN operands are read as numbers
+ARITHMETIC_OPERATORS = {
+    TOKEN.ADDITION_OPERATION: operator.add,
+    TOKEN.SUBTRACTION_OPERATION: operator.sub,
+    TOKEN.MULTIPLICATION_OPERATION: operator.mul,
+    TOKEN.QUOTIENT_OPERATION: operator.truediv,
+    TOKEN.MODULO_OPERATION: operator.mod,
+    TOKEN.MAX_OPERATION: max,
+    TOKEN.MIN_OPERATION: min,
+}
+
+
+def _onNumbers(function):
+    # only YARNs need converting, so numbers skip the call to toNumber
+    def operation(a, b):
+        if a.__class__ is str:
+            a = parseNumber(a)
+        elif a.__class__ is Rope:
+            a = parseNumber(a.flatten())
+        if b.__class__ is str:
+            b = parseNumber(b)
+        elif b.__class__ is Rope:
+            b = parseNumber(b.flatten())
+
+        return function(a, b)
+
+    return operation
+
+
+OPERATIONS = {
+    **{
+        operationType: _onNumbers(function)
+        for operationType, function in ARITHMETIC_OPERATORS.items()
+    },
+    TOKEN.AND_OPERATION: lambda a, b: bool(a and b),
+    TOKEN.OR_OPERATION: lambda a, b: bool(a or b),
+    TOKEN.XOR_OPERATION: _xor,
+    TOKEN.EQUAL_TO_OPERATION: _equalTo,
+    TOKEN.NOT_EQUAL_TO_OPERATION: _notEqualTo,
+}
+
+
+# the TROOF an operand of BOTH OF, EITHER OF, ALL OF or ANY OF has to be for
+# the result to be known; the operands after it are not evaluated
+SHORT_CIRCUIT_VALUES = {
+    TOKEN.AND_OPERATION: False,
+    TOKEN.OR_OPERATION: True,
+    TOKEN.INFINITE_ARITY_AND_OPERATION: False,
+    TOKEN.INFINITE_ARITY_OR_OPERATION: True,
+}
+
+
+def operate(operationType, a, b):
+    return OPERATIONS[operationType](a, b)
+
+
+def counterRange(loop, values):
+    """Returns the range of counter values a counted loop (one with a
+    countedLimit) runs its body for, or None when the counter and the limit
+    are not NUMBRs going the right way and the loop must run as usual."""
+    limitSlot, limit = loop.countedLimit
+    if limitSlot is not None:
+        limit = values[limitSlot]
+    start = values[loop.counterSlot]
+
+    if (
+        start.__class__ is int
+        and limit.__class__ is int
+        and (limit - start) * loop.delta >= 0
+    ):
+        return range(start, limit, loop.delta)
+
+    return None
+
+
+def caseKey(value):
+    """Returns the key IT is looked up by in the jump table of a WTF?.
+
+    A key pairs the kind of a value with the value: NUMBRs and NUMBARs share
+    one, so OMG 3 matches IT 3.0 as BOTH SAEM would, while a TROOF only
+    matches a TROOF case. A value no case can match, e.g. NOOB, has None.
+    """
+    valueClass = value.__class__
+    if valueClass is bool:
+        return ("TROOF", value)
+    if valueClass is int or valueClass is float:
+        return ("NUMBER", value)
+    if valueClass is str:
+        return ("YARN", value)
+    if valueClass is Rope:
+        return ("YARN", value.flatten())
+    return None
+
+
+def caseKeys(literal):
+    """Returns the keys an OMG literal is entered under in a jump table.
+
+    Besides its own key, a number case takes the YARN spelling it, and a
+    YARN case spelling a number takes that number, so a YARN read by GIMMEH
+    still matches OMG 3 and a NUMBR matches OMG "3", as they did when cases
+    were compared by their string form.
+    """
+    key = caseKey(literal)
+    if key[0] == "NUMBER":
+        return (key, ("YARN", str(literal)))
+
+    if key[0] == "YARN":
+        try:
+            number = parseNumber(literal)
+        except ValueError:
+            return (key,)
+        if math.isfinite(number) and str(number) == literal:
+            return (key, ("NUMBER", number))
+
+    return (key,)
+
+
+def _expectBukkit(value):
+    if value.__class__ is not Bukkit:
+        raise SyntaxError("Expected a BUKKIT")
+    return value
+
+
+def _index(value):
+    # a YARN read by GIMMEH can be an index too
+    index = toNumber(value)
+    if index.__class__ is not int:
+        raise ValueError(f"A BUKKIT index must be a NUMBR, not {toYarn(value)!r}")
+    return index
+
+
+def getItem(bukkit, index):
+    """Returns the item of a BUKKIT at index, for ITEM OF."""
+    return _expectBukkit(bukkit)[_index(index)]
+
+
+def setItem(bukkit, index, value):
+    """Sets the item of a BUKKIT at index, or adds it just past the end."""
+    _expectBukkit(bukkit)[_index(index)] = value
+
+
+def bukkitSize(bukkit):
+    return len(_expectBukkit(bukkit))
+
+
+def bukkitItems(value):
+    """Returns an iterator over the items of a BUKKIT, for the loops going
+    through each of them."""
+    return iter(_expectBukkit(value))
+
+
+def typeCast(typeName, value):
+    if isinstance(value, str):
+        return value
+    if isinstance(value, Rope):
+        return value.flatten()
+
+    if typeName == "TROOF":
+        return bool(value)
+
+    if isinstance(value, Bukkit) and typeName in ("NUMBR", "NUMBAR"):
+        raise SyntaxError(f"Cannot cast a BUKKIT to a {typeName}")
+
+    if typeName == "NUMBAR":
+        return float(value) if value != None else 0.0
+
+    if typeName == "NUMBR":
+        return int(value) if value != None else 0
+
+    if typeName == "YARN":
+        return toYarn(value)
+
+
+def toYarn(value):
+    if isinstance(value, str):
+        return value
+
+    if isinstance(value, Rope):
+        return value.flatten()
+
+    if value == None:
+        return ""
+
+    if isinstance(value, bool):
+        return "WIN" if value else "FAIL"
+
+    if isinstance(value, (int, float)):
+        return str(round(value, 2))
+
+    # a BUKKIT prints as its items
+    if isinstance(value, Bukkit):
+        return " ".join([toYarn(item) for item in value.items])
+
+
+def smoosh(values):
+    """Returns the YARNs of values joined, for SMOOSH.
+
+    A result longer than ROPE_THRESHOLD is a Rope, and one starting with a
+    Rope extends it, so appending to a YARN in a loop takes linear time.
+    """
+    first = values[0]
+    if first.__class__ is Rope:
+        return first.extend([toYarn(value) for value in values[1:]])
+
+    text = "".join([toYarn(value) for value in values])
+    if len(text) < ROPE_THRESHOLD:
+        return text
+
+    return Rope.fromText(text)
@@ -0,0 +1,105 @@
+import mmap
+from array import array
+
+
+class Source:
+    """Source code as a sequence of lines, without the line breaks.
+
+    A Source is either backed by a string or by a memory-mapped file. Line
+    start offsets are indexed once, the first time a line is looked up by
+    number, and lines are only decoded when they are read, so the lexer can
+    walk a large file while only one copy of it sits in memory.
+    """
+
+    def __init__(self, content, file=None):
+        self.content = content
+        self.file = file
+        self._lineOffsets = None
+
+        if isinstance(content, str):
+            self.lineBreak = "\n"
+        else:
+            self.lineBreak = b"\n"
+
+    @classmethod
+    def fromText(cls, text):
+        return cls(text)
+
+    @classmethod
+    def fromFile(cls, filename):
+        file = open(filename, "rb")
+
+        try:
+            content = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files cannot be memory-mapped
+            content = b""
+
+        return cls(content, file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exceptionInfo):
+        self.close()
+
+    def close(self):
+        if isinstance(self.content, mmap.mmap):
+            self.content.close()
+        if self.file is not None:
+            self.file.close()
+
+    def __len__(self):
+        return len(self.lineOffsets) - 1
+
+    def __iter__(self):
+        lineStart = 0
+        while True:
+            lineEnd = self.content.find(self.lineBreak, lineStart)
+            if lineEnd == -1:
+                yield self._decode(self.content[lineStart:])
+                return
+
+            yield self._decode(self.content[lineStart:lineEnd])
+            lineStart = lineEnd + 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("line index out of range")
+
+        lineStart = self.lineOffsets[index]
+        lineEnd = self.lineOffsets[index + 1] - 1
+        return self._decode(self.content[lineStart:lineEnd])
+
+    def line(self, lineNumber):
+        if not 1 <= lineNumber <= len(self):
+            return ""
+
+        return self[lineNumber - 1]
+
+    @property
+    def lineOffsets(self):
+        # start offset of every line, plus one past the end of the last line
+        if self._lineOffsets is None:
+            lineOffsets = array("Q", [0])
+
+            lineEnd = self.content.find(self.lineBreak)
+            while lineEnd != -1:
+                lineOffsets.append(lineEnd + 1)
+                lineEnd = self.content.find(self.lineBreak, lineEnd + 1)
+            lineOffsets.append(len(self.content) + 1)
+
+            self._lineOffsets = lineOffsets
+
+        return self._lineOffsets
+
+    def _decode(self, line):
+        if isinstance(line, str):
+            return line
+
+        return line.decode("utf-8")
@@ -0,0 +1,299 @@
+class Node:
+    __slots__ = ("line", "column")
+
+    def at(self, position):
+        """Takes the line and column of a token or another node."""
+        self.line = position.line
+        self.column = position.column
+        return self
+
+
+class Program(Node):
+    # slotNames and globalSlots describe the frame the Resolver laid out
+    __slots__ = ("statements", "slotNames", "globalSlots")
+
+    def __init__(self, statements):
+        self.statements = statements
+        self.slotNames = None
+        self.globalSlots = None
+
+
+# statements and expressions naming a variable keep the frame slot the
+# Resolver gave it in slot (itSlot and counterSlot for the implicit IT and
+# loop counters)
+
+
+# statements
+
+
+class Declaration(Node):
+    __slots__ = ("identifier", "value", "slot")
+
+    def __init__(self, identifier, value):
+        self.identifier = identifier
+        self.value = value
+        self.slot = None
+
+
+class Assignment(Node):
+    __slots__ = ("identifier", "value", "slot")
+
+    def __init__(self, identifier, value):
+        self.identifier = identifier
+        self.value = value
+        self.slot = None
+
+
+class Recast(Node):
+    __slots__ = ("identifier", "typeName", "slot")
+
+    def __init__(self, identifier, typeName):
+        self.identifier = identifier
+        self.typeName = typeName
+        self.slot = None
+
+
+class Output(Node):
+    __slots__ = ("operands",)
+
+    def __init__(self, operands):
+        self.operands = operands
+
+
+class Input(Node):
+    __slots__ = ("identifier", "slot")
+
+    def __init__(self, identifier):
+        self.identifier = identifier
+        self.slot = None
+
+
+class ExpressionStatement(Node):
+    __slots__ = ("expression", "itSlot")
+
+    def __init__(self, expression):
+        self.expression = expression
+        self.itSlot = None
+
+
+class Block(Node):
+    # a block of statements with its own scope, e.g. a branch the optimizer
+    # proved is always taken
+    __slots__ = ("statements",)
+
+    def __init__(self, statements):
+        self.statements = statements
+
+
+class IfStatement(Node):
+    # elseIfs are the MEBBE clauses, tried in order when IT is not WIN
+    __slots__ = ("ifBlock", "elseIfs", "elseBlock", "itSlot")
+
+    def __init__(self, ifBlock, elseIfs, elseBlock):
+        self.ifBlock = ifBlock
+        self.elseIfs = elseIfs
+        self.elseBlock = elseBlock
+        self.itSlot = None
+
+
+class ElseIf(Node):
+    __slots__ = ("condition", "block")
+
+    def __init__(self, condition, block):
+        self.condition = condition
+        self.block = block
+
+
+class Case(Node):
+    # literal is None for the OMGWTF case
+    __slots__ = ("literal", "block")
+
+    def __init__(self, literal, block):
+        self.literal = literal
+        self.block = block
+
+
+class SwitchStatement(Node):
+    # localSlots is the range of slots declared inside the cases, which are
+    # cleared before they run; jumpTable maps the keys of every case literal
+    # (see runtime.caseKeys) to the index of the first case it matches, and
+    # defaultCase is the index to go to otherwise (that of OMGWTF, or past
+    # the last case)
+    __slots__ = ("cases", "itSlot", "localSlots", "jumpTable", "defaultCase")
+
+    def __init__(self, cases):
+        self.cases = cases
+        self.itSlot = None
+        self.localSlots = None
+        self.jumpTable = None
+        self.defaultCase = None
+
+
+class Loop(Node):
+    # conditionKeyword is "TIL", "WILE" or None for a loop without condition;
+    # invariants are the Invariant nodes of the loop, worked out before it
+    # starts; countedLimit is set by the Resolver when the loop counts up or
+    # down to a limit that its body leaves alone, as (the slot of the limit
+    # variable, or None and the limit literal). A loop going through EACH
+    # item of a BUKKIT has its expression in collection, and delta 0; the
+    # counter takes every item in turn, and iteratorSlot is a slot of its
+    # own, outside of any scope, for an engine to keep its place in
+    __slots__ = (
+        "label",
+        "delta",
+        "counter",
+        "conditionKeyword",
+        "condition",
+        "collection",
+        "body",
+        "invariants",
+        "counterSlot",
+        "countedLimit",
+        "iteratorSlot",
+    )
+
+    def __init__(
+        self, label, delta, counter, conditionKeyword, condition, body, collection=None
+    ):
+        self.label = label
+        self.delta = delta
+        self.counter = counter
+        self.conditionKeyword = conditionKeyword
+        self.condition = condition
+        self.body = body
+        self.collection = collection
+        self.invariants = []
+        self.counterSlot = None
+        self.countedLimit = None
+        self.iteratorSlot = None
+
+
+class FunctionDefinition(Node):
+    # every call runs the body in a frame of its own, laid out by the
+    # Resolver in slotNames: the parameters come first, then IT (itSlot),
+    # whose value is returned when the body ends without FOUND YR
+    __slots__ = ("name", "parameters", "body", "slotNames", "itSlot")
+
+    def __init__(self, name, parameters, body):
+        self.name = name
+        self.parameters = parameters
+        self.body = body
+        self.slotNames = None
+        self.itSlot = None
+
+
+class Return(Node):
+    # isTailCall is set by the Resolver when the value is a call of the
+    # function the FOUND YR is in, which then reuses the caller's frame
+    __slots__ = ("value", "isTailCall")
+
+    def __init__(self, value):
+        self.value = value
+        self.isTailCall = False
+
+
+class Break(Node):
+    __slots__ = ()
+
+
+class ItemAssignment(Node):
+    # ITEM OF bukkit AN index R value
+    __slots__ = ("bukkit", "index", "value")
+
+    def __init__(self, bukkit, index, value):
+        self.bukkit = bukkit
+        self.index = index
+        self.value = value
+
+
+# expressions
+
+
+class Literal(Node):
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class Variable(Node):
+    __slots__ = ("identifier", "slot")
+
+    def __init__(self, identifier):
+        self.identifier = identifier
+        self.slot = None
+
+
+class BinaryOperation(Node):
+    # operator is the TOKEN kind of the operation keyword
+    __slots__ = ("operator", "left", "right")
+
+    def __init__(self, operator, left, right):
+        self.operator = operator
+        self.left = left
+        self.right = right
+
+
+class NotOperation(Node):
+    __slots__ = ("operand",)
+
+    def __init__(self, operand):
+        self.operand = operand
+
+
+class MultipleOperandOperation(Node):
+    __slots__ = ("operator", "operands")
+
+    def __init__(self, operator, operands):
+        self.operator = operator
+        self.operands = operands
+
+
+class Typecast(Node):
+    __slots__ = ("operand", "typeName")
+
+    def __init__(self, operand, typeName):
+        self.operand = operand
+        self.typeName = typeName
+
+
+class FunctionCall(Node):
+    # function is the FunctionDefinition the Resolver found for name
+    __slots__ = ("name", "arguments", "function")
+
+    def __init__(self, name, arguments):
+        self.name = name
+        self.arguments = arguments
+        self.function = None
+
+
+class MakeBukkit(Node):
+    # a new BUKKIT every time it is evaluated, holding the values of items
+    __slots__ = ("items",)
+
+    def __init__(self, items):
+        self.items = items
+
+
+class Item(Node):
+    __slots__ = ("bukkit", "index")
+
+    def __init__(self, bukkit, index):
+        self.bukkit = bukkit
+        self.index = index
+
+
+class Size(Node):
+    __slots__ = ("bukkit",)
+
+    def __init__(self, bukkit):
+        self.bukkit = bukkit
+
+
+class Invariant(Node):
+    # an expression of a loop whose value is the same on every iteration;
+    # when working it out before the loop fails, it is evaluated as usual
+    __slots__ = ("expression",)
+
+    def __init__(self, expression):
+        self.expression = expression
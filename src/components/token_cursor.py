@@ -0,0 +1,82 @@
+from .lexer import TokenBuffer
+
+
+class TokenCursor:
+    """A read position over a token sequence.
+
+    peek and advance are O(1), mark and reset give cheap backtracking, and
+    view returns a cursor over a sub-range of the same tokens instead of a
+    copied list. The tokens can also be an iterator (e.g. Lexer.iterTokens);
+    they are then pulled in only as the cursor reaches them.
+    """
+
+    def __init__(self, tokens, start=0, end=None):
+        if isinstance(tokens, (list, TokenBuffer)):
+            self.tokens = tokens
+            self.pendingTokens = None
+        else:
+            self.tokens = []
+            self.pendingTokens = iter(tokens)
+
+        # kinds can be read straight from a TokenBuffer's array
+        self.kinds = tokens.kinds if isinstance(tokens, TokenBuffer) else None
+
+        self.position = start
+        self.end = len(self.tokens) if end is None else end
+
+    def isAtEnd(self):
+        return self.position >= self.end and not self._pullNextToken()
+
+    def peek(self):
+        if self.isAtEnd():
+            return None
+
+        return self.tokens[self.position]
+
+    def peekKind(self):
+        if self.isAtEnd():
+            return None
+
+        if self.kinds is not None:
+            return self.kinds[self.position]
+
+        return self.tokens[self.position].lexemeType
+
+    def advance(self):
+        token = self.peek()
+        if token is not None:
+            self.position += 1
+
+        return token
+
+    def mark(self):
+        return self.position
+
+    def reset(self, mark):
+        self.position = mark
+
+    def view(self, start, end):
+        cursor = TokenCursor.__new__(TokenCursor)
+        cursor.tokens = self.tokens
+        cursor.pendingTokens = None
+        cursor.kinds = self.kinds
+        cursor.position = start
+        cursor.end = end
+
+        return cursor
+
+    def copy(self):
+        return self.view(self.position, self.end)
+
+    def _pullNextToken(self):
+        if self.pendingTokens is None:
+            return False
+
+        token = next(self.pendingTokens, None)
+        if token is None:
+            self.pendingTokens = None
+            return False
+
+        self.tokens.append(token)
+        self.end += 1
+        return True
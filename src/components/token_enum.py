@@ -1,53 +1,70 @@
-class TOKEN:
-    LINEBREAK = "linebreak"
-    CODE_DELIMITER = "code delimiter"
-    COMMENT_KEYWORD = "comment keyword"
-    MULTILINE_COMMENT_DELIMITER = "multiline comment delimiter"
-    VARIABLE_DECLARATION = "variable declaration"
-    VARIABLE_ASSIGNMENT = "variable assignment"
-    IT_VARIABLE = "IT"
-    ADDITION_OPERATION = "addition operation"
-    SUBTRACTION_OPERATION = "subtraction operation"
-    MULTIPLICATION_OPERATION = "multiplication operation"
-    QUOTIENT_OPERATION = "quotient operation"
-    MODULO_OPERATION = "modulo operation"
-    MAX_OPERATION = "max operation"
-    MIN_OPERATION = "min operation"
-    AND_OPERATION = "and operation"
-    OR_OPERATION = "or operation"
-    XOR_OPERATION = "xor operation"
-    NOT_OPERATION = "not operation"
-    INFINITE_ARITY_AND_OPERATION = "infinite arity and operation"
-    INFINITE_ARITY_OR_OPERATION = ("infinite arity or operation",)
-    EQUAL_TO_OPERATION = "equal to operation"
-    NOT_EQUAL_TO_OPERATION = "not equal to operation"
-    BREAK_STATEMENT = "break statement"
-    CONCATENATION_OPERATION = "concantenation operaion"
-    EXPLICIT_TYPECASTING_KEYWORD = "explicit typecasting keyword"
-    OPTIONAL_A_KEYWORD = "optional A keyword"
-    OPERAND_SEPARATOR = "operand seperator"
-    INFINITE_ARITY_DELIMITER = "infinite arity delimiter"
-    RECASTING_KEYWORD = "re-casting keyword"
-    OUTPUT_KEYWORD = "output keyword"
-    INPUT_KEYWORD = "input keyword"
-    IF_ELSE_DELIMITER = "if-else delimiter"
-    IF_STATEMENT_KEYWORD = "if statement keyword"
-    ELSE_IF_STATEMENT_KEYWORD = "else-if statement keyword"
-    ELSE_STATEMENT_KEYWORD = "else statement keyword"
-    FLOW_CONTROL_STATEMENTS_DELIMITER = "flow-control statements delimiter"
-    SWITCH_CASE_STATEMENT_DELIMITER = "switch-case statement delimiter"
-    CASE_KEYWORD = "case keyword"
-    DEFAULT_CASE_KEYWORD = "default case keyword"
-    LOOP_DECLARATION_AND_DELIMITER = "loop declaration and delimiter"
-    INCREMENT_KEYWORD = "increment keyword"
-    DECREMENT_KEYWORD = "decrement keyword"
-    KEYWORD_IN_LOOP = "keyword in loop"
-    LOOP_CONDITION_KEYWORD = "loop condition keyword"
-    LOOP_DELIMITER = "loop delimiter"
-    FLOAT_LITERAL = "float literal"
-    INTEGER_LITERAL = "integer literal"
-    STRING_LITERAL = "string literal"
-    BOOL_LITERAL = "bool literal"
-    TYPE_LITERAL = "type literal"
-    VARIABLE_IDENTIFIER = "variable identifier"
-    LOOP_IDENTIFIER = "loop identifier"
+from enum import IntEnum, unique
+
+
+@unique
+class TOKEN(IntEnum):
+    LINEBREAK = 0
+    CODE_DELIMITER = 1
+    COMMENT_KEYWORD = 2
+    MULTILINE_COMMENT_DELIMITER = 3
+    VARIABLE_DECLARATION = 4
+    VARIABLE_ASSIGNMENT = 5
+    ADDITION_OPERATION = 6
+    SUBTRACTION_OPERATION = 7
+    MULTIPLICATION_OPERATION = 8
+    QUOTIENT_OPERATION = 9
+    MODULO_OPERATION = 10
+    MAX_OPERATION = 11
+    MIN_OPERATION = 12
+    AND_OPERATION = 13
+    OR_OPERATION = 14
+    XOR_OPERATION = 15
+    NOT_OPERATION = 16
+    INFINITE_ARITY_AND_OPERATION = 17
+    INFINITE_ARITY_OR_OPERATION = 18
+    EQUAL_TO_OPERATION = 19
+    NOT_EQUAL_TO_OPERATION = 20
+    BREAK_STATEMENT = 21
+    CONCATENATION_OPERATION = 22
+    EXPLICIT_TYPECASTING_KEYWORD = 23
+    OPTIONAL_A_KEYWORD = 24
+    OPERAND_SEPARATOR = 25
+    INFINITE_ARITY_DELIMITER = 26
+    RECASTING_KEYWORD = 27
+    OUTPUT_KEYWORD = 28
+    INPUT_KEYWORD = 29
+    IF_ELSE_DELIMITER = 30
+    IF_STATEMENT_KEYWORD = 31
+    ELSE_IF_STATEMENT_KEYWORD = 32
+    ELSE_STATEMENT_KEYWORD = 33
+    FLOW_CONTROL_STATEMENTS_DELIMITER = 34
+    SWITCH_CASE_STATEMENT_DELIMITER = 35
+    CASE_KEYWORD = 36
+    DEFAULT_CASE_KEYWORD = 37
+    LOOP_DECLARATION_AND_DELIMITER = 38
+    INCREMENT_KEYWORD = 39
+    DECREMENT_KEYWORD = 40
+    KEYWORD_IN_LOOP = 41
+    LOOP_CONDITION_KEYWORD = 42
+    LOOP_DELIMITER = 43
+    FLOAT_LITERAL = 44
+    INTEGER_LITERAL = 45
+    STRING_LITERAL = 46
+    BOOL_LITERAL = 47
+    TYPE_LITERAL = 48
+    VARIABLE_IDENTIFIER = 49
+    LOOP_IDENTIFIER = 50
+    FUNCTION_DECLARATION = 51
+    FUNCTION_DELIMITER = 52
+    RETURN_KEYWORD = 53
+    FUNCTION_CALL = 54
+    FUNCTION_IDENTIFIER = 55
+    BUKKIT_KEYWORD = 56
+    ITEM_OPERATION = 57
+    SIZE_OPERATION = 58
+    EACH_KEYWORD = 59
+    IN_KEYWORD = 60
+
+    @property
+    def description(self):
+        return self.name.lower().replace("_", " ")
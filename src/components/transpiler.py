@@ -0,0 +1,692 @@
+import easygui
+
+from .bukkit import Bukkit
+from .runtime import (
+    ARITHMETIC_OPERATORS,
+    IT_VARIABLE,
+    MAX_CALL_DEPTH,
+    NESTED_CALLS_MESSAGE,
+    NOT_HOISTED,
+    OPERATION_ERRORS,
+    UNSET,
+    OPERATIONS,
+    SHORT_CIRCUIT_VALUES,
+    bukkitItems,
+    bukkitSize,
+    caseKey,
+    describeError,
+    getItem,
+    setItem,
+    smoosh,
+    toYarn,
+    typeCast,
+)
+from .syntax_tree import (
+    Assignment,
+    BinaryOperation,
+    Block,
+    Break,
+    Declaration,
+    ExpressionStatement,
+    FunctionCall,
+    FunctionDefinition,
+    IfStatement,
+    Input,
+    Invariant,
+    Item,
+    ItemAssignment,
+    Literal,
+    Loop,
+    MakeBukkit,
+    MultipleOperandOperation,
+    NotOperation,
+    Output,
+    Recast,
+    Return,
+    Size,
+    SwitchStatement,
+    Typecast,
+    Variable,
+)
+from .token_enum import TOKEN
+from .utils import toNumber
+
+GENERATED_FILENAME = "<lolcode>"
+INDENT = "    "
+
+# the Python operator each arithmetic operation compiles to
+ARITHMETIC_SYMBOLS = {
+    TOKEN.ADDITION_OPERATION: "+",
+    TOKEN.SUBTRACTION_OPERATION: "-",
+    TOKEN.MULTIPLICATION_OPERATION: "*",
+    TOKEN.QUOTIENT_OPERATION: "/",
+    TOKEN.MODULO_OPERATION: "%",
+}
+
+
+class TailCall(Exception):
+    """Raised by the generated code for a FOUND YR of a self tail call from
+    inside a loop or switch, where continue would not restart the function."""
+
+    def __init__(self, arguments):
+        super().__init__()
+        self.arguments = arguments
+
+
+# globals of the generated code
+GENERATED_GLOBALS = {
+    "easygui": easygui,
+    "_toNumber": toNumber,
+    "_toYarn": toYarn,
+    "_smoosh": smoosh,
+    "_Bukkit": Bukkit,
+    "_getItem": getItem,
+    "_setItem": setItem,
+    "_bukkitSize": bukkitSize,
+    "_bukkitItems": bukkitItems,
+    "_caseKey": caseKey,
+    "_typeCast": typeCast,
+    "_bothSaem": OPERATIONS[TOKEN.EQUAL_TO_OPERATION],
+    "_diffrint": OPERATIONS[TOKEN.NOT_EQUAL_TO_OPERATION],
+    "_notHoisted": NOT_HOISTED,
+    "_unset": UNSET,
+    "_hoistErrors": (*OPERATION_ERRORS, KeyError),
+    "_TailCall": TailCall,
+}
+
+
+class Transpiler:
+    """Translates a syntax tree into Python source, which is then compiled
+    and run by CPython itself.
+
+    The program becomes a single function over the values list of the
+    evaluator's memory Frame, indexing it with the slots of the Resolver,
+    and over its output sink. Every operation is written on its own line
+    into a temporary, so the line of a Python traceback tells which node
+    failed; lineNodes maps generated lines back to the nodes for error
+    reporting.
+
+    Functions become nested functions of the program, taking the list of
+    their arguments and building their frame from it. The body runs in a
+    while True loop, so a self tail call only rebinds the arguments and
+    continues it (or raises TailCall from inside a loop or switch), and a
+    GTFO breaks out of it. The functions marked pure are wrapped by their
+    FunctionCache, from the caches the program is given. The program's
+    callDepth counts the function bodies running, and a function entered
+    past MAX_CALL_DEPTH raises RecursionError, reported at its call.
+
+    A loop going through EACH item of a BUKKIT is a Python for loop, whose
+    target is the counter's slot.
+
+    As the generated code nests like the program, CPython cannot compile it
+    when the program nests its blocks too deeply (more than 20 loops or 100
+    levels of indentation); compileSource then raises a SyntaxError at the
+    block that went too deep.
+    """
+
+    def __init__(self, evaluator):
+        self.evaluator = evaluator
+        self.source = evaluator.source
+
+        self.statementTranspilers = {
+            Declaration: self._Declaration,
+            Assignment: self._AssignmentStatement,
+            Recast: self._RecastingStatement,
+            Output: self._Output,
+            Input: self._Input,
+            ExpressionStatement: self._ExpressionStatement,
+            Block: self._BlockStatement,
+            IfStatement: self._IfStatement,
+            SwitchStatement: self._CaseStatement,
+            Loop: self._LoopStatement,
+            Break: self._BreakStatement,
+            FunctionDefinition: self._FunctionDefinition,
+            Return: self._ReturnStatement,
+            ItemAssignment: self._ItemAssignment,
+        }
+
+        self.expressionTranspilers = {
+            Literal: self._Literal,
+            Variable: self._Variable,
+            BinaryOperation: self._TwoOperandOperation,
+            NotOperation: self._NotOperation,
+            MultipleOperandOperation: self._MultipleOperandOperation,
+            Typecast: self._ExplicitTypecast,
+            Invariant: self._InvariantExpression,
+            FunctionCall: self._FunctionCall,
+            MakeBukkit: self._Bukkit,
+            Item: self._Item,
+            Size: self._Size,
+        }
+
+    def transpile(self, program):
+        self.lines = []
+        self.lineNodes = []
+        self.indentation = 0
+        self.temporaryCount = 0
+
+        # the local holding the value of each Invariant node
+        self.invariantNames = {}
+
+        # the global holding the jump table of each switch, and its node
+        self.jumpTables = []
+
+        # the nested function each FunctionDefinition becomes
+        self.functionNames = {}
+
+        # the Python loops around the lines being emitted, in the function
+        self.loopDepth = 0
+
+        self._emit("def program(frame, output, caches):", program)
+        self.indentation += 1
+        self._emit("write = output.write", program)
+        self._emitSlots("frame slots", program.slotNames, program)
+
+        # all defined first, as calls can come before the definition
+        self._emit("callDepth = 0", program)
+        for statement in program.statements:
+            if isinstance(statement, FunctionDefinition):
+                self._function(statement)
+
+        self._Statements(program.statements)
+        self._emit("return", program)
+
+        # set when the module runs, so a switch does not build its table
+        self.indentation = 0
+        for name, switchStatement in self.jumpTables:
+            self._emit(f"{name} = {switchStatement.jumpTable!r}", switchStatement)
+
+        return "\n".join(self.lines) + "\n"
+
+    def compile(self, program):
+        code = self.compileSource(self.transpile(program))
+
+        namespace = dict(GENERATED_GLOBALS)
+        exec(code, namespace)
+        generatedProgram = namespace["program"]
+
+        def run():
+            try:
+                generatedProgram(
+                    self.evaluator.memory.values,
+                    self.evaluator.output,
+                    self.evaluator.functionCaches,
+                )
+            except (*OPERATION_ERRORS, KeyError) as error:
+                self._rethrow(error)
+            except RecursionError as error:
+                call = self._failedNode(error.__traceback__, FunctionCall)
+                if call is None:
+                    raise
+                self._throwError(
+                    ValueError, NESTED_CALLS_MESSAGE.format(call.name), call
+                )
+
+        return run
+
+    def compileSource(self, source):
+        try:
+            return compile(source, GENERATED_FILENAME, "exec")
+        except SyntaxError as error:
+            if error.lineno is None:
+                raise
+
+            self._throwError(
+                SyntaxError,
+                "Blocks are nested too deeply for the python engine",
+                self.lineNodes[error.lineno - 1],
+            )
+
+    def _rethrow(self, error):
+        # errors with a position were raised on purpose and pass through
+        if isinstance(error, SyntaxError) and error.lineno is not None:
+            raise error
+
+        node = self._failedNode(error.__traceback__)
+        if node is None:
+            raise error
+
+        if isinstance(error, KeyError):
+            self._throwError(NameError, f"{error.args[0]} is not defined", node)
+
+        self._throwError(*describeError(error), node)
+
+    def _failedNode(self, traceback, nodeClass=object):
+        # the node of the innermost generated line, among those for a
+        # nodeClass node, that the traceback went through
+        failedNode = None
+        while traceback is not None:
+            if traceback.tb_frame.f_code.co_filename == GENERATED_FILENAME:
+                node = self.lineNodes[traceback.tb_lineno - 1]
+                if isinstance(node, nodeClass):
+                    failedNode = node
+            traceback = traceback.tb_next
+
+        return failedNode
+
+    def _throwError(self, errorType, message, node):
+        errorArgs = (
+            None,
+            node.line,
+            node.column,
+            self.source.line(node.line),
+        )
+
+        raise errorType(message, errorArgs) from None
+
+    def _emit(self, line, node):
+        self.lines.append(INDENT * self.indentation + line)
+        self.lineNodes.append(node)
+
+    def _newName(self, prefix):
+        self.temporaryCount += 1
+        return f"_{prefix}{self.temporaryCount}"
+
+    def _emitTemporary(self, expression, node):
+        temporary = self._newName("t")
+        self._emit(f"{temporary} = {expression}", node)
+        return temporary
+
+    def _emitSlots(self, title, slotNames, node):
+        slots = ", ".join(
+            f"{slot} {identifier}" for slot, identifier in enumerate(slotNames)
+        )
+        self._emit(f"# {title}: {slots}", node)
+
+    def _readSlot(self, slot, identifier, node):
+        value = self._emitTemporary(f"frame[{slot}]", node)
+        self._emit(f"if {value} is _unset: raise KeyError({identifier!r})", node)
+
+        return value
+
+    def _Statements(self, statements):
+        for statement in statements:
+            self.statementTranspilers[type(statement)](statement)
+
+    def _Block(self, statements, node):
+        self._Statements(statements)
+        if not statements:
+            self._emit("pass", node)
+
+    def _Declaration(self, declaration):
+        value = "None"
+        if declaration.value is not None:
+            value = self._Operand(declaration.value)
+
+        self._emit(f"frame[{declaration.slot}] = {value}", declaration)
+
+    def _Output(self, output):
+        for operand in output.operands:
+            value = self._yarn(operand, self._Operand(operand))
+            self._emit(f"write({value})", output)
+
+        self._emit('write("\\n")', output)
+
+    def _Input(self, input):
+        value = self._emitTemporary("easygui.enterbox(output.tail())", input)
+        self._emit(f"frame[{input.slot}] = {value}", input)
+        self._emit(f'write(_toYarn({value}) + "\\n")', input)
+
+    def _ExpressionStatement(self, statement):
+        value = self._Operand(statement.expression)
+        self._emit(f"frame[{statement.itSlot}] = {value}", statement)
+
+    def _AssignmentStatement(self, assignment):
+        value = self._Operand(assignment.value)
+        self._emit(f"frame[{assignment.slot}] = {value}", assignment)
+
+    def _ItemAssignment(self, assignment):
+        bukkit = self._Operand(assignment.bukkit)
+        index = self._Operand(assignment.index)
+        value = self._Operand(assignment.value)
+        self._emit(f"_setItem({bukkit}, {index}, {value})", assignment)
+
+    def _RecastingStatement(self, recast):
+        value = self._readSlot(recast.slot, recast.identifier, recast)
+        self._emit(
+            f"frame[{recast.slot}] = _typeCast({recast.typeName!r}, {value})", recast
+        )
+
+    def _BlockStatement(self, block):
+        self._Block(block.statements, block)
+
+    def _IfStatement(self, ifStatement):
+        # only a WIN (or 1) runs the YA RLY block, or that of a MEBBE
+        itValue = self._readSlot(ifStatement.itSlot, IT_VARIABLE, ifStatement)
+        if not ifStatement.elseIfs:
+            self._emit(f"if {itValue} == True:", ifStatement)
+            self._indentedBlock(ifStatement.ifBlock, ifStatement)
+
+            if ifStatement.elseBlock is not None:
+                self._emit("else:", ifStatement)
+                self._indentedBlock(ifStatement.elseBlock, ifStatement)
+            return
+
+        # a MEBBE condition takes lines of its own, so the branches cannot be
+        # an elif chain; taken tells whether one of them ran, and keeps them
+        # all at the same depth however many there are
+        taken = self._emitTemporary(f"{itValue} == True", ifStatement)
+        self._emit(f"if {taken}:", ifStatement)
+        self._indentedBlock(ifStatement.ifBlock, ifStatement)
+
+        for elseIf in ifStatement.elseIfs:
+            self._emit(f"if not {taken}:", elseIf)
+            self.indentation += 1
+            condition = self._Operand(elseIf.condition)
+            self._emit(f"{taken} = {condition} == True", elseIf)
+            self._emit(f"if {taken}:", elseIf)
+            self._indentedBlock(elseIf.block, elseIf)
+            self.indentation -= 1
+
+        if ifStatement.elseBlock is not None:
+            self._emit(f"if not {taken}:", ifStatement)
+            self._indentedBlock(ifStatement.elseBlock, ifStatement)
+
+    def _indentedBlock(self, statements, node):
+        self.indentation += 1
+        self._Block(statements, node)
+        self.indentation -= 1
+
+    def _BreakStatement(self, breakStatement):
+        self._emit("break", breakStatement)
+
+    def _functionName(self, function):
+        if function not in self.functionNames:
+            self.functionNames[function] = self._newName("f")
+
+        return self.functionNames[function]
+
+    def _function(self, function):
+        name = self._functionName(function)
+        self._emit(f"def {name}(arguments):", function)
+        self.indentation += 1
+        self._emitSlots(f"{function.name} frame slots", function.slotNames, function)
+
+        self._emit("nonlocal callDepth", function)
+        self._emit(f"if callDepth == {MAX_CALL_DEPTH}:", function)
+        self._emit("    raise RecursionError", function)
+        self._emit("callDepth += 1", function)
+        self._emit("try:", function)
+        self.indentation += 1
+
+        self._emit("while True:", function)
+        self.indentation += 1
+        localSlotCount = len(function.slotNames) - len(function.parameters)
+        self._emit(f"frame = arguments + [_unset] * {localSlotCount}", function)
+
+        self._emit("try:", function)
+        self.indentation += 1
+        self.loopDepth = 0
+        self._Statements(function.body)
+
+        # without FOUND YR, a function gives the value of its IT
+        itValue = self._emitTemporary(f"frame[{function.itSlot}]", function)
+        self._emit(f"return None if {itValue} is _unset else {itValue}", function)
+        self.indentation -= 1
+
+        self._emit("except _TailCall as tailCall:", function)
+        self.indentation += 1
+        self._emit("arguments = tailCall.arguments", function)
+        self.indentation -= 2
+
+        # left by a GTFO
+        self._emit("return None", function)
+        self.indentation -= 1
+
+        self._emit("finally:", function)
+        self._emit("    callDepth -= 1", function)
+        self.indentation -= 1
+
+        self._emit(f"if {function.name!r} in caches:", function)
+        self.indentation += 1
+        self._emit(f"{name} = caches[{function.name!r}].wrap({name})", function)
+        self.indentation -= 1
+
+    def _FunctionDefinition(self, function):
+        # emitted at the start of the program
+        pass
+
+    def _ReturnStatement(self, returnStatement):
+        if not returnStatement.isTailCall:
+            value = self._Operand(returnStatement.value)
+            self._emit(f"return {value}", returnStatement)
+            return
+
+        arguments = self._arguments(returnStatement.value)
+        if self.loopDepth == 0:
+            self._emit(f"arguments = {arguments}", returnStatement)
+            self._emit("continue", returnStatement)
+        else:
+            self._emit(f"raise _TailCall({arguments})", returnStatement)
+
+    def _CaseStatement(self, switchStatement):
+        jumpTable = self._newName("s")
+        self.jumpTables.append((jumpTable, switchStatement))
+
+        itValue = self._readSlot(switchStatement.itSlot, IT_VARIABLE, switchStatement)
+        firstCase = self._emitTemporary(
+            f"{jumpTable}.get(_caseKey({itValue}), {switchStatement.defaultCase})",
+            switchStatement,
+        )
+
+        self._emit(f"if {firstCase} < {len(switchStatement.cases)}:", switchStatement)
+        self.indentation += 1
+
+        firstSlot, endSlot = switchStatement.localSlots
+        if endSlot > firstSlot:
+            self._emit(
+                f"frame[{firstSlot}:{endSlot}] = [_unset] * {endSlot - firstSlot}",
+                switchStatement,
+            )
+
+        # falls through the following cases until a GTFO, which breaks out
+        # of this one-pass loop
+        self._emit("while True:", switchStatement)
+        self.indentation += 1
+        self.loopDepth += 1
+
+        for caseIndex, case in enumerate(switchStatement.cases):
+            self._emit(f"if {firstCase} <= {caseIndex}:", case)
+            self.indentation += 1
+            self._Statements(case.block)
+            if not case.block:
+                self._emit("pass", case)
+            self.indentation -= 1
+
+        self._emit("break", switchStatement)
+        self.loopDepth -= 1
+        self.indentation -= 2
+
+    def _LoopStatement(self, loop):
+        for invariant in loop.invariants:
+            self._hoist(invariant)
+
+        if loop.collection is not None:
+            self._eachLoop(loop)
+            return
+
+        self._emit("while True:", loop)
+        self.indentation += 1
+        self.loopDepth += 1
+
+        if loop.condition is not None:
+            condition = self._Operand(loop.condition)
+            if loop.conditionKeyword == "TIL":
+                self._emit(f"if {condition}: break", loop)
+            else:
+                self._emit(f"if not {condition}: break", loop)
+
+        self._Statements(loop.body)
+
+        counter = self._readSlot(loop.counterSlot, loop.counter, loop)
+        step = f"+ {loop.delta}" if loop.delta > 0 else f"- {-loop.delta}"
+        self._emit(f"frame[{loop.counterSlot}] = _toNumber({counter}) {step}", loop)
+
+        self.loopDepth -= 1
+        self.indentation -= 1
+
+    def _eachLoop(self, loop):
+        collection = self._Operand(loop.collection)
+        self._emit(
+            f"for frame[{loop.counterSlot}] in _bukkitItems({collection}):", loop
+        )
+        self.indentation += 1
+        self.loopDepth += 1
+
+        self._Block(loop.body, loop)
+
+        self.loopDepth -= 1
+        self.indentation -= 1
+
+    def _invariantName(self, invariant):
+        if invariant not in self.invariantNames:
+            self.invariantNames[invariant] = self._newName("i")
+
+        return self.invariantNames[invariant]
+
+    def _hoist(self, invariant):
+        name = self._invariantName(invariant)
+
+        self._emit("try:", invariant)
+        self.indentation += 1
+        value = self._Operand(invariant.expression)
+        self._emit(f"{name} = {value}", invariant)
+        self.indentation -= 1
+
+        # left to fail where it is used
+        self._emit("except _hoistErrors:", invariant)
+        self.indentation += 1
+        self._emit(f"{name} = _notHoisted", invariant)
+        self.indentation -= 1
+
+    def _Operand(self, expression):
+        """Emits the lines computing an expression and returns a Python
+        expression (a literal or a temporary) holding its value."""
+        return self.expressionTranspilers[type(expression)](expression)
+
+    def _Literal(self, literal):
+        return repr(literal.value)
+
+    def _Variable(self, variable):
+        return self._readSlot(variable.slot, variable.identifier, variable)
+
+    def _number(self, expression, value):
+        # numeric literals are converted here instead of on every run
+        if isinstance(expression, Literal):
+            try:
+                return repr(toNumber(expression.value))
+            except ValueError:
+                pass
+
+        return f"_toNumber({value})"
+
+    def _yarn(self, expression, value):
+        if isinstance(expression, Literal) and isinstance(expression.value, str):
+            return value
+
+        return f"_toYarn({value})"
+
+    def _TwoOperandOperation(self, operation):
+        if operation.operator in SHORT_CIRCUIT_VALUES:
+            return self._shortCircuit(
+                operation.operator, (operation.left, operation.right), operation
+            )
+
+        firstValue = self._Operand(operation.left)
+        secondValue = self._Operand(operation.right)
+        operator = operation.operator
+
+        if operator in ARITHMETIC_OPERATORS:
+            firstNumber = self._number(operation.left, firstValue)
+            secondNumber = self._number(operation.right, secondValue)
+
+            if operator in ARITHMETIC_SYMBOLS:
+                symbol = ARITHMETIC_SYMBOLS[operator]
+                expression = f"{firstNumber} {symbol} {secondNumber}"
+            else:
+                function = ARITHMETIC_OPERATORS[operator].__name__
+                expression = f"{function}({firstNumber}, {secondNumber})"
+        elif operator == TOKEN.XOR_OPERATION:
+            expression = f"bool({firstValue}) != bool({secondValue})"
+        elif operator == TOKEN.EQUAL_TO_OPERATION:
+            expression = f"_bothSaem({firstValue}, {secondValue})"
+        else:
+            expression = f"_diffrint({firstValue}, {secondValue})"
+
+        return self._emitTemporary(expression, operation)
+
+    def _NotOperation(self, operation):
+        value = self._Operand(operation.operand)
+        return self._emitTemporary(f"not {value}", operation)
+
+    def _MultipleOperandOperation(self, operation):
+        if operation.operator in SHORT_CIRCUIT_VALUES:
+            return self._shortCircuit(operation.operator, operation.operands, operation)
+
+        # joined by smoosh, as adding strs would copy a YARN being built in a
+        # loop on every SMOOSH
+        values = [self._Operand(operand) for operand in operation.operands]
+        return self._emitTemporary(f"_smoosh([{', '.join(values)}])", operation)
+
+    def _shortCircuit(self, operator, operands, operation):
+        # every operand after the first is only evaluated while the result
+        # is not known; the guards are not nested, so ALL OF and ANY OF keep
+        # the same depth however many operands they have
+        result = self._newName("t")
+        if SHORT_CIRCUIT_VALUES[operator]:
+            guard = f"if not {result}:"
+        else:
+            guard = f"if {result}:"
+
+        for operandIndex, operand in enumerate(operands):
+            if operandIndex > 0:
+                self._emit(guard, operation)
+                self.indentation += 1
+
+            value = self._Operand(operand)
+            self._emit(f"{result} = bool({value})", operation)
+
+            if operandIndex > 0:
+                self.indentation -= 1
+
+        return result
+
+    def _arguments(self, call):
+        # a Python list of the argument values
+        values = [self._Operand(argument) for argument in call.arguments]
+        return f"[{', '.join(values)}]"
+
+    def _FunctionCall(self, call):
+        arguments = self._arguments(call)
+        name = self._functionName(call.function)
+        return self._emitTemporary(f"{name}({arguments})", call)
+
+    def _ExplicitTypecast(self, typecast):
+        value = self._Operand(typecast.operand)
+        return self._emitTemporary(
+            f"_typeCast({typecast.typeName!r}, {value})", typecast
+        )
+
+    def _Bukkit(self, bukkit):
+        items = [self._Operand(item) for item in bukkit.items]
+        return self._emitTemporary(f"_Bukkit([{', '.join(items)}])", bukkit)
+
+    def _Item(self, item):
+        bukkit = self._Operand(item.bukkit)
+        index = self._Operand(item.index)
+        return self._emitTemporary(f"_getItem({bukkit}, {index})", item)
+
+    def _Size(self, size):
+        bukkit = self._Operand(size.bukkit)
+        return self._emitTemporary(f"_bukkitSize({bukkit})", size)
+
+    def _InvariantExpression(self, invariant):
+        value = self._emitTemporary(self._invariantName(invariant), invariant)
+
+        self._emit(f"if {value} is _notHoisted:", invariant)
+        self.indentation += 1
+        expression = self._Operand(invariant.expression)
+        self._emit(f"{value} = {expression}", invariant)
+        self.indentation -= 1
+
+        return value
@@ -1,11 +1,29 @@
+from functools import lru_cache
+
+from .rope import Rope
+
+
 def isEmpty(body):
     return len(body) == 0
 
 
 def toNumber(value):
     if isinstance(value, str):
-        try:
-            return int(value)
-        except ValueError:
-            return float(value)
+        return parseNumber(value)
+    if isinstance(value, Rope):
+        return parseNumber(value.flatten())
     return value
+
+
+@lru_cache(maxsize=4096)
+def parseNumber(text):
+    """Returns the NUMBR or NUMBAR a YARN reads as.
+
+    The results are cached, as the same YARN is often read in every
+    iteration of a loop (e.g. one from GIMMEH), so a NUMBAR-looking YARN
+    only fails int() once. A YARN that is not a number raises ValueError.
+    """
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
@@ -0,0 +1,263 @@
+try:
+    import numpy
+except ImportError:
+    # the vectorizer is optional; without NumPy every loop is interpreted
+    numpy = None
+
+from .syntax_tree import Assignment, BinaryOperation, Invariant, Literal, Variable
+from .token_enum import TOKEN
+
+# NUMBR values (and bounds on them) must stay below this to be computed
+# in int64 without overflowing, where Python ints would not
+INT_LIMIT = 2**62
+
+ELEMENTWISE_OPERATORS = (
+    TOKEN.ADDITION_OPERATION,
+    TOKEN.SUBTRACTION_OPERATION,
+    TOKEN.MULTIPLICATION_OPERATION,
+    TOKEN.MAX_OPERATION,
+    TOKEN.MIN_OPERATION,
+)
+
+# accumulations a loop body statement can do, by the operator of its value
+REDUCTION_OPERATORS = (
+    TOKEN.ADDITION_OPERATION,
+    TOKEN.SUBTRACTION_OPERATION,
+    TOKEN.MAX_OPERATION,
+    TOKEN.MIN_OPERATION,
+)
+
+
+class NotVectorizable(Exception):
+    """Raised while vectorizing a loop that has to be interpreted instead."""
+
+
+class LoopVectorizer:
+    """Runs counted loops whose body is pure arithmetic on the counter as
+    NumPy array operations, for the "tree" and "closure" engines.
+
+    A body qualifies when every statement is an assignment of SUM OF, DIFF
+    OF, PRODUKT OF, BIGGR OF and SMALLR OF on NUMBR and NUMBAR literals, the
+    counter and variables the body does not write, either as is (only the
+    last iteration's value is kept) or accumulated into the variable
+    assigned (acc R SUM OF acc AN ..., also DIFF OF, BIGGR OF and SMALLR
+    OF). Anything else, including VISIBLE, GIMMEH and GTFO, is interpreted.
+
+    The results are the ones interpreting the loop gives: NUMBR arithmetic
+    is only done in int64 when bounds on the operands rule out overflow,
+    NUMBAR sums are accumulated in iteration order, and BIGGR OF and SMALLR
+    OF are only vectorized on NUMBRs. When NumPy is missing or a check
+    fails, run returns False and the loop is interpreted as usual.
+    """
+
+    def __init__(self):
+        # the assignments of every loop seen, or None when it does not
+        # qualify
+        self.plans = {}
+
+    def plan(self, loop):
+        """Returns the (reduction operator or None, target slot, expression)
+        of every statement of a counted loop's body, or None when the body
+        cannot be vectorized."""
+        if loop not in self.plans:
+            self.plans[loop] = self._plan(loop)
+
+        return self.plans[loop]
+
+    def run(self, loop, counterValues, values):
+        """Runs every iteration of a counted loop over counterValues at
+        once. Returns False, having changed nothing, when the loop has to be
+        interpreted instead."""
+        if numpy is None or len(counterValues) == 0:
+            return False
+
+        plan = self.plan(loop)
+        if plan is None:
+            return False
+
+        if max(abs(counterValues.start), abs(counterValues.stop)) >= INT_LIMIT:
+            return False
+
+        counter = numpy.arange(
+            counterValues.start, counterValues.stop, counterValues.step
+        )
+
+        self.counterSlot = loop.counterSlot
+        try:
+            # NUMBAR overflows give inf, as in Python, without warnings
+            with numpy.errstate(all="ignore"):
+                results = [
+                    (slot, self._result(reduction, slot, expression, counter, values))
+                    for reduction, slot, expression in plan
+                ]
+        except (NotVectorizable, OverflowError):
+            return False
+
+        # written once all of them are known, so a failure changes nothing
+        for slot, value in results:
+            values[slot] = value
+
+        return True
+
+    def _plan(self, loop):
+        plan = []
+        for statement in loop.body:
+            if not isinstance(statement, Assignment):
+                return None
+            plan.append(self._statementPlan(statement))
+
+        targets = {slot for _, slot, _ in plan}
+        if len(targets) != len(plan):
+            return None
+
+        for _, slot, expression in plan:
+            readSlots = _readSlots(expression)
+            if readSlots is None or readSlots & targets:
+                return None
+
+        return plan
+
+    def _statementPlan(self, assignment):
+        value = assignment.value
+        slot = assignment.slot
+
+        if isinstance(value, BinaryOperation) and value.operator in REDUCTION_OPERATORS:
+            if _isVariable(value.left, slot):
+                return value.operator, slot, value.right
+
+            # DIFF OF x AN acc is not an accumulation
+            if (
+                _isVariable(value.right, slot)
+                and value.operator != TOKEN.SUBTRACTION_OPERATION
+            ):
+                return value.operator, slot, value.left
+
+        return None, slot, value
+
+    def _result(self, reduction, slot, expression, counter, values):
+        # the value of every iteration, or one value for all of them
+        element, bound = self._evaluate(expression, counter, values)
+        if not isinstance(element, numpy.ndarray):
+            element = numpy.full(len(counter), element)
+
+        if reduction is None:
+            return element[-1].item()
+
+        accumulator = values[slot]
+        isNumbr = element.dtype.kind == "i"
+        if accumulator.__class__ is int and isNumbr:
+            if bound * len(counter) >= INT_LIMIT:
+                raise NotVectorizable()
+
+            if reduction == TOKEN.ADDITION_OPERATION:
+                return accumulator + element.sum().item()
+            if reduction == TOKEN.SUBTRACTION_OPERATION:
+                return accumulator - element.sum().item()
+            if reduction == TOKEN.MAX_OPERATION:
+                return max(accumulator, element.max().item())
+            return min(accumulator, element.min().item())
+
+        if accumulator.__class__ not in (int, float) or reduction not in (
+            TOKEN.ADDITION_OPERATION,
+            TOKEN.SUBTRACTION_OPERATION,
+        ):
+            raise NotVectorizable()
+
+        # NUMBAR sums are accumulated in order, as rounding depends on it
+        if reduction == TOKEN.ADDITION_OPERATION:
+            function = numpy.add
+        else:
+            function = numpy.subtract
+
+        terms = numpy.concatenate(([float(accumulator)], element.astype(numpy.float64)))
+        return function.accumulate(terms)[-1].item()
+
+    def _evaluate(self, expression, counter, values):
+        """Returns the value of an expression on every iteration (an array)
+        or on all of them (a number), with a bound on its NUMBR magnitude."""
+        if isinstance(expression, Invariant):
+            return self._evaluate(expression.expression, counter, values)
+
+        if isinstance(expression, Literal):
+            return _number(expression.value)
+
+        if isinstance(expression, Variable):
+            if expression.slot == self.counterSlot:
+                return counter, max(abs(counter[0]), abs(counter[-1])).item()
+            return _number(values[expression.slot])
+
+        left, leftBound = self._evaluate(expression.left, counter, values)
+        right, rightBound = self._evaluate(expression.right, counter, values)
+        isNumbr = _isNumbr(left) and _isNumbr(right)
+        operator = expression.operator
+
+        if operator == TOKEN.MULTIPLICATION_OPERATION:
+            bound = leftBound * rightBound
+        else:
+            bound = leftBound + rightBound
+        if isNumbr and bound >= INT_LIMIT:
+            raise NotVectorizable()
+
+        if operator == TOKEN.ADDITION_OPERATION:
+            return numpy.add(left, right), bound
+        if operator == TOKEN.SUBTRACTION_OPERATION:
+            return numpy.subtract(left, right), bound
+        if operator == TOKEN.MULTIPLICATION_OPERATION:
+            return numpy.multiply(left, right), bound
+
+        # Python's max and min keep the type of the operand they return
+        if not isNumbr:
+            raise NotVectorizable()
+        if operator == TOKEN.MAX_OPERATION:
+            return numpy.maximum(left, right), max(leftBound, rightBound)
+        return numpy.minimum(left, right), max(leftBound, rightBound)
+
+
+def _isVariable(expression, slot):
+    return isinstance(expression, Variable) and expression.slot == slot
+
+
+def _readSlots(expression):
+    """Returns the slots of the variables an expression reads, or None when
+    it is not one the vectorizer handles."""
+    if isinstance(expression, Invariant):
+        return _readSlots(expression.expression)
+
+    if isinstance(expression, Literal):
+        if expression.value.__class__ in (int, float):
+            return set()
+        return None
+
+    if isinstance(expression, Variable):
+        return {expression.slot}
+
+    if (
+        isinstance(expression, BinaryOperation)
+        and expression.operator in ELEMENTWISE_OPERATORS
+    ):
+        leftSlots = _readSlots(expression.left)
+        rightSlots = _readSlots(expression.right)
+        if leftSlots is None or rightSlots is None:
+            return None
+        return leftSlots | rightSlots
+
+    return None
+
+
+def _number(value):
+    # a value read once for all iterations, with its NUMBR bound
+    if value.__class__ is int:
+        if abs(value) >= INT_LIMIT:
+            raise NotVectorizable()
+        return value, abs(value)
+
+    if value.__class__ is float:
+        return value, 0
+
+    # YARNs, TROOFs, NOOBs and UNSET slots are left to the interpreter
+    raise NotVectorizable()
+
+
+def _isNumbr(value):
+    # arrays, NumPy scalars and Python numbers alike
+    return numpy.asarray(value).dtype.kind == "i"
@@ -0,0 +1,395 @@
+import easygui
+
+from .bukkit import Bukkit
+from .bytecode import BINARY_OPCODES, OPCODE
+from .function_cache import MISSING
+from .runtime import (
+    ARITHMETIC_OPERATORS,
+    MAX_CALL_DEPTH,
+    NESTED_CALLS_MESSAGE,
+    NOT_HOISTED,
+    OPERATION_ERRORS,
+    OPERATIONS,
+    UNSET,
+    YARN_TYPES,
+    bukkitItems,
+    bukkitSize,
+    caseKey,
+    describeError,
+    getItem,
+    setItem,
+    smoosh,
+    toYarn,
+    typeCast,
+)
+from .resolver import Frame
+from .utils import toNumber
+
+# the operation of every binary opcode, indexed by opcode
+BINARY_OPERATIONS = [None] * len(BINARY_OPCODES)
+for operationType, opcode in BINARY_OPCODES.items():
+    BINARY_OPERATIONS[opcode] = OPERATIONS[operationType]
+
+# arithmetic opcodes call the operator directly, and only convert YARNs
+for operationType, function in ARITHMETIC_OPERATORS.items():
+    BINARY_OPERATIONS[BINARY_OPCODES[operationType]] = function
+
+LAST_ARITHMETIC_OPCODE = max(
+    BINARY_OPCODES[operationType] for operationType in ARITHMETIC_OPERATORS
+)
+LAST_BINARY_OPCODE = max(BINARY_OPCODES.values())
+
+# plain ints, as comparing with them is cheaper than with OPCODE members
+LOAD_CONSTANT = int(OPCODE.LOAD_CONSTANT)
+LOAD_VARIABLE = int(OPCODE.LOAD_VARIABLE)
+STORE_VARIABLE = int(OPCODE.STORE_VARIABLE)
+NOT = int(OPCODE.NOT)
+SMOOSH = int(OPCODE.SMOOSH)
+CAST = int(OPCODE.CAST)
+PRINT = int(OPCODE.PRINT)
+PRINT_LINEBREAK = int(OPCODE.PRINT_LINEBREAK)
+INPUT = int(OPCODE.INPUT)
+JUMP = int(OPCODE.JUMP)
+POP_JUMP_IF_TRUE = int(OPCODE.POP_JUMP_IF_TRUE)
+POP_JUMP_IF_FALSE = int(OPCODE.POP_JUMP_IF_FALSE)
+POP_JUMP_UNLESS_WIN = int(OPCODE.POP_JUMP_UNLESS_WIN)
+JUMP_IF_FALSE_OR_POP = int(OPCODE.JUMP_IF_FALSE_OR_POP)
+JUMP_IF_TRUE_OR_POP = int(OPCODE.JUMP_IF_TRUE_OR_POP)
+TO_TROOF = int(OPCODE.TO_TROOF)
+SWITCH = int(OPCODE.SWITCH)
+CLEAR_SLOTS = int(OPCODE.CLEAR_SLOTS)
+RETURN = int(OPCODE.RETURN)
+INCREMENT = int(OPCODE.INCREMENT)
+DECREMENT = int(OPCODE.DECREMENT)
+STEP_AND_TEST = int(OPCODE.STEP_AND_TEST)
+BINARY_CONSTANT = int(OPCODE.BINARY_CONSTANT)
+HOIST = int(OPCODE.HOIST)
+STORE_INVARIANT = int(OPCODE.STORE_INVARIANT)
+LOAD_INVARIANT = int(OPCODE.LOAD_INVARIANT)
+CALL = int(OPCODE.CALL)
+TAIL_CALL = int(OPCODE.TAIL_CALL)
+RETURN_VALUE = int(OPCODE.RETURN_VALUE)
+LOAD_VARIABLE_OR_NOOB = int(OPCODE.LOAD_VARIABLE_OR_NOOB)
+MAKE_BUKKIT = int(OPCODE.MAKE_BUKKIT)
+GET_ITEM = int(OPCODE.GET_ITEM)
+SET_ITEM = int(OPCODE.SET_ITEM)
+SIZE = int(OPCODE.SIZE)
+GET_ITERATOR = int(OPCODE.GET_ITERATOR)
+FOR_ITEM = int(OPCODE.FOR_ITEM)
+
+
+class VirtualMachine:
+    """Runs Bytecode on a value stack.
+
+    Like the other engines, it keeps the variables in the evaluator's memory,
+    a Frame indexed by the slots in the instructions, and writes to its
+    output sink. A function call runs on a values list of its own, the
+    caller's being kept on a stack of frames until it returns, so calls do
+    not grow the Python stack; the stack of frames is still limited to
+    MAX_CALL_DEPTH, as the other engines are.
+    """
+
+    def __init__(self, evaluator):
+        self.evaluator = evaluator
+
+    def run(self, bytecode, opcodeCounts=None):
+        """Runs a program. When opcodeCounts is given (e.g. a Counter), the
+        number of times each opcode runs is added to it."""
+        evaluator = self.evaluator
+        evaluator.memory = Frame(bytecode.names, bytecode.globalSlots)
+        variables = evaluator.memory.values
+        output = evaluator.output
+        write = output.write
+        code = bytecode.code
+        constants = bytecode.constants
+        names = bytecode.names
+        binaryOperations = BINARY_OPERATIONS
+        caches = evaluator.functionCaches
+
+        stack = []
+        push = stack.append
+        pop = stack.pop
+
+        # hoisted invariant values by slot, and while hoisting one, its slot,
+        # where to go on errors and the stack depth to go back to
+        invariants = {}
+        hoisting = None
+
+        # for every function call running, innermost last, where to go back
+        # to, the caller's variables and their names, and the cache and key
+        # to keep the result under
+        frames = []
+
+        offset = 0
+
+        while True:
+            try:
+                while True:
+                    opcode = code[offset]
+                    argument = code[offset + 1]
+                    offset += 2
+
+                    if opcodeCounts is not None:
+                        opcodeCounts[OPCODE(opcode)] += 1
+
+                    if opcode <= LAST_BINARY_OPCODE:
+                        secondValue = pop()
+                        firstValue = stack[-1]
+
+                        if opcode <= LAST_ARITHMETIC_OPCODE:
+                            if firstValue.__class__ in YARN_TYPES:
+                                firstValue = toNumber(firstValue)
+                            if secondValue.__class__ in YARN_TYPES:
+                                secondValue = toNumber(secondValue)
+
+                        stack[-1] = binaryOperations[opcode](firstValue, secondValue)
+
+                    elif opcode == LOAD_VARIABLE:
+                        value = variables[argument]
+                        if value is UNSET:
+                            raise KeyError(names[argument])
+                        push(value)
+
+                    elif opcode == BINARY_CONSTANT:
+                        binaryOpcode, secondValue = constants[argument]
+                        firstValue = stack[-1]
+
+                        if binaryOpcode <= LAST_ARITHMETIC_OPCODE:
+                            # the second operand is a literal, never a Rope
+                            if firstValue.__class__ in YARN_TYPES:
+                                firstValue = toNumber(firstValue)
+                            if secondValue.__class__ is str:
+                                secondValue = toNumber(secondValue)
+
+                        stack[-1] = binaryOperations[binaryOpcode](
+                            firstValue, secondValue
+                        )
+
+                    elif opcode == LOAD_CONSTANT:
+                        push(constants[argument])
+
+                    elif opcode == STORE_VARIABLE:
+                        variables[argument] = pop()
+
+                    elif opcode == STEP_AND_TEST:
+                        stepArguments = constants[argument]
+                        (
+                            counterSlot,
+                            delta,
+                            limit,
+                            stopWhenEqual,
+                            bodyStart,
+                        ) = stepArguments
+                        counterValue = toNumber(variables[counterSlot]) + delta
+                        variables[counterSlot] = counterValue
+
+                        if (counterValue == limit) != stopWhenEqual:
+                            offset = bodyStart
+
+                    elif opcode == JUMP:
+                        offset = argument
+
+                    elif opcode == POP_JUMP_IF_TRUE:
+                        if pop():
+                            offset = argument
+
+                    elif opcode == POP_JUMP_IF_FALSE:
+                        if not pop():
+                            offset = argument
+
+                    elif opcode == POP_JUMP_UNLESS_WIN:
+                        if pop() != True:
+                            offset = argument
+
+                    elif opcode == JUMP_IF_FALSE_OR_POP:
+                        # the operand decides a BOTH OF or ALL OF
+                        if stack[-1]:
+                            pop()
+                        else:
+                            stack[-1] = False
+                            offset = argument
+
+                    elif opcode == JUMP_IF_TRUE_OR_POP:
+                        # the operand decides an EITHER OF or ANY OF
+                        if stack[-1]:
+                            stack[-1] = True
+                            offset = argument
+                        else:
+                            pop()
+
+                    elif opcode == TO_TROOF:
+                        stack[-1] = bool(stack[-1])
+
+                    elif opcode == INCREMENT:
+                        variables[argument] = toNumber(variables[argument]) + 1
+
+                    elif opcode == DECREMENT:
+                        variables[argument] = toNumber(variables[argument]) - 1
+
+                    elif opcode == PRINT:
+                        write(toYarn(pop()))
+
+                    elif opcode == PRINT_LINEBREAK:
+                        write("\n")
+
+                    elif opcode == NOT:
+                        stack[-1] = not stack[-1]
+
+                    elif opcode == CAST:
+                        stack[-1] = typeCast(constants[argument], stack[-1])
+
+                    elif opcode == SMOOSH:
+                        values = stack[-argument:]
+                        del stack[-argument:]
+                        push(smoosh(values))
+
+                    elif opcode == SWITCH:
+                        jumpTable, defaultTarget = constants[argument]
+                        offset = jumpTable.get(caseKey(pop()), defaultTarget)
+
+                    elif opcode == INPUT:
+                        value = easygui.enterbox(output.tail())
+                        variables[argument] = value
+                        write(toYarn(value) + "\n")
+
+                    elif opcode == CLEAR_SLOTS:
+                        # the variables of a switch's cases
+                        firstSlot, endSlot = constants[argument]
+                        variables[firstSlot:endSlot] = [UNSET] * (endSlot - firstSlot)
+
+                    elif opcode == LOAD_INVARIANT:
+                        slot, hoistedTarget = constants[argument]
+                        value = invariants.get(slot, NOT_HOISTED)
+                        if value is not NOT_HOISTED:
+                            push(value)
+                            offset = hoistedTarget
+
+                    elif opcode == HOIST:
+                        slot, failTarget = constants[argument]
+                        hoisting = (slot, failTarget, len(stack))
+
+                    elif opcode == STORE_INVARIANT:
+                        invariants[argument] = pop()
+                        hoisting = None
+
+                    elif opcode == CALL:
+                        (
+                            start,
+                            parameterCount,
+                            slotCount,
+                            functionNames,
+                            name,
+                        ) = constants[argument]
+                        argumentStart = len(stack) - parameterCount
+                        arguments = stack[argumentStart:]
+                        del stack[argumentStart:]
+
+                        cache = caches.get(name)
+                        key = None
+                        if cache is not None:
+                            key = cache.key(arguments)
+                            value = cache.lookup(key)
+                            if value is not MISSING:
+                                push(value)
+                                continue
+
+                        if len(frames) == MAX_CALL_DEPTH:
+                            raise ValueError(NESTED_CALLS_MESSAGE.format(name))
+
+                        frames.append((offset, variables, names, cache, key))
+                        variables = arguments + [UNSET] * (slotCount - parameterCount)
+                        names = functionNames
+                        offset = start
+
+                    elif opcode == TAIL_CALL:
+                        # the call's frame replaces the current one
+                        start, parameterCount, slotCount, _, _ = constants[argument]
+                        argumentStart = len(stack) - parameterCount
+                        arguments = stack[argumentStart:]
+                        del stack[argumentStart:]
+
+                        variables = arguments + [UNSET] * (slotCount - parameterCount)
+                        offset = start
+
+                    elif opcode == RETURN_VALUE:
+                        # the value stays on the stack, for the caller
+                        offset, variables, names, cache, key = frames.pop()
+                        if cache is not None:
+                            cache.store(key, stack[-1])
+
+                    elif opcode == LOAD_VARIABLE_OR_NOOB:
+                        value = variables[argument]
+                        push(None if value is UNSET else value)
+
+                    elif opcode == FOR_ITEM:
+                        iteratorSlot, counterSlot, endTarget = constants[argument]
+                        value = next(variables[iteratorSlot], UNSET)
+                        if value is UNSET:
+                            offset = endTarget
+                        else:
+                            variables[counterSlot] = value
+
+                    elif opcode == GET_ITEM:
+                        index = pop()
+                        stack[-1] = getItem(stack[-1], index)
+
+                    elif opcode == SET_ITEM:
+                        value = pop()
+                        index = pop()
+                        setItem(pop(), index, value)
+
+                    elif opcode == SIZE:
+                        stack[-1] = bukkitSize(stack[-1])
+
+                    elif opcode == MAKE_BUKKIT:
+                        if argument:
+                            values = stack[-argument:]
+                            del stack[-argument:]
+                        else:
+                            values = []
+                        push(Bukkit(values))
+
+                    elif opcode == GET_ITERATOR:
+                        variables[argument] = bukkitItems(pop())
+
+                    elif opcode == RETURN:
+                        return
+
+                    else:
+                        raise ValueError(f"Unknown opcode {opcode}")
+
+            except (*OPERATION_ERRORS, KeyError) as error:
+                if hoisting is None:
+                    # no instruction moves the offset before it can fail, so
+                    # the failed one is the last one read
+                    self._rethrow(error, bytecode, offset - 2)
+
+                # a failed hoist is left to fail where the invariant is used
+                slot, failTarget, stackDepth = hoisting
+                invariants.pop(slot, None)
+                del stack[stackDepth:]
+                offset = failTarget
+                hoisting = None
+
+    def _rethrow(self, error, bytecode, instructionOffset):
+        # errors with a position were raised on purpose and pass through
+        if isinstance(error, SyntaxError) and error.lineno is not None:
+            raise error
+
+        if isinstance(error, KeyError):
+            errorType, message = NameError, f"{error.args[0]} is not defined"
+        else:
+            errorType, message = describeError(error)
+
+        # the position of the instruction that failed
+        instructionIndex = instructionOffset // 2
+        lineNumber = bytecode.lines[instructionIndex]
+
+        errorArgs = (
+            None,
+            lineNumber,
+            bytecode.columns[instructionIndex],
+            self.evaluator.source.line(lineNumber),
+        )
+
+        raise errorType(message, errorArgs) from None
@@ -1,3 +1,5 @@
+import argparse
+import sys
 from tkinter import (
     END,
     RIGHT,
@@ -11,17 +13,146 @@ from tkinter import (
     ttk,
 )
 
+from components.bukkit import Bukkit
 from components.evaluator import Evaluator
+from components.function_cache import DEFAULT_CACHE_SIZE
 from components.lexer import Lexer
+from components.output import CallbackSink, StreamSink
+from components.source import Source
 
 
 def main():
+    argumentParser = argparse.ArgumentParser(description="LOLCODE interpreter")
+    argumentParser.add_argument(
+        "file", nargs="?", help="run this file instead of opening the editor"
+    )
+    argumentParser.add_argument(
+        "--emit-python",
+        action="store_true",
+        help="print the Python code the file is translated to, without running it",
+    )
+    argumentParser.add_argument(
+        "--optimize",
+        action="store_true",
+        help="fold constants and drop dead branches before running the file",
+    )
+    argumentParser.add_argument(
+        "--vectorize",
+        action="store_true",
+        help="run loops of pure arithmetic with NumPy, when it is installed",
+    )
+    argumentParser.add_argument(
+        "--pure",
+        action="append",
+        default=[],
+        metavar="FUNCTION",
+        help="keep the results of this function by its arguments (repeatable)",
+    )
+    argumentParser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_CACHE_SIZE,
+        help=f"results kept per --pure function (default {DEFAULT_CACHE_SIZE})",
+    )
+    argumentParser.add_argument(
+        "--output", help="write the output of the file to this file, not stdout"
+    )
+    argumentParser.add_argument(
+        "--buffer-size",
+        type=int,
+        default=8192,
+        help="characters of output to gather before each write (default 8192)",
+    )
+    arguments = argumentParser.parse_args()
+
+    if arguments.emit_python:
+        if arguments.file is None:
+            argumentParser.error("--emit-python needs a file")
+        return emitPython(arguments.file, arguments.optimize)
+
+    if arguments.file is not None:
+        return runFile(
+            arguments.file,
+            arguments.optimize,
+            arguments.output,
+            arguments.buffer_size,
+            arguments.vectorize,
+            arguments.pure,
+            arguments.cache_size,
+        )
+
     root = Tk()
     interpreter = Interpreter(root)
     interpreter.root.mainloop()
     return None
 
 
+def runFile(
+    filename,
+    optimize=False,
+    outputFilename=None,
+    bufferSize=8192,
+    vectorize=False,
+    pureFunctions=(),
+    cacheSize=DEFAULT_CACHE_SIZE,
+):
+    # batch mode: the file is memory-mapped and never read into one string,
+    # and the output is written as the program runs
+    if outputFilename is None:
+        output = StreamSink(sys.stdout, bufferSize)
+    else:
+        output = StreamSink.fromFile(outputFilename, bufferSize)
+
+    evaluator = Evaluator(
+        optimize=optimize,
+        output=output,
+        vectorize=vectorize,
+        pureFunctions=pureFunctions,
+        cacheSize=cacheSize,
+    )
+    status = ""
+
+    with Source.fromFile(filename) as source, output:
+        try:
+            tokens = Lexer().process(source)
+            evaluator.evaluate(tokens, source)
+        except (SyntaxError, NameError, ValueError) as error:
+            status = formatError(error)
+
+    if status:
+        print(status, file=sys.stderr)
+        return 1
+
+    return 0
+
+
+def emitPython(filename, optimize=False):
+    evaluator = Evaluator(engine="python", optimize=optimize)
+
+    with Source.fromFile(filename) as source:
+        try:
+            tokens = Lexer().process(source)
+            print(evaluator.transpile(tokens, source), end="")
+        except SyntaxError as error:
+            print(formatError(error), file=sys.stderr)
+            return 1
+
+    return 0
+
+
+def formatError(error):
+    if isinstance(error, SyntaxError):
+        # errorArrowIndenter = (error.offset or 0) * " "
+        # status = f"\nline {error.lineno}:\n{error.text}\n{errorArrowIndenter}^\n{error.msg}"
+
+        return f"\nline {error.lineno}:\n{error.text.strip()}\n\n{error.msg}"
+
+    msg, rest = error.args
+    fileName, lineno, offset, text = rest
+
+    return f"\nline {lineno}:\n{text.strip()}\n\n{msg}"
+
+
 class Interpreter:
     def __init__(self, root):
         self.root = root
@@ -58,35 +189,26 @@ class Interpreter:
     def processText(self):
         input_text = self.textEditor.getInputFromTextEditor()
         lexer = Lexer()
-        evaluator = Evaluator()
+        evaluator = Evaluator(output=CallbackSink(self.console.outputResult))
 
         self.table_lexemes.clearTable()
 
         status = ""
+        self.console.outputResult(">\n")
 
         try:
             tokens = lexer.process(input_text)
             self.table_lexemes.insertObjectList(tokens)
 
-            evaluator.evaluate(input_text, tokens)
+            evaluator.evaluate(tokens, input_text)
 
-        except SyntaxError as error:
-            # errorArrowIndenter = (error.offset or 0) * " "
-            # status = f"\nline {error.lineno}:\n{error.text}\n{errorArrowIndenter}^\n{error.msg}"
-
-            status = f"\nline {error.lineno}:\n{error.text.strip()}\n\n{error.msg}"
-
-        except (NameError, ValueError) as error:
-            msg, rest = error.args
-            fileName, lineno, offset, text = rest
+        except (SyntaxError, NameError, ValueError) as error:
+            status = formatError(error)
 
-            status = f"\nline {lineno}:\n{text.strip()}\n\n{msg}"
-
-        self.console.outputResult(">\n" + getattr(evaluator, "outputBuffer", "") + "\n")
-        self.console.outputResult(status + "\n")
+        self.console.outputResult("\n" + status + "\n")
 
         self.symbol_table.clearTable()
-        self.symbol_table.insertDictionary(getattr(evaluator, "memory", ""))
+        self.symbol_table.insertDictionary(evaluator.memory.flatten())
 
 
 class TextEditor:
@@ -112,7 +234,8 @@ class TextEditor:
             filetypes=(("Text files", "*.lol"), ("all files", "*.*")),
         )
         self.textField.delete(1.0, END)
-        self.textField.insert(END, open(filename, "r").read())
+        with open(filename, "r") as file:
+            self.textField.insert(END, file.read())
 
     def getInputFromTextEditor(self):
         return self.textField.get(1.0, "end-1c")
@@ -156,16 +279,23 @@ class Table:
 
     def insertObjectList(self, object_list):
         for token_object in object_list:
-            self.addData((token_object.lexeme, token_object.lexemeType))
+            self.addData((token_object.lexeme, token_object.lexemeType.description))
 
     def insertDictionary(self, dictionary):
         for key in dictionary.keys():
-            self.addData((key, dictionary[key]))
+            value = dictionary[key]
+
+            # a BUKKIT can hold too many items for one row
+            if isinstance(value, Bukkit):
+                value = value.summary()
+
+            self.addData((key, value))
 
     def clearTable(self):
         self.table.delete(*self.table.get_children())
 
 
-main()
+if __name__ == "__main__":
+    sys.exit(main())
 # References
 # Tables: https://www.pythontutorial.net/tkinter/tkinter-treeview/
@@ -0,0 +1,53 @@
+import io
+import unittest
+from collections import Counter
+from src.components.bytecode import OPCODE, Bytecode, disassemble
+from src.components.evaluator import Evaluator
+from src.components.lexer import Lexer
+
+
+sourceCode = (
+    "HAI\n"
+    "I HAS A i ITZ 0\n"
+    "IM IN YR loop UPPIN YR i TIL BOTH SAEM i AN 3\n"
+    "VISIBLE SUM OF i AN 10\n"
+    "IM OUTTA YR loop\n"
+    "KTHXBYE"
+)
+
+
+def compileSource():
+    return Evaluator(engine="bytecode").compileBytecode(
+        Lexer().process(sourceCode), sourceCode
+    )
+
+
+class TestBytecode(unittest.TestCase):
+    def test_counted_loop_superinstruction(self):
+        bytecode = compileSource()
+        opcodes = bytecode.code[::2]
+
+        self.assertIn(OPCODE.STEP_AND_TEST, opcodes)
+        self.assertIn(OPCODE.BINARY_CONSTANT, opcodes)
+        self.assertNotIn(OPCODE.JUMP, opcodes)
+
+    def test_run_saved_bytecode(self):
+        bytecode = Bytecode.fromBytes(compileSource().toBytes())
+        evaluator = Evaluator(engine="bytecode")
+        opcodeCounts = Counter()
+
+        evaluator.runBytecode(bytecode, opcodeCounts=opcodeCounts)
+
+        self.assertEqual(evaluator.outputBuffer, "10\n11\n12\n")
+        self.assertEqual(opcodeCounts[OPCODE.STEP_AND_TEST], 3)
+
+    def test_disassemble(self):
+        output = io.StringIO()
+        disassemble(compileSource(), output)
+
+        self.assertIn("STORE_VARIABLE          0 (i)", output.getvalue())
+        self.assertIn("stop if == 3", output.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
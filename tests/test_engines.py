@@ -0,0 +1,491 @@
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+from src.components import evaluator as evaluatorModule
+from src.components.evaluator import Evaluator
+from src.components.bukkit import Bukkit
+from src.components.lexer import Lexer
+from src.components.rope import Rope
+from src.components.runtime import MAX_CALL_DEPTH
+
+
+SAMPLE_CODES = Path(__file__).parent.parent / "sample_codes"
+
+# engines that must behave exactly like the tree-walking one
+COMPILING_ENGINES = ("closure", "python", "bytecode")
+
+
+def run(sourceCode, engine, optimize=False):
+    evaluator = Evaluator(engine=engine, optimize=optimize)
+    try:
+        evaluator.evaluate(Lexer().process(sourceCode), sourceCode)
+        error = None
+    except (SyntaxError, NameError, ValueError) as raisedError:
+        error = (type(raisedError), raisedError.args)
+
+    return evaluator.outputBuffer, evaluator.memory.flatten(), error
+
+
+class TestEngines(unittest.TestCase):
+    def assertSameAsTreeEngine(self, sourceCode):
+        for engine in COMPILING_ENGINES:
+            with self.subTest(engine=engine):
+                self.assertEqual(run(sourceCode, engine), run(sourceCode, "tree"))
+
+        for engine in ("tree",) + COMPILING_ENGINES:
+            with self.subTest(engine=engine, optimize=True):
+                self.assertEqual(
+                    run(sourceCode, engine, optimize=True), run(sourceCode, "tree")
+                )
+
+    def test_sample_codes(self):
+        for samplePath in sorted(SAMPLE_CODES.glob("*.lol")):
+            sourceCode = samplePath.read_text()
+
+            for userInput in ("0", "1", "2", "3", "5"):
+                with self.subTest(sample=samplePath.name, userInput=userInput):
+                    with mock.patch.object(
+                        evaluatorModule.easygui, "enterbox", return_value=userInput
+                    ):
+                        self.assertSameAsTreeEngine(sourceCode)
+
+    def test_break_and_nested_loops(self):
+        sourceCode = (
+            "HAI\n"
+            "I HAS A i ITZ 0\n"
+            "IM IN YR outer UPPIN YR i TIL BOTH SAEM i AN 2\n"
+            "I HAS A j ITZ 0\n"
+            "IM IN YR inner UPPIN YR j\n"
+            "BOTH SAEM j AN 2\n"
+            "O RLY?\n"
+            "YA RLY\n"
+            "GTFO\n"
+            "OIC\n"
+            "VISIBLE i AN j\n"
+            "IM OUTTA YR inner\n"
+            "IM OUTTA YR outer\n"
+            "KTHXBYE"
+        )
+
+        for engine in COMPILING_ENGINES:
+            with self.subTest(engine=engine):
+                output, memory, error = run(sourceCode, engine)
+
+                self.assertIsNone(error)
+                self.assertEqual(output, "00\n01\n10\n11\n")
+                self.assertEqual(memory, {"i": 2})
+
+    def test_scopes(self):
+        sourceCode = (
+            "HAI\n"
+            "I HAS A total ITZ 0\n"
+            "I HAS A i ITZ 0\n"
+            "IM IN YR loop UPPIN YR i TIL BOTH SAEM i AN 3\n"
+            "I HAS A total ITZ 100\n"
+            "I HAS A square ITZ PRODUKT OF i AN i\n"
+            "IM OUTTA YR loop\n"
+            "IM IN YR loop UPPIN YR i TIL BOTH SAEM i AN 6\n"
+            "I HAS A square ITZ PRODUKT OF i AN i\n"
+            "total R SUM OF total AN square\n"
+            "IM OUTTA YR loop\n"
+            "KTHXBYE"
+        )
+
+        # declarations stay in their block, writes to outer variables do not
+        for engine in ("tree",) + COMPILING_ENGINES:
+            with self.subTest(engine=engine):
+                output, memory, error = run(sourceCode, engine)
+
+                self.assertIsNone(error)
+                self.assertEqual(memory, {"total": 50, "i": 6})
+
+    def test_loop_invariants(self):
+        sourceCode = (
+            "HAI\n"
+            "I HAS A a ITZ 2\n"
+            "I HAS A b ITZ 3\n"
+            "I HAS A c ITZ 4\n"
+            "I HAS A i ITZ 0\n"
+            "IM IN YR loop UPPIN YR i TIL BOTH SAEM i AN PRODUKT OF a AN 2\n"
+            'VISIBLE PRODUKT OF a AN b " " SUM OF b AN c " " SUM OF a AN c\n'
+            "b R SUM OF b AN i\n"
+            "GIMMEH c\n"
+            "IM OUTTA YR loop\n"
+            "IM IN YR undeclared UPPIN YR i TIL BOTH SAEM i AN 6\n"
+            "VISIBLE PRODUKT OF a AN d\n"
+            "IM OUTTA YR undeclared\n"
+            "KTHXBYE"
+        )
+
+        with mock.patch.object(evaluatorModule.easygui, "enterbox", return_value="7"):
+            self.assertSameAsTreeEngine(sourceCode)
+
+    def test_short_circuit(self):
+        # the operands after the one deciding the result would divide by 0
+        sourceCode = (
+            "HAI\n"
+            "I HAS A zero ITZ 0\n"
+            "VISIBLE BOTH OF zero AN QUOSHUNT OF 1 AN zero\n"
+            "VISIBLE EITHER OF 1 AN QUOSHUNT OF 1 AN zero\n"
+            "VISIBLE ALL OF 1 AN WIN AN zero AN QUOSHUNT OF 1 AN zero MKAY\n"
+            'VISIBLE ANY OF zero AN "" AN 2 AN QUOSHUNT OF 1 AN zero MKAY\n'
+            'VISIBLE ALL OF 1 AN 2 MKAY " " ANY OF zero AN FAIL MKAY\n'
+            "KTHXBYE"
+        )
+
+        output, _, error = run(sourceCode, "tree")
+        self.assertIsNone(error)
+        self.assertEqual(output, "FAIL\nWIN\nFAIL\nWIN\nWIN FAIL\n")
+        self.assertSameAsTreeEngine(sourceCode)
+
+    def test_else_if_chains(self):
+        sourceCode = (
+            "HAI\n"
+            "I HAS A zero ITZ 0\n"
+            "I HAS A x ITZ 0\n"
+            "IM IN YR loop UPPIN YR x TIL BOTH SAEM x AN 5\n"
+            "BOTH SAEM x AN 0\n"
+            "O RLY?\n"
+            "YA RLY\n"
+            'VISIBLE "zero"\n'
+            "MEBBE BOTH SAEM x AN 1\n"
+            'VISIBLE "one"\n'
+            "MEBBE DIFFRINT x AN 3\n"
+            'VISIBLE "not three"\n'
+            "MEBBE QUOSHUNT OF 1 AN zero\n"
+            'VISIBLE "never"\n'
+            "NO WAI\n"
+            'VISIBLE "three"\n'
+            "OIC\n"
+            "IM OUTTA YR loop\n"
+            "KTHXBYE"
+        )
+
+        # the last MEBBE condition fails, but only runs once x is 3
+        output, _, error = run(sourceCode, "tree")
+        self.assertEqual(output, "zero\none\nnot three\n")
+        self.assertEqual(error[0], ValueError)
+        self.assertSameAsTreeEngine(sourceCode)
+
+    def test_switch_case_types(self):
+        itValues = ("3", "3.0", '"3"', "2.5", '"2.5"', "WIN", '"True"', "1", "FAIL")
+        switch = (
+            "WTF?\n"
+            "OMG 3\n"
+            'VISIBLE "NUMBR"\n'
+            "GTFO\n"
+            "OMG 2.5\n"
+            'VISIBLE "NUMBAR"\n'
+            "GTFO\n"
+            "OMG WIN\n"
+            'VISIBLE "TROOF"\n'
+            "GTFO\n"
+            'OMG "7"\n'
+            'VISIBLE "YARN"\n'
+            "GTFO\n"
+            "OMGWTF\n"
+            'VISIBLE "none"\n'
+            "OIC\n"
+        )
+        sourceCode = (
+            "HAI\n"
+            + "".join(f"{itValue}\n{switch}" for itValue in itValues)
+            + "7\n"
+            + switch
+            + "KTHXBYE"
+        )
+
+        # NUMBRs and NUMBARs match by value, YARNs spelling a case's number
+        # match it, and TROOFs only match TROOFs
+        output, _, error = run(sourceCode, "tree")
+        self.assertIsNone(error)
+        self.assertEqual(
+            output.split(),
+            ["NUMBR", "NUMBR", "NUMBR", "NUMBAR", "NUMBAR", "TROOF"]
+            + ["none", "none", "none", "YARN"],
+        )
+        self.assertSameAsTreeEngine(sourceCode)
+
+    def test_functions(self):
+        sourceCode = (
+            "HAI\n"
+            "I HAS A x ITZ 10\n"
+            "VISIBLE I IZ fib YR x MKAY\n"
+            "HOW IZ I fib YR n\n"
+            "BOTH SAEM n AN SMALLR OF n AN 1\n"
+            "O RLY?\n"
+            "YA RLY\n"
+            "FOUND YR n\n"
+            "OIC\n"
+            "I HAS A x ITZ I IZ fib YR DIFF OF n AN 1 MKAY\n"
+            "FOUND YR SUM OF x AN I IZ fib YR DIFF OF n AN 2 MKAY\n"
+            "IF U SAY SO\n"
+            "HOW IZ I twice YR a\n"
+            "SUM OF a AN a\n"
+            "IF U SAY SO\n"
+            "HOW IZ I stop\n"
+            "GTFO\n"
+            "IF U SAY SO\n"
+            'VISIBLE I IZ twice YR 4 MKAY " " I IZ stop MKAY "!"\n'
+            "I IZ twice YR x MKAY\n"
+            "KTHXBYE"
+        )
+
+        output, memory, error = run(sourceCode, "tree")
+        self.assertIsNone(error)
+        self.assertEqual(output, "55\n8 !\n")
+        self.assertEqual(memory, {"x": 10, "IT": 20})
+        self.assertSameAsTreeEngine(sourceCode)
+
+    def test_call_from_a_later_function(self):
+        # add is only called from the body of inc, which is defined after it
+        sourceCode = (
+            "HAI\n"
+            "HOW IZ I add YR a AN YR b\n"
+            "FOUND YR SUM OF a AN b\n"
+            "IF U SAY SO\n"
+            "HOW IZ I inc YR n\n"
+            "FOUND YR I IZ add YR n AN YR 1 MKAY\n"
+            "IF U SAY SO\n"
+            "VISIBLE I IZ inc YR 41 MKAY\n"
+            "KTHXBYE"
+        )
+
+        self.assertEqual(run(sourceCode, "tree"), ("42\n", {}, None))
+        self.assertSameAsTreeEngine(sourceCode)
+
+    def test_tail_calls(self):
+        # far deeper than the recursion limit, in a loop on the way out
+        sourceCode = (
+            "HAI\n"
+            "HOW IZ I count YR n AN YR total\n"
+            "I HAS A i ITZ 0\n"
+            "IM IN YR loop UPPIN YR i\n"
+            "BOTH SAEM n AN 0\n"
+            "O RLY?\n"
+            "YA RLY\n"
+            "FOUND YR total\n"
+            "OIC\n"
+            "FOUND YR I IZ count YR DIFF OF n AN 1 AN YR SUM OF total AN n MKAY\n"
+            "IM OUTTA YR loop\n"
+            "IF U SAY SO\n"
+            "VISIBLE I IZ count YR 20000 AN YR 0 MKAY\n"
+            "KTHXBYE"
+        )
+
+        self.assertEqual(run(sourceCode, "tree"), ("200010000\n", {}, None))
+        self.assertSameAsTreeEngine(sourceCode)
+
+    def test_deep_recursion(self):
+        sourceCode = (
+            "HAI\n"
+            "HOW IZ I sumUpTo YR n\n"
+            "BOTH SAEM n AN 0\n"
+            "O RLY?\n"
+            "YA RLY\n"
+            "FOUND YR 0\n"
+            "OIC\n"
+            "FOUND YR SUM OF n AN I IZ sumUpTo YR DIFF OF n AN 1 MKAY\n"
+            "IF U SAY SO\n"
+            "VISIBLE I IZ sumUpTo YR {} MKAY\n"
+            "KTHXBYE"
+        )
+        recursionLimit = sys.getrecursionlimit()
+        lastDepth = MAX_CALL_DEPTH - 1  # with the call for 0
+
+        # a Python stack this deep is only safe from Python 3.11 on
+        if sys.version_info >= (3, 11):
+            self.assertEqual(
+                run(sourceCode.format(lastDepth), "tree"),
+                (f"{lastDepth * (lastDepth + 1) // 2}\n", {}, None),
+            )
+            self.assertSameAsTreeEngine(sourceCode.format(lastDepth))
+
+        # one call more fails where it is made, on every engine
+        for depth in (MAX_CALL_DEPTH, 100_000):
+            for engine in ("tree",) + COMPILING_ENGINES:
+                with self.subTest(depth=depth, engine=engine):
+                    _, _, error = run(sourceCode.format(depth), engine)
+                    self.assertEqual(
+                        error,
+                        (
+                            ValueError,
+                            (
+                                "Too many nested calls to sumUpTo",
+                                (None, 8, 21, sourceCode.splitlines()[7]),
+                            ),
+                        ),
+                    )
+                    self.assertEqual(sys.getrecursionlimit(), recursionLimit)
+
+    def test_pure_functions(self):
+        sourceCode = (
+            "HAI\n"
+            "HOW IZ I square YR n\n"
+            "FOUND YR PRODUKT OF n AN n\n"
+            "IF U SAY SO\n"
+            'VISIBLE I IZ square YR 3 MKAY " " I IZ square YR 3.0 MKAY\n'
+            'VISIBLE I IZ square YR 3 MKAY " " I IZ square YR 4 MKAY\n'
+            "KTHXBYE"
+        )
+
+        for engine in ("tree",) + COMPILING_ENGINES:
+            with self.subTest(engine=engine):
+                evaluator = Evaluator(
+                    engine=engine, pureFunctions=["square"], cacheSize=2
+                )
+                evaluator.evaluate(Lexer().process(sourceCode), sourceCode)
+                cache = evaluator.functionCaches["square"]
+
+                self.assertEqual(evaluator.outputBuffer, "9 9.0\n9 16\n")
+                self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 3, 2))
+
+    def test_long_yarns(self):
+        # long enough to be Ropes, appended to from two variables
+        sourceCode = (
+            "HAI\n"
+            'I HAS A report ITZ ""\n'
+            "I HAS A i ITZ 0\n"
+            "IM IN YR build UPPIN YR i TIL BOTH SAEM i AN 500\n"
+            'report R SMOOSH report AN "line " AN i AN ":" MKAY\n'
+            "IM OUTTA YR build\n"
+            'I HAS A copy ITZ SMOOSH report AN "!" MKAY\n'
+            'report R SMOOSH report AN "?" MKAY\n'
+            'VISIBLE SMOOSH "> " AN copy MKAY " " NOT report\n'
+            "VISIBLE report\n"
+            "KTHXBYE"
+        )
+
+        report = "".join(f"line {i}:" for i in range(500))
+        output, memory, error = run(sourceCode, "tree")
+        self.assertIsNone(error)
+        self.assertEqual(output, f"> {report}! FAIL\n{report}?\n")
+        self.assertIsInstance(memory["report"], Rope)
+        self.assertEqual(memory["copy"], report + "!")
+        self.assertSameAsTreeEngine(sourceCode)
+
+    def test_bukkits(self):
+        sourceCode = (
+            "HAI\n"
+            "HOW IZ I findz YR haystack AN YR needle\n"
+            "I HAS A item\n"
+            "I HAS A position ITZ 0\n"
+            "IM IN YR search EACH YR item IN haystack\n"
+            "BOTH SAEM item AN needle\n"
+            "O RLY?\n"
+            "YA RLY\n"
+            "FOUND YR position\n"
+            "OIC\n"
+            "position R SUM OF position AN 1\n"
+            "IM OUTTA YR search\n"
+            "FOUND YR -1\n"
+            "IF U SAY SO\n"
+            "I HAS A squares ITZ BUKKIT\n"
+            "I HAS A i ITZ 0\n"
+            "IM IN YR filling UPPIN YR i TIL BOTH SAEM i AN 10\n"
+            "ITEM OF squares AN i R PRODUKT OF i AN i\n"
+            "IM OUTTA YR filling\n"
+            "VISIBLE squares\n"
+            "VISIBLE I IZ findz YR squares AN YR 49 MKAY\n"
+            "I HAS A halves ITZ BUKKIT OF 0.5 AN 1.5 MKAY\n"
+            "I HAS A mixed ITZ BUKKIT OF 1 AN 2 MKAY\n"
+            'ITEM OF mixed AN 1 R "two"\n'
+            "I HAS A item\n"
+            "IM IN YR growing EACH YR item IN mixed\n"
+            "DIFFRINT SIZE OF mixed AN 4\n"
+            "O RLY?\n"
+            "YA RLY\n"
+            "ITEM OF mixed AN SIZE OF mixed R item\n"
+            "OIC\n"
+            "IM OUTTA YR growing\n"
+            "VISIBLE ITEM OF mixed AN 3 SIZE OF mixed\n"
+            "KTHXBYE"
+        )
+
+        output, memory, error = run(sourceCode, "tree")
+        self.assertIsNone(error)
+        self.assertEqual(output, "0 1 4 9 16 25 36 49 64 81\n7\ntwo4\n")
+        self.assertEqual(memory["squares"].items.typecode, "q")
+        self.assertEqual(memory["halves"].items.typecode, "d")
+        self.assertEqual(memory["mixed"], Bukkit([1, "two", 1, "two"]))
+        self.assertIsInstance(memory["mixed"].items, list)
+        self.assertSameAsTreeEngine(sourceCode)
+
+    def test_deeply_nested_blocks(self):
+        # deeper than CPython compiles: 21 loops, and 120 levels of blocks
+        nestedLoops = (
+            "HAI\nI HAS A x ITZ 0\n"
+            + "".join(
+                f"I HAS A i{depth} ITZ 0\n"
+                f"IM IN YR l{depth} UPPIN YR i{depth} TIL BOTH SAEM i{depth} AN 1\n"
+                for depth in range(21)
+            )
+            + "x R SUM OF x AN 1\n"
+            + "".join(f"IM OUTTA YR l{depth}\n" for depth in reversed(range(21)))
+            + "VISIBLE x\nKTHXBYE"
+        )
+        nestedIfs = (
+            "HAI\n" + "WIN\nO RLY?\nYA RLY\n" * 120 + "VISIBLE 1\n" + "OIC\n" * 120
+        ) + "KTHXBYE"
+
+        for sourceCode in (nestedLoops, nestedIfs):
+            with self.subTest(sourceCode=sourceCode[:40]):
+                output, _, error = run(sourceCode, "tree")
+                self.assertIsNone(error)
+                self.assertEqual(output, "1\n")
+                self.assertSameAsTreeEngine(sourceCode)
+
+        # the python engine runs them as closures, but cannot show them
+        with self.assertRaises(SyntaxError) as raised:
+            Evaluator(engine="python").transpile(
+                Lexer().process(nestedLoops), nestedLoops
+            )
+        self.assertEqual(
+            raised.exception.args,
+            (
+                "Blocks are nested too deeply for the python engine",
+                (None, 44, 0, nestedLoops.splitlines()[43]),
+            ),
+        )
+
+    def test_errors(self):
+        for sourceCode in (
+            'HAI\nI HAS A x ITZ "a"\nVISIBLE SUM OF x AN 1\nKTHXBYE',
+            "HAI\nVISIBLE SUM OF 1 AN y\nKTHXBYE",
+            "HAI\nx R 1\nKTHXBYE",
+            "HAI\nVISIBLE MOD OF 1 AN 0\nKTHXBYE",
+            "HAI\nI HAS A a ITZ BUKKIT OF 1 MKAY\nVISIBLE ITEM OF a AN 1\nKTHXBYE",
+            "HAI\nI HAS A a ITZ BUKKIT\nITEM OF a AN 1 R 2\nKTHXBYE",
+            "HAI\nI HAS A a\nIM IN YR l EACH YR a IN 1\nIM OUTTA YR l\nKTHXBYE",
+        ):
+            with self.subTest(sourceCode=sourceCode):
+                self.assertSameAsTreeEngine(sourceCode)
+
+
+class TestLongPrograms(unittest.TestCase):
+    def test_long_straight_line_program(self):
+        # more statements than the recursion limit, all in one block
+        sourceCode = (
+            "HAI\nI HAS A x ITZ 0\n"
+            + "x R SUM OF x AN 1\n" * 100_000
+            + "VISIBLE x\nKTHXBYE"
+        )
+
+        self.assertEqual(run(sourceCode, "tree"), ("100000\n", {"x": 100000}, None))
+
+
+class TestTranspiler(unittest.TestCase):
+    def test_generated_code(self):
+        sourceCode = "HAI\nI HAS A x ITZ 1\nVISIBLE SUM OF x AN 2\nKTHXBYE"
+        pythonCode = Evaluator(engine="python").transpile(
+            Lexer().process(sourceCode), sourceCode
+        )
+
+        self.assertIn("frame[0] = 1", pythonCode)
+        self.assertIn("_toNumber(_t1) + 2", pythonCode)
+        compile(pythonCode, "<test>", "exec")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+from src.components.environment import Environment
+
+
+class TestEnvironment(unittest.TestCase):
+    def setUp(self):
+        self.outer = Environment()
+        self.outer.declare("x", 1)
+        self.inner = self.outer.child()
+
+    def test_lookup(self):
+        self.assertEqual(self.inner["x"], 1)
+        self.assertIn("x", self.inner)
+        self.assertNotIn("y", self.inner)
+        with self.assertRaises(KeyError):
+            self.inner["y"]
+
+    def test_writes(self):
+        self.inner["x"] = 2
+        self.inner["y"] = 3
+
+        self.assertEqual(self.outer["x"], 2)
+        self.assertNotIn("y", self.outer)
+
+    def test_declaration_shadows(self):
+        self.inner.declare("x", "local")
+
+        self.assertEqual(self.inner["x"], "local")
+        self.assertEqual(self.outer["x"], 1)
+        self.assertEqual(self.inner.flatten(), {"x": "local"})
+        self.assertEqual(self.outer.flatten(), {"x": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+import io
+import unittest
+from src.components.lexer import Lexer, TokenBuffer
+from src.components.token_enum import TOKEN
+
+
+lexer = Lexer()
+
+
+def lexemesOf(tokens):
+    return [(token.lexeme, token.lexemeType) for token in tokens]
+
+
+class TestScanner(unittest.TestCase):
+    def test_multiword_keywords(self):
+        tokens = lexer.process("I HAS A var ITZ SUM OF 1 AN 2.5")
+
+        self.assertEqual(
+            lexemesOf(tokens),
+            [
+                ("I HAS A", TOKEN.VARIABLE_DECLARATION),
+                ("var", TOKEN.VARIABLE_IDENTIFIER),
+                ("ITZ", TOKEN.VARIABLE_ASSIGNMENT),
+                ("SUM OF", TOKEN.ADDITION_OPERATION),
+                ("1", TOKEN.INTEGER_LITERAL),
+                ("AN", TOKEN.OPERAND_SEPARATOR),
+                ("2.5", TOKEN.FLOAT_LITERAL),
+                ("\n", TOKEN.LINEBREAK),
+            ],
+        )
+
+    def test_keyword_prefix_is_identifier(self):
+        tokens = lexer.process("SUM ANY ITZY")
+
+        self.assertEqual(
+            [token.lexemeType for token in tokens[:-1]],
+            [TOKEN.VARIABLE_IDENTIFIER] * 3,
+        )
+
+    def test_string_literals(self):
+        tokens = lexer.process('VISIBLE "a b" AN "c"')
+
+        self.assertEqual(tokens[1].lexeme, '"a b"')
+        self.assertEqual(tokens[3].lexeme, '"c"')
+        self.assertEqual(tokens[3].lexemeType, TOKEN.STRING_LITERAL)
+
+    def test_loop_identifier(self):
+        tokens = lexer.process("IM IN YR loop UPPIN YR var\nIM OUTTA YR loop")
+
+        self.assertEqual(tokens[1].lexemeType, TOKEN.LOOP_IDENTIFIER)
+        self.assertEqual(tokens[4].lexemeType, TOKEN.VARIABLE_IDENTIFIER)
+        self.assertEqual(tokens[-2].lexemeType, TOKEN.LOOP_IDENTIFIER)
+
+    def test_unexpected_token(self):
+        with self.assertRaises(SyntaxError):
+            lexer.process("VISIBLE 1a")
+
+        with self.assertRaises(SyntaxError):
+            lexer.process('VISIBLE "unterminated')
+
+
+class TestStreamingLexer(unittest.TestCase):
+    def test_matches_process(self):
+        sourceCode = """HAI
+            I HAS A var ITZ "text"
+            VISIBLE var AN SUM OF 1 AN 2
+        KTHXBYE"""
+
+        self.assertEqual(
+            lexemesOf(Lexer().iterTokens(io.StringIO(sourceCode))),
+            lexemesOf(lexer.process(sourceCode)),
+        )
+
+    def test_comments_across_lines(self):
+        tokens = Lexer().iterTokens(
+            io.StringIO('VISIBLE "BTW" BTW comment\nOBTW\nVISIBLE 1\nTLDR VISIBLE 2')
+        )
+
+        self.assertEqual(
+            [token.lexeme for token in tokens],
+            ["VISIBLE", '"BTW"', "\n", "\n", "\n", "VISIBLE", "2", "\n"],
+        )
+
+    def test_unterminated_multiline_comment(self):
+        with self.assertRaises(SyntaxError):
+            list(Lexer().iterTokens(io.StringIO("OBTW\nVISIBLE 1")))
+
+
+class TestCommentStripping(unittest.TestCase):
+    def test_comments_keep_positions(self):
+        with self.assertRaises(SyntaxError) as context:
+            lexer.process("HAI\nOBTW\n\tcomment\nTLDR\n\tVISIBLE 1a BTW trailing")
+
+        self.assertEqual(context.exception.lineno, 5)
+        self.assertEqual(context.exception.offset, 9)
+        self.assertEqual(context.exception.text, "\tVISIBLE 1a BTW trailing")
+
+    def test_code_after_tldr(self):
+        tokens = lexer.process("OBTW comment TLDR VISIBLE 1")
+
+        self.assertEqual([token.lexeme for token in tokens], ["VISIBLE", "1", "\n"])
+
+    def test_one_linebreak_per_line(self):
+        tokens = lexer.process("HAI\nOBTW\n\nTLDR\nKTHXBYE")
+
+        self.assertEqual(
+            [token.lexeme for token in tokens],
+            ["HAI", "\n", "\n", "\n", "\n", "KTHXBYE", "\n"],
+        )
+
+
+class TestTokens(unittest.TestCase):
+    def test_positions(self):
+        tokens = lexer.process("HAI\n\tI HAS A  var ITZ 5\nKTHXBYE")
+
+        self.assertEqual(
+            [(token.lexeme, token.line, token.column) for token in tokens],
+            [
+                ("HAI", 1, 0),
+                ("\n", 1, 3),
+                ("I HAS A", 2, 1),
+                ("var", 2, 10),
+                ("ITZ", 2, 14),
+                ("5", 2, 18),
+                ("\n", 2, 19),
+                ("KTHXBYE", 3, 0),
+                ("\n", 3, 7),
+            ],
+        )
+
+    def test_compact_buffer(self):
+        sourceCode = 'HAI\nVISIBLE "a" AN SUM OF x AN 2.5\nKTHXBYE'
+        tokens = Lexer().process(sourceCode, compact=True)
+
+        self.assertIsInstance(tokens, TokenBuffer)
+        self.assertEqual(tokens.kinds[0], TOKEN.CODE_DELIMITER)
+        self.assertEqual(
+            [
+                (token.lexeme, token.lexemeType, token.line, token.column)
+                for token in tokens
+            ],
+            [
+                (token.lexeme, token.lexemeType, token.line, token.column)
+                for token in lexer.process(sourceCode)
+            ],
+        )
+
+
+class TestParallelLexer(unittest.TestCase):
+    def test_matches_sequential(self):
+        lines = ["HAI"]
+        for index in range(6000):
+            lines.append(f"I HAS A var{index} ITZ SUM OF {index} AN 1 BTW comment")
+            if index % 1000 == 999:
+                lines.extend(["OBTW", "I HAS A commented", "TLDR VISIBLE var0"])
+        lines.append("KTHXBYE")
+        sourceCode = "\n".join(lines)
+
+        def positionsOf(tokens):
+            return [
+                (token.lexeme, token.lexemeType, token.line, token.column)
+                for token in tokens
+            ]
+
+        self.assertEqual(
+            positionsOf(Lexer().process(sourceCode, workers=2)),
+            positionsOf(lexer.process(sourceCode)),
+        )
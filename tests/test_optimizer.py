@@ -0,0 +1,126 @@
+import unittest
+from src.components.evaluator import Evaluator
+from src.components.lexer import Lexer
+from src.components.optimizer import Optimizer, countNodes
+from src.components.parser import Parser
+from src.components.syntax_tree import Block, Invariant, Literal, SwitchStatement
+
+
+def optimize(statements):
+    sourceCode = "HAI\n" + statements + "\nKTHXBYE"
+    program = Parser().parse(Lexer().process(sourceCode), sourceCode)
+    optimizer = Optimizer()
+
+    return optimizer.optimize(program).statements, optimizer.removedNodeCount
+
+
+class TestOptimizer(unittest.TestCase):
+    def test_constant_folding(self):
+        statements, removedNodeCount = optimize(
+            "I HAS A x ITZ SUM OF 2 AN PRODUKT OF 3 AN 4"
+        )
+
+        self.assertIsInstance(statements[0].value, Literal)
+        self.assertEqual(statements[0].value.value, 14)
+        self.assertEqual(removedNodeCount, 4)
+
+    def test_concatenation(self):
+        statements, _ = optimize('I HAS A x ITZ SMOOSH "a" AN 1 AN WIN MKAY')
+
+        self.assertEqual(statements[0].value.value, "a1WIN")
+
+    def test_failing_operation_is_kept(self):
+        statements, removedNodeCount = optimize("VISIBLE QUOSHUNT OF 1 AN 0")
+
+        self.assertNotIsInstance(statements[0].operands[0], Literal)
+        self.assertEqual(removedNodeCount, 0)
+
+    def test_output_literals_are_merged(self):
+        statements, _ = optimize('I HAS A x\nVISIBLE "a" 1 x "b" SUM OF 1 AN 2')
+
+        operands = statements[1].operands
+        self.assertEqual(len(operands), 3)
+        self.assertEqual(operands[0].value, "a1")
+        self.assertEqual(operands[2].value, "b3")
+
+    def test_dead_if_branch(self):
+        statements, _ = optimize(
+            'BOTH SAEM 1 AN 2\nO RLY?\nYA RLY\nVISIBLE "yes"\n'
+            'NO WAI\nVISIBLE "no"\nOIC'
+        )
+
+        self.assertIsInstance(statements[1], Block)
+        self.assertEqual(statements[1].statements[0].operands[0].value, "no")
+
+    def test_short_circuit_folding(self):
+        statements, _ = optimize(
+            "I HAS A x\nVISIBLE BOTH OF FAIL AN x\n"
+            "VISIBLE ANY OF 0 AN x AN WIN AN x MKAY"
+        )
+
+        self.assertEqual(statements[1].operands[0].value, False)
+        self.assertEqual(len(statements[2].operands[0].operands), 2)
+
+    def test_dead_else_if_clauses(self):
+        statements, _ = optimize(
+            'I HAS A x\nFAIL\nO RLY?\nYA RLY\nVISIBLE "yes"\nMEBBE FAIL\n'
+            'VISIBLE "no"\nMEBBE x\nVISIBLE "x"\nMEBBE WIN\nVISIBLE "win"\n'
+            'MEBBE x\nVISIBLE "never"\nOIC'
+        )
+
+        ifStatement = statements[2]
+        self.assertEqual(ifStatement.ifBlock, [])
+        self.assertEqual(len(ifStatement.elseIfs), 1)
+        self.assertEqual(ifStatement.elseBlock[0].operands[0].value, "win")
+
+    def test_dead_switch_cases(self):
+        statements, _ = optimize(
+            'I HAS A x\nx\nWTF?\nOMG 1\nVISIBLE "one"\nGTFO\nOMG 1\nVISIBLE "dup"\n'
+            'OMG 2\nVISIBLE "two"\nOIC'
+        )
+
+        self.assertIsInstance(statements[2], SwitchStatement)
+        self.assertEqual(len(statements[2].cases), 2)
+
+        statements, _ = optimize(
+            '2\nWTF?\nOMG 1\nVISIBLE "one"\nOMG 2\nVISIBLE "two"\n'
+            'OMG 3\nVISIBLE "three"\nGTFO\nOMGWTF\nVISIBLE "default"\nOIC'
+        )
+
+        self.assertIsInstance(statements[1], Block)
+        self.assertEqual(
+            [statement.operands[0].value for statement in statements[1].statements],
+            ["two", "three"],
+        )
+
+    def test_node_count(self):
+        statements, _ = optimize("VISIBLE SUM OF 1 AN 2")
+
+        self.assertEqual(countNodes(statements[0]), 2)
+
+    def test_loop_invariants(self):
+        statements, _ = optimize(
+            "I HAS A w ITZ 2\nI HAS A h ITZ 3\nI HAS A i ITZ 0\n"
+            "IM IN YR loop UPPIN YR i TIL BOTH SAEM i AN PRODUKT OF w AN 2\n"
+            "VISIBLE SUM OF i AN PRODUKT OF w AN h\n"
+            "h R SUM OF h AN 1\n"
+            "IM OUTTA YR loop"
+        )
+
+        # only w is never written by the loop
+        loop = statements[3]
+        self.assertEqual(len(loop.invariants), 1)
+        self.assertIsInstance(loop.condition.right, Invariant)
+        self.assertNotIsInstance(loop.body[0].operands[0].right, Invariant)
+
+    def test_evaluator_option(self):
+        sourceCode = 'HAI\nVISIBLE "x" SUM OF 1 AN 2\nKTHXBYE'
+        evaluator = Evaluator(optimize=True)
+        evaluator.evaluate(Lexer().process(sourceCode), sourceCode)
+
+        self.assertEqual(evaluator.outputBuffer, "x3\n")
+        self.assertEqual(evaluator.removedNodeCount, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
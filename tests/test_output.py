@@ -0,0 +1,57 @@
+import io
+import unittest
+from unittest import mock
+from src.components import evaluator as evaluatorModule
+from src.components.evaluator import ENGINES, Evaluator
+from src.components.lexer import Lexer
+from src.components.output import (
+    TAIL_LENGTH,
+    CallbackSink,
+    ListSink,
+    OutputSink,
+    StreamSink,
+)
+
+
+class TestOutputSinks(unittest.TestCase):
+    def test_tail_is_bounded(self):
+        for sink in (OutputSink(), ListSink()):
+            with self.subTest(sink=type(sink).__name__):
+                for number in range(TAIL_LENGTH):
+                    sink.write(f"{number}\n")
+
+                tail = sink.tail()
+                self.assertEqual(len(tail), TAIL_LENGTH)
+                self.assertTrue(tail.endswith(f"\n{TAIL_LENGTH - 1}\n"))
+
+    def test_stream_sink_buffers(self):
+        stream = io.StringIO()
+        sink = StreamSink(stream, bufferSize=4)
+
+        sink.write("ab")
+        self.assertEqual(stream.getvalue(), "")
+        sink.write("cd")
+        self.assertEqual(stream.getvalue(), "abcd")
+        sink.write("e")
+        sink.flush()
+        self.assertEqual(stream.getvalue(), "abcde")
+
+    def test_evaluator_writes_to_sink(self):
+        sourceCode = 'HAI\nVISIBLE "a" 1\nGIMMEH x\nVISIBLE x\nKTHXBYE'
+
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                fragments = []
+                evaluator = Evaluator(engine, output=CallbackSink(fragments.append))
+
+                with mock.patch.object(
+                    evaluatorModule.easygui, "enterbox", return_value="b"
+                ) as enterbox:
+                    evaluator.evaluate(Lexer().process(sourceCode), sourceCode)
+
+                enterbox.assert_called_once_with("a1\n")
+                self.assertEqual("".join(fragments), "a1\nb\nb\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+from src.components.lexer import Lexer
+from src.components.parser import Parser
+from src.components.syntax_tree import (
+    BinaryOperation,
+    Declaration,
+    FunctionCall,
+    FunctionDefinition,
+    IfStatement,
+    Item,
+    ItemAssignment,
+    Loop,
+    MakeBukkit,
+    Output,
+    Return,
+    Size,
+)
+from src.components.token_enum import TOKEN
+
+
+def parse(sourceCode):
+    return Parser().parse(Lexer().process(sourceCode), sourceCode)
+
+
+class TestParser(unittest.TestCase):
+    def test_syntax_tree(self):
+        program = parse("HAI\nI HAS A var ITZ SUM OF 1 AN 2\nVISIBLE var\nKTHXBYE")
+        declaration, output = program.statements
+
+        self.assertIsInstance(declaration, Declaration)
+        self.assertEqual(declaration.identifier, "var")
+        self.assertIsInstance(declaration.value, BinaryOperation)
+        self.assertEqual(declaration.value.operator, TOKEN.ADDITION_OPERATION)
+        self.assertIsInstance(output, Output)
+        self.assertEqual((output.line, output.column), (3, 0))
+
+    def test_nested_loops(self):
+        program = parse(
+            "HAI\n"
+            "IM IN YR outer UPPIN YR i TIL BOTH SAEM i AN 3\n"
+            "IM IN YR inner UPPIN YR j WILE DIFFRINT j AN 3\n"
+            "GTFO\n"
+            "IM OUTTA YR inner\n"
+            "IM OUTTA YR outer\n"
+            "KTHXBYE"
+        )
+        outerLoop = program.statements[0]
+
+        self.assertIsInstance(outerLoop, Loop)
+        self.assertEqual(outerLoop.conditionKeyword, "TIL")
+        self.assertEqual(outerLoop.body[0].label, "inner")
+
+    def test_else_if_clauses(self):
+        program = parse(
+            "HAI\nWIN\nO RLY?\nYA RLY\nVISIBLE 1\nMEBBE BOTH SAEM 1 AN 2\n"
+            "VISIBLE 2\nMEBBE FAIL\nNO WAI\nVISIBLE 3\nOIC\nKTHXBYE"
+        )
+        ifStatement = program.statements[1]
+
+        firstElseIf, secondElseIf = ifStatement.elseIfs
+
+        self.assertIsInstance(ifStatement, IfStatement)
+        self.assertIsInstance(firstElseIf.condition, BinaryOperation)
+        self.assertEqual((firstElseIf.line, firstElseIf.column), (6, 0))
+        self.assertEqual(len(firstElseIf.block), 1)
+        self.assertEqual(secondElseIf.block, [])
+        self.assertEqual(len(ifStatement.elseBlock), 1)
+
+    def test_function_definition(self):
+        program = parse(
+            "HAI\nHOW IZ I add YR a AN YR b\nFOUND YR SUM OF a AN b\n"
+            "IF U SAY SO\nVISIBLE I IZ add YR 1 AN YR I IZ add YR 2 AN YR 3 MKAY MKAY\n"
+            "KTHXBYE"
+        )
+        function, output = program.statements
+        call = output.operands[0]
+
+        self.assertIsInstance(function, FunctionDefinition)
+        self.assertEqual((function.name, function.parameters), ("add", ["a", "b"]))
+        self.assertIsInstance(function.body[0], Return)
+        self.assertIsInstance(call, FunctionCall)
+        self.assertEqual(call.name, "add")
+        self.assertIsInstance(call.arguments[1], FunctionCall)
+
+    def test_misplaced_functions(self):
+        for sourceCode in (
+            "HAI\nFOUND YR 1\nKTHXBYE",
+            "HAI\nWIN\nO RLY?\nYA RLY\nHOW IZ I f\nIF U SAY SO\nOIC\nKTHXBYE",
+        ):
+            with self.subTest(sourceCode=sourceCode):
+                with self.assertRaises(SyntaxError):
+                    parse(sourceCode)
+
+    def test_bukkits(self):
+        program = parse(
+            "HAI\nI HAS A a ITZ BUKKIT OF 1 AN BUKKIT MKAY\n"
+            "ITEM OF a AN SIZE OF a R 3\nITEM OF a AN 0\n"
+            "IM IN YR loop EACH YR x IN a\nIM OUTTA YR loop\nKTHXBYE"
+        )
+        declaration, assignment, statement, loop = program.statements
+
+        self.assertIsInstance(declaration.value, MakeBukkit)
+        self.assertIsInstance(declaration.value.items[1], MakeBukkit)
+        self.assertEqual(declaration.value.items[1].items, [])
+        self.assertIsInstance(assignment, ItemAssignment)
+        self.assertIsInstance(assignment.index, Size)
+        self.assertIsInstance(statement.expression, Item)
+        self.assertEqual((loop.delta, loop.counter), (0, "x"))
+        self.assertEqual(loop.collection.identifier, "a")
+
+        with self.assertRaises(SyntaxError):
+            parse("HAI\nIM IN YR loop EACH YR x\nIM OUTTA YR loop\nKTHXBYE")
+
+    def test_mismatched_loop_label(self):
+        with self.assertRaises(SyntaxError):
+            parse("HAI\nIM IN YR loop UPPIN YR i\nIM OUTTA YR other\nKTHXBYE")
+
+    def test_break_outside_loop(self):
+        with self.assertRaises(SyntaxError):
+            parse("HAI\nGTFO\nKTHXBYE")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+from src.components.lexer import Lexer
+from src.components.parser import Parser
+from src.components.resolver import Frame, Resolver
+from src.components.source import Source
+
+
+def resolve(statements):
+    sourceCode = "HAI\n" + statements + "\nKTHXBYE"
+    program = Parser().parse(Lexer().process(sourceCode), sourceCode)
+
+    return Resolver(Source.fromText(sourceCode)).resolve(program)
+
+
+class TestResolver(unittest.TestCase):
+    def test_slots(self):
+        program = resolve(
+            "I HAS A x ITZ 1\nI HAS A x ITZ 2\nSUM OF x AN 1\n"
+            "IM IN YR l UPPIN YR x TIL BOTH SAEM x AN 3\n"
+            "  I HAS A x ITZ 5\nIM OUTTA YR l"
+        )
+
+        self.assertEqual(program.slotNames, ["x", "IT", "x"])
+        self.assertEqual(program.globalSlots, {"x": 0, "IT": 1})
+        self.assertEqual(program.statements[3].counterSlot, 0)
+        self.assertEqual(program.statements[3].body[0].slot, 2)
+
+    def test_undeclared_variables(self):
+        with self.assertRaises(NameError) as context:
+            resolve("I HAS A x\nVISIBLE y")
+        self.assertEqual(context.exception.args[1][1:3], (3, 8))
+
+        with self.assertRaises(SyntaxError):
+            resolve("x R 1")
+
+        with self.assertRaises(NameError):
+            resolve("I HAS A x ITZ x")
+
+    def test_functions(self):
+        program = resolve(
+            "I HAS A x ITZ 1\nVISIBLE I IZ f YR x MKAY\n"
+            "HOW IZ I f YR n\nI HAS A x ITZ n\nFOUND YR I IZ f YR x MKAY\nIF U SAY SO"
+        )
+        function = program.statements[2]
+
+        self.assertEqual(program.slotNames, ["x"])
+        self.assertEqual(function.slotNames, ["n", "IT", "x"])
+        self.assertIs(function.body[1].value.function, function)
+        self.assertTrue(function.body[1].isTailCall)
+
+        with self.assertRaises(NameError):
+            resolve("VISIBLE I IZ f MKAY")
+
+        with self.assertRaises(SyntaxError):
+            resolve("HOW IZ I f YR a\nIF U SAY SO\nVISIBLE I IZ f MKAY")
+
+    def test_counted_loops(self):
+        program = resolve(
+            "I HAS A i ITZ 0\nI HAS A n ITZ 3\n"
+            "IM IN YR a UPPIN YR i TIL BOTH SAEM i AN n\n  VISIBLE i\nIM OUTTA YR a\n"
+            "IM IN YR b NERFIN YR i WILE DIFFRINT 0 AN i\n  VISIBLE i\nIM OUTTA YR b\n"
+            "IM IN YR c UPPIN YR i TIL BOTH SAEM i AN n\n  n R 5\nIM OUTTA YR c\n"
+            "IM IN YR d UPPIN YR i TIL BOTH SAEM i AN n\n"
+            "  IM IN YR e UPPIN YR i TIL BOTH SAEM i AN 9\n  IM OUTTA YR e\n"
+            "IM OUTTA YR d"
+        )
+
+        self.assertEqual(
+            [statement.countedLimit for statement in program.statements[2:]],
+            [(1, None), (None, 0), None, None],
+        )
+        self.assertEqual(program.statements[5].body[0].countedLimit, (None, 9))
+
+    def test_jump_table(self):
+        program = resolve(
+            '1\nWTF?\nOMG 1\n  VISIBLE 1\nOMG "a"\nOMG 1\n  GTFO\n'
+            "OMGWTF\n  VISIBLE 0\nOIC\n2\nWTF?\nOMG 2.5\n  GTFO\nOIC"
+        )
+        switch, _, switchWithoutDefault = program.statements[1:]
+
+        self.assertEqual(
+            switch.jumpTable,
+            {("NUMBER", 1): 0, ("YARN", "1"): 0, ("YARN", "a"): 1},
+        )
+        self.assertEqual(switch.defaultCase, 3)
+        self.assertEqual(
+            switchWithoutDefault.jumpTable, {("NUMBER", 2.5): 0, ("YARN", "2.5"): 0}
+        )
+        self.assertEqual(switchWithoutDefault.defaultCase, 1)
+
+    def test_frame(self):
+        frame = Frame(["x", "IT", "x"], {"x": 0, "IT": 1})
+        frame.values[0] = 1
+        frame.values[2] = 2
+
+        self.assertEqual(frame.flatten(), {"x": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+from src.components.lexer import Lexer
+from src.components.source import Source
+
+
+sourceCode = """HAI
+    I HAS A var ITZ "text"
+    VISIBLE var
+KTHXBYE
+"""
+
+
+class TestSource(unittest.TestCase):
+    def setUp(self):
+        file, self.filename = tempfile.mkstemp(suffix=".lol")
+        with os.fdopen(file, "w") as openedFile:
+            openedFile.write(sourceCode)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def test_lines(self):
+        with Source.fromFile(self.filename) as source:
+            self.assertEqual(list(source), sourceCode.split("\n"))
+            self.assertEqual(len(source), 5)
+            self.assertEqual(source.line(3), "    VISIBLE var")
+            self.assertEqual(source[-1], "")
+            self.assertEqual(source[1:3], sourceCode.split("\n")[1:3])
+
+    def test_line_out_of_range(self):
+        source = Source.fromText(sourceCode)
+
+        self.assertEqual(source.line(0), "")
+        self.assertEqual(source.line(99), "")
+
+    def test_lexer_reads_source(self):
+        def positionsOf(tokens):
+            return [(token.lexeme, token.line, token.column) for token in tokens]
+
+        with Source.fromFile(self.filename) as source:
+            self.assertEqual(
+                positionsOf(Lexer().process(source)),
+                positionsOf(Lexer().process(sourceCode)),
+            )
+
+    def test_empty_file(self):
+        with open(self.filename, "w"):
+            pass
+
+        with Source.fromFile(self.filename) as source:
+            self.assertEqual(list(source), [""])
+            self.assertEqual(len(source), 1)
@@ -115,6 +115,8 @@ class TestOutputAbstraction(unittest.TestCase):
     def test_valid_multi_operand_output(self):
         lexemes = lexer.process(
             """HAI
+            I HAS A one ITZ 1
+            I HAS A five ITZ 5
             VISIBLE one 2 "three" 4.0 five 6 "7" 8.9 WIN
         KTHXBYE"""
         )
@@ -129,6 +131,8 @@ class TestLoopAbstraction(unittest.TestCase):
     def test_valid_loop(self):
         lexemes = lexer.process(
             """HAI
+            I HAS A num1 ITZ 3
+            I HAS A num2 ITZ 0
             IM IN YR asc UPPIN YR num2 WILE BOTH SAEM num2 AN SMALLR OF num2 AN num1
                 VISIBLE num2
             IM OUTTA YR asc
@@ -214,6 +218,8 @@ class TestLoopAbstraction(unittest.TestCase):
     def test_allow_no_statement(self):
         lexemes = lexer.process(
             """HAI
+            I HAS A num1 ITZ 3
+            I HAS A num2 ITZ 0
             IM IN YR asc UPPIN YR num2 WILE BOTH SAEM num2 AN SMALLR OF num2 AN num1
             IM OUTTA YR asc
         KTHXBYE"""
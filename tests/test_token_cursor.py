@@ -0,0 +1,62 @@
+import unittest
+from src.components.lexer import Lexer
+from src.components.token_cursor import TokenCursor
+from src.components.token_enum import TOKEN
+
+
+sourceCode = "I HAS A var ITZ 1\nVISIBLE var"
+
+
+class TestTokenCursor(unittest.TestCase):
+    def test_peek_and_advance(self):
+        cursor = TokenCursor(Lexer().process(sourceCode))
+
+        self.assertEqual(cursor.peekKind(), TOKEN.VARIABLE_DECLARATION)
+        self.assertEqual(cursor.advance().lexeme, "I HAS A")
+        self.assertEqual(cursor.peek().lexeme, "var")
+
+        while not cursor.isAtEnd():
+            cursor.advance()
+
+        self.assertIsNone(cursor.peek())
+        self.assertIsNone(cursor.advance())
+
+    def test_mark_and_reset(self):
+        cursor = TokenCursor(Lexer().process(sourceCode))
+        cursor.advance()
+
+        mark = cursor.mark()
+        cursor.advance()
+        cursor.advance()
+        cursor.reset(mark)
+
+        self.assertEqual(cursor.peek().lexeme, "var")
+
+    def test_view(self):
+        cursor = TokenCursor(Lexer().process(sourceCode))
+        view = cursor.view(4, 6)
+
+        self.assertEqual(view.advance().lexeme, "\n")
+        self.assertEqual(view.advance().lexeme, "VISIBLE")
+        self.assertTrue(view.isAtEnd())
+        self.assertEqual(cursor.peek().lexeme, "I HAS A")
+
+    def test_lazy_tokens(self):
+        lexer = Lexer()
+        cursor = TokenCursor(lexer.iterTokens(sourceCode.split("\n")))
+
+        self.assertEqual(cursor.advance().lexeme, "I HAS A")
+        self.assertEqual(lexer.currentLineNumber, 1)
+
+        lexemes = []
+        while not cursor.isAtEnd():
+            lexemes.append(cursor.advance().lexeme)
+
+        self.assertEqual(lexemes[-2:], ["var", "\n"])
+        self.assertEqual(lexer.currentLineNumber, 2)
+
+    def test_compact_tokens(self):
+        cursor = TokenCursor(Lexer().process(sourceCode, compact=True))
+
+        self.assertEqual(cursor.peekKind(), TOKEN.VARIABLE_DECLARATION)
+        self.assertEqual(cursor.advance().lexeme, "I HAS A")
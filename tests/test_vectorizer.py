@@ -0,0 +1,106 @@
+import unittest
+from unittest import mock
+from src.components import vectorizer as vectorizerModule
+from src.components.evaluator import Evaluator
+from src.components.lexer import Lexer
+from src.components.parser import Parser
+from src.components.resolver import Resolver
+from src.components.source import Source
+from src.components.vectorizer import LoopVectorizer
+
+
+def loopProgram(declarations, body, header="UPPIN YR i TIL BOTH SAEM i AN n"):
+    return (
+        f"HAI\nI HAS A i ITZ 0\nI HAS A n ITZ 1000\n{declarations}\n"
+        f"IM IN YR loop {header}\n{body}\nIM OUTTA YR loop\nKTHXBYE"
+    )
+
+
+VECTORIZABLE_PROGRAMS = (
+    loopProgram(
+        "I HAS A k ITZ 3\nI HAS A acc ITZ 0",
+        "acc R SUM OF acc AN PRODUKT OF i AN k",
+    ),
+    loopProgram(
+        "I HAS A acc ITZ 0.5",
+        "acc R SUM OF PRODUKT OF i AN 0.1 AN acc",
+    ),
+    loopProgram(
+        "I HAS A low ITZ 0\nI HAS A high ITZ 0\nI HAS A square",
+        "low R SMALLR OF low AN DIFF OF 500 AN i\n"
+        "high R BIGGR OF high AN i\n"
+        "square R PRODUKT OF i AN i",
+    ),
+    loopProgram(
+        "I HAS A acc ITZ 1.0",
+        "acc R DIFF OF acc AN SUM OF i AN 0.25",
+        header="NERFIN YR n WILE DIFFRINT n AN i",
+    ),
+)
+
+INTERPRETED_PROGRAMS = (
+    # NUMBRs that could overflow int64
+    loopProgram(
+        "I HAS A acc ITZ 0",
+        "acc R SUM OF acc AN PRODUKT OF i AN 99999999999999999",
+    ),
+    loopProgram('I HAS A k ITZ "3"\nI HAS A acc ITZ 0', "acc R SUM OF acc AN k"),
+    loopProgram("I HAS A acc ITZ 0", "acc R SUM OF acc AN i\nVISIBLE acc"),
+    loopProgram("I HAS A acc ITZ 0", "acc R SUM OF acc AN QUOSHUNT OF i AN 2"),
+)
+
+
+def run(sourceCode, engine="tree", vectorize=False):
+    evaluator = Evaluator(engine=engine, vectorize=vectorize)
+    evaluator.evaluate(Lexer().process(sourceCode), sourceCode)
+
+    return evaluator.outputBuffer, evaluator.memory.flatten()
+
+
+def plan(sourceCode):
+    source = Source.fromText(sourceCode)
+    program = Resolver(source).resolve(
+        Parser().parse(Lexer().process(sourceCode), source)
+    )
+
+    return LoopVectorizer().plan(program.statements[-1])
+
+
+class TestLoopVectorizer(unittest.TestCase):
+    def test_plans(self):
+        for sourceCode in VECTORIZABLE_PROGRAMS:
+            with self.subTest(sourceCode=sourceCode):
+                self.assertIsNotNone(plan(sourceCode))
+
+        self.assertIsNone(plan(INTERPRETED_PROGRAMS[2]))
+        self.assertIsNone(plan(INTERPRETED_PROGRAMS[3]))
+
+    def test_same_results_as_interpreting(self):
+        for sourceCode in VECTORIZABLE_PROGRAMS + INTERPRETED_PROGRAMS:
+            for engine in ("tree", "closure"):
+                with self.subTest(sourceCode=sourceCode, engine=engine):
+                    self.assertEqual(
+                        run(sourceCode, engine, vectorize=True), run(sourceCode)
+                    )
+
+    @unittest.skipIf(vectorizerModule.numpy is None, "NumPy is not installed")
+    def test_loops_are_vectorized(self):
+        vectorized = []
+        vectorizerRun = LoopVectorizer.run
+
+        def recordingRun(vectorizer, *arguments):
+            vectorized.append(vectorizerRun(vectorizer, *arguments))
+            return vectorized[-1]
+
+        with mock.patch.object(LoopVectorizer, "run", recordingRun):
+            for sourceCode in VECTORIZABLE_PROGRAMS + INTERPRETED_PROGRAMS:
+                run(sourceCode, vectorize=True)
+
+        self.assertEqual(
+            vectorized,
+            [True] * len(VECTORIZABLE_PROGRAMS) + [False] * len(INTERPRETED_PROGRAMS),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()